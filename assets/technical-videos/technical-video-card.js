@@ -19,14 +19,22 @@ class TechnicalVideoCard {
     render() {
         const hasVideo = this.data.videoUrl && this.data.videoUrl.trim() !== '';
 
+        // Responsive derivatives (scripts/image_derivatives.py --annotate)
+        const srcset = this.data.coverImageSrcset;
+        const sizes = '(max-width: 768px) 100vw, 400px';
+
         this.element.innerHTML = `
             <div class="technical-video-card__image-wrapper">
-                <img
-                    src="${this.data.coverImage}"
-                    alt="${this.data.title}"
-                    class="technical-video-card__image"
-                    loading="lazy"
-                >
+                <picture>
+                    ${srcset ? `<source type="image/webp" srcset="${srcset.webp}" sizes="${sizes}">` : ''}
+                    <img
+                        src="${this.data.coverImage}"
+                        ${srcset ? `srcset="${srcset.jpeg}" sizes="${sizes}"` : ''}
+                        alt="${this.data.title}"
+                        class="technical-video-card__image"
+                        loading="lazy"
+                    >
+                </picture>
                 ${this.data.year ? `
                     <div class="technical-video-card__badge">
                         ${this.data.year}
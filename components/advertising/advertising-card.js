@@ -27,14 +27,22 @@ class AdvertisingCard {
             badgeClass = 'logo';
         }
 
+        // Responsive derivatives (scripts/image_derivatives.py --annotate)
+        const srcset = this.data.coverImageSrcset;
+        const sizes = '(max-width: 768px) 100vw, 400px';
+
         this.element.innerHTML = `
             <div class="advertising-card__image-wrapper">
-                <img
-                    src="${this.data.coverImage}"
-                    alt="${this.data.title}"
-                    class="advertising-card__image"
-                    loading="lazy"
-                >
+                <picture>
+                    ${srcset ? `<source type="image/webp" srcset="${srcset.webp}" sizes="${sizes}">` : ''}
+                    <img
+                        src="${this.data.coverImage}"
+                        ${srcset ? `srcset="${srcset.jpeg}" sizes="${sizes}"` : ''}
+                        alt="${this.data.title}"
+                        class="advertising-card__image"
+                        loading="lazy"
+                    >
+                </picture>
                 ${this.data.year ? `
                     <div class="advertising-card__badge advertising-card__badge--${badgeClass}">
                         ${this.data.year}
@@ -67,7 +75,9 @@ class AdvertisingCard {
                 img.classList.add('loaded');
             });
             img.addEventListener('error', () => {
-                img.src = 'advertising/images/placeholder.svg';
+                img.parentElement.querySelectorAll('source').forEach(source => source.remove());
+                img.removeAttribute('srcset');
+                img.src = 'components/advertising/images/placeholder.svg';
                 img.classList.add('loaded');
             });
         }
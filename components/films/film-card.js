@@ -34,13 +34,21 @@ class FilmCard {
      * Renders the film card HTML structure
      */
     render() {
+        // Responsive derivatives (scripts/image_derivatives.py --annotate)
+        const srcset = this.data.coverImageSrcset;
+        const sizes = '(max-width: 768px) 50vw, 300px';
+
         const html = `
             <div class="film-card__poster">
                 ${this.data.year ? `<div class="film-card__year">${this.data.year}</div>` : ''}
-                <img data-src="${this.data.coverImage}"
-                     alt="${this.data.title}"
-                     class="film-card__poster-image"
-                     loading="lazy">
+                <picture>
+                    ${srcset ? `<source type="image/webp" data-srcset="${srcset.webp}" sizes="${sizes}">` : ''}
+                    <img data-src="${this.data.coverImage}"
+                         ${srcset ? `data-srcset="${srcset.jpeg}" sizes="${sizes}"` : ''}
+                         alt="${this.data.title}"
+                         class="film-card__poster-image"
+                         loading="lazy">
+                </picture>
                 <div class="film-card__poster-overlay"></div>
             </div>
 
@@ -78,6 +86,10 @@ class FilmCard {
     loadImage() {
         const img = this.element.querySelector('.film-card__poster-image');
         if (img && img.dataset.src) {
+            this.element.querySelectorAll('.film-card__poster source[data-srcset]').forEach(source => {
+                source.srcset = source.dataset.srcset;
+            });
+            if (img.dataset.srcset) img.srcset = img.dataset.srcset;
             img.src = img.dataset.src;
 
             // Add loaded class when image is fully loaded
@@ -85,8 +97,15 @@ class FilmCard {
                 img.classList.add('loaded');
             });
 
-            // Handle error case
+            // Handle error case: if a responsive candidate failed, fall back to the plain src once
             img.addEventListener('error', () => {
+                const sources = img.parentElement.querySelectorAll('source');
+                if (sources.length || img.hasAttribute('srcset')) {
+                    sources.forEach(source => source.remove());
+                    img.removeAttribute('srcset');
+                    img.src = img.dataset.src;
+                    return;
+                }
                 console.warn(`Failed to load image: ${img.dataset.src}`);
                 img.classList.add('loaded');
             });
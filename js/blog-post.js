@@ -34,9 +34,11 @@ class BlogPost {
 
     async loadPost() {
         try {
-            const response = await fetch('data/blog-posts.json');
-            const posts = await response.json();
-            this.post = posts.find(post => post.id === this.postId);
+            // One file per post (scripts/build_blog_shards.py); unknown ids 404
+            const response = await fetch(`data/blog/posts/${encodeURIComponent(this.postId)}.json`);
+            if (response.ok) {
+                this.post = await response.json();
+            }
         } catch (error) {
             console.error('Error loading blog post:', error);
         }
@@ -85,6 +87,10 @@ class BlogPost {
 
         // Update featured image
         if (postImage) {
+            if (this.post.featuredImageSrcset) {
+                postImage.srcset = this.post.featuredImageSrcset.jpeg;
+                postImage.sizes = '(max-width: 768px) 100vw, 1000px';
+            }
             postImage.src = this.post.featuredImage;
             postImage.alt = this.post.title;
         }
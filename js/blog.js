@@ -1,53 +1,251 @@
 /**
  * Blog JavaScript
- * Handles dynamic loading of blog posts from JSON
+ * Handles dynamic loading of blog posts from the sharded JSON in data/blog/
+ * (built by scripts/build_blog_shards.py): the sidebar summary and one
+ * listing page at a time, with the full card listing and the search index
+ * fetched only for tag filters and searches.
  */
 
 class BlogManager {
     constructor() {
-        this.posts = [];
+        this.summary = null;
+        this.listing = null;
+        this.searchIndex = null;
+        this.searchRequest = 0;
         this.filteredPosts = [];
+        this.pagePosts = [];
+        this.totalPages = 0;
+        this.totalPosts = 0;
         this.currentPage = 1;
         this.postsPerPage = 4;
         this.currentCategory = 'all';
+        // 'category' pages come from page shards; 'tag', 'date' and 'search' use filteredPosts
+        this.filterType = 'category';
+        this.requests = new Map();
         this.init();
     }
 
     async init() {
-        await this.loadPosts();
-        this.renderPosts();
+        const loaded = await this.loadSummary();
+        if (!loaded) return;
+
+        await this.renderPosts();
         this.renderSidebar();
         this.setupEventListeners();
     }
 
-    async loadPosts() {
+    fetchJSON(url) {
+        // Each shard is requested at most once per page view
+        if (!this.requests.has(url)) {
+            const request = fetch(url).then(response => {
+                if (!response.ok) throw new Error(`${response.status} ${url}`);
+                return response.json();
+            });
+            request.catch(() => this.requests.delete(url));
+            this.requests.set(url, request);
+        }
+        return this.requests.get(url);
+    }
+
+    async loadSummary() {
         try {
-            const response = await fetch('data/blog-posts.json');
-            this.posts = await response.json();
+            // Fetch the first page alongside the summary so the first render needs no extra round trip
+            const [summary] = await Promise.all([
+                this.fetchJSON('data/blog/summary.json'),
+                this.fetchJSON('data/blog/pages/all/1.json')
+            ]);
+            this.summary = summary;
+            this.postsPerPage = summary.postsPerPage;
+            return true;
+        } catch (error) {
+            console.error('Error loading blog posts:', error);
+            this.showError();
+            return false;
+        }
+    }
+
+    async loadListing() {
+        if (!this.listing) {
+            this.listing = await this.fetchJSON('data/blog/index.json');
+        }
+        return this.listing;
+    }
+
+    async loadSearchIndex() {
+        if (!this.searchIndex) {
+            const index = await this.fetchJSON('data/blog/search.json');
+            this.searchIndex = { ...index, stopwords: new Set(index.stopwords) };
+        }
+        return this.searchIndex;
+    }
+
+    decodeGaps(gaps) {
+        // Posting lists are delta-encoded
+        let previous = 0;
+        return gaps.map(gap => (previous += gap));
+    }
+
+    tokenize(text) {
+        // Same folding as scripts/build_search_index.py: no accents, lowercase
+        const folded = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+        return (folded.match(/[\p{L}\p{N}_]+/gu) || [])
+            .map(token => token.replace(/^_+|_+$/g, ''))
+            .filter(token => token.length >= 2 && !this.searchIndex.stopwords.has(token));
+    }
+
+    trigrams(term) {
+        const padded = `^${term}$`;
+        const grams = new Set();
+        for (let i = 0; i < padded.length - 2; i++) {
+            grams.add(padded.slice(i, i + 3));
+        }
+        return [...grams];
+    }
+
+    findTerm(term) {
+        const terms = this.searchIndex.terms;
+        let low = 0;
+        let high = terms.length - 1;
+        while (low <= high) {
+            const mid = (low + high) >> 1;
+            if (terms[mid] === term) return mid;
+            if (terms[mid] < term) low = mid + 1;
+            else high = mid - 1;
+        }
+        return -1;
+    }
+
+    async expandToken(token) {
+        // Index terms a query token matches, with a weight: exact and prefix, else fuzzy
+        const terms = this.searchIndex.terms;
+        const exact = this.findTerm(token);
+        const matches = exact >= 0 ? [[exact, 1]] : [];
+
+        const range = this.searchIndex.prefixes[token.slice(0, 2)];
+        if (range) {
+            for (let n = range[0]; n < range[1]; n++) {
+                if (n !== exact && terms[n].startsWith(token)) matches.push([n, 0.5]);
+            }
+        }
+        if (matches.length) return matches;
+
+        // Fuzzy: terms sharing most trigrams (Dice coefficient)
+        const table = await this.fetchJSON('data/blog/search-trigrams.json');
+        const grams = this.trigrams(token);
+        const shared = new Map();
+        grams.forEach(gram => {
+            this.decodeGaps(table[gram] || []).forEach(n => shared.set(n, (shared.get(n) || 0) + 1));
+        });
+
+        return [...shared.entries()]
+            .map(([n, count]) => [n, 2 * count / (grams.length + this.trigrams(terms[n]).length)])
+            .filter(([, similarity]) => similarity >= 0.5)
+            .sort((a, b) => b[1] - a[1])
+            .slice(0, 5)
+            .map(([n, similarity]) => [n, similarity * 0.5]);
+    }
+
+    async search(query) {
+        // Documents (index.json positions) matching every query token, best first
+        await this.loadSearchIndex();
+        const tokens = [...new Set(this.tokenize(query))];
+        if (tokens.length === 0) return null;
+
+        let totals = null;
+        for (const token of tokens) {
+            const scores = new Map();
+            for (const [n, weight] of await this.expandToken(token)) {
+                const postings = this.searchIndex.postings[n];
+                let doc = 0;
+                for (let i = 0; i < postings.length; i += 2) {
+                    doc += postings[i];
+                    scores.set(doc, Math.max(scores.get(doc) || 0, postings[i + 1] * weight));
+                }
+            }
+
+            if (totals === null) {
+                totals = scores;
+            } else {
+                for (const doc of totals.keys()) {
+                    if (scores.has(doc)) totals.set(doc, totals.get(doc) + scores.get(doc));
+                    else totals.delete(doc);
+                }
+            }
+        }
 
-            // Sort posts by date (newest first)
-            this.posts.sort((a, b) => new Date(b.publishDate) - new Date(a.publishDate));
+        return [...totals.entries()]
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .map(([doc]) => doc);
+    }
+
+    async searchPosts(query) {
+        const request = ++this.searchRequest;
 
-            this.filteredPosts = [...this.posts];
+        let docs;
+        let listing;
+        try {
+            [docs, listing] = await Promise.all([this.search(query), this.loadListing()]);
         } catch (error) {
-            console.error('Error loading blog posts:', error);
+            console.error('Error searching blog posts:', error);
             this.showError();
+            return;
+        }
+
+        if (request !== this.searchRequest) return; // A newer search is in progress
+
+        if (docs === null) {
+            this.filterByCategory('all');
+            return;
         }
+
+        this.filteredPosts = docs.map(doc => listing[doc]);
+        this.filterType = 'search';
+        this.currentCategory = 'all';
+        this.currentPage = 1;
+        this.renderPosts();
     }
 
-    renderPosts() {
+    categorySlug(category) {
+        if (category === 'all') return 'all';
+        const entry = this.summary.categories.find(item => item.name === category);
+        return entry ? entry.slug : null;
+    }
+
+    async loadCurrentPage() {
+        if (this.filterType === 'category') {
+            const slug = this.categorySlug(this.currentCategory);
+            const page = slug
+                ? await this.fetchJSON(`data/blog/pages/${slug}/${this.currentPage}.json`)
+                : { posts: [], totalPages: 0, totalPosts: 0 };
+            this.pagePosts = page.posts;
+            this.totalPages = page.totalPages;
+            this.totalPosts = page.totalPosts;
+        } else {
+            const startIndex = (this.currentPage - 1) * this.postsPerPage;
+            const endIndex = startIndex + this.postsPerPage;
+            this.pagePosts = this.filteredPosts.slice(startIndex, endIndex);
+            this.totalPages = Math.ceil(this.filteredPosts.length / this.postsPerPage);
+            this.totalPosts = this.filteredPosts.length;
+        }
+    }
+
+    async renderPosts() {
         const postsContainer = document.getElementById('blogPosts');
 
-        if (this.filteredPosts.length === 0) {
-            postsContainer.innerHTML = '<p class="no-posts">No posts found.</p>';
+        try {
+            await this.loadCurrentPage();
+        } catch (error) {
+            console.error('Error loading blog posts:', error);
+            this.showError();
             return;
         }
 
-        const startIndex = (this.currentPage - 1) * this.postsPerPage;
-        const endIndex = startIndex + this.postsPerPage;
-        const postsToShow = this.filteredPosts.slice(startIndex, endIndex);
+        if (this.totalPosts === 0) {
+            postsContainer.innerHTML = '<p class="no-posts">No posts found.</p>';
+            return;
+        }
 
-        const postsHTML = postsToShow.map(post => this.createPostCard(post)).join('');
+        const postsHTML = this.pagePosts.map(post => this.createPostCard(post)).join('');
         postsContainer.innerHTML = postsHTML;
 
         this.renderPagination();
@@ -64,6 +262,10 @@ class BlogManager {
             day: 'numeric'
         });
 
+        // Responsive derivatives (scripts/image_derivatives.py --annotate)
+        const srcset = post.featuredImageSrcset;
+        const sizes = '(max-width: 768px) 100vw, 400px';
+
         const tagsHTML = post.tags.slice(0, 3).map(tag =>
             `<a href="#" class="post-tag" data-tag="${tag}">#${tag}</a>`
         ).join(' ');
@@ -71,7 +273,10 @@ class BlogManager {
         return `
             <article class="post-card" itemscope itemtype="http://schema.org/BlogPosting">
                 <div class="post-card__image-wrapper">
-                    <img src="${post.featuredImage}" alt="${post.title}" class="post-card__image" itemprop="image" loading="lazy">
+                    <picture>
+                        ${srcset ? `<source type="image/webp" srcset="${srcset.webp}" sizes="${sizes}">` : ''}
+                        <img src="${post.featuredImage}" ${srcset ? `srcset="${srcset.jpeg}" sizes="${sizes}"` : ''} alt="${post.title}" class="post-card__image" itemprop="image" loading="lazy">
+                    </picture>
                 </div>
                 <div class="post-card__content">
                     <div class="post-card__meta">
@@ -104,7 +309,7 @@ class BlogManager {
     }
 
     renderPagination() {
-        const totalPages = Math.ceil(this.filteredPosts.length / this.postsPerPage);
+        const totalPages = this.totalPages;
         const paginationContainer = document.getElementById('blogPagination');
 
         if (!paginationContainer) {
@@ -175,9 +380,9 @@ class BlogManager {
         });
     }
 
-    goToPage(page) {
+    async goToPage(page) {
         this.currentPage = page;
-        this.renderPosts();
+        await this.renderPosts();
         window.scrollTo({ top: 0, behavior: 'smooth' });
     }
 
@@ -188,17 +393,29 @@ class BlogManager {
         this.renderTagCloud();
     }
 
-    renderCalendar() {
+    async loadMonth(year, month) {
+        // Cards of the posts published in a month, from data/blog/months/YYYY-MM.json
+        const key = `${year}-${String(month + 1).padStart(2, '0')}`;
+        if (!this.summary.months[key]) return [];
+
+        try {
+            return await this.fetchJSON(`data/blog/months/${key}.json`);
+        } catch (error) {
+            console.error('Error loading calendar month:', error);
+            return [];
+        }
+    }
+
+    async renderCalendar() {
         const calendarContainer = document.getElementById('blogCalendar');
 
         // Initialize calendar state if not exists
         if (!this.calendarState) {
-            // Find the most recent post date
-            const recentPost = this.posts[0]; // Already sorted by date
-            const recentDate = new Date(recentPost.publishDate);
+            // Start at the month of the most recent post
+            const [year, month] = (this.summary.latestMonth || new Date().toISOString().slice(0, 7)).split('-');
             this.calendarState = {
-                month: recentDate.getMonth(),
-                year: recentDate.getFullYear()
+                month: parseInt(month) - 1,
+                year: parseInt(year)
             };
         }
 
@@ -213,8 +430,14 @@ class BlogManager {
         const daysInMonth = new Date(currentYear, currentMonth + 1, 0).getDate();
 
         // Build map of day -> posts for this month
+        const monthPosts = await this.loadMonth(currentYear, currentMonth);
+        if (currentMonth !== this.calendarState.month || currentYear !== this.calendarState.year) {
+            return; // Month changed while loading; a newer render is in progress
+        }
+        this.calendarPosts = monthPosts;
+
         const postsByDay = {};
-        this.posts.forEach(post => {
+        monthPosts.forEach(post => {
             const postDate = new Date(post.publishDate);
             if (postDate.getMonth() === currentMonth && postDate.getFullYear() === currentYear) {
                 const day = postDate.getDate();
@@ -292,7 +515,8 @@ class BlogManager {
         const targetDate = `${currentYear}-${String(currentMonth + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
 
         // Filter posts by this date
-        this.filteredPosts = this.posts.filter(post => post.publishDate === targetDate);
+        this.filteredPosts = this.calendarPosts.filter(post => post.publishDate === targetDate);
+        this.filterType = 'date';
         this.currentPage = 1;
         this.currentCategory = 'all';
 
@@ -330,7 +554,8 @@ class BlogManager {
 
     clearDateFilter() {
         // Reset to all posts
-        this.filteredPosts = [...this.posts];
+        this.filterType = 'category';
+        this.currentCategory = 'all';
         this.currentPage = 1;
         this.renderPosts();
 
@@ -360,23 +585,17 @@ class BlogManager {
 
     renderCategories() {
         const categoriesContainer = document.getElementById('blogCategories');
-        const categories = {};
-
-        // Count posts per category
-        this.posts.forEach(post => {
-            categories[post.category] = (categories[post.category] || 0) + 1;
-        });
 
         let categoriesHTML = `
             <li>
                 <a href="#" data-category="all" class="category-link ${this.currentCategory === 'all' ? 'active' : ''}">
                     All Posts
-                    <span class="category-count">${this.posts.length}</span>
+                    <span class="category-count">${this.summary.totalPosts}</span>
                 </a>
             </li>
         `;
 
-        Object.entries(categories).forEach(([category, count]) => {
+        this.summary.categories.forEach(({ name: category, count }) => {
             categoriesHTML += `
                 <li>
                     <a href="#" data-category="${category}" class="category-link ${this.currentCategory === category ? 'active' : ''}">
@@ -392,7 +611,7 @@ class BlogManager {
 
     renderRecentPosts() {
         const recentPostsContainer = document.getElementById('recentPosts');
-        const recentPosts = this.posts.slice(0, 5);
+        const recentPosts = this.summary.recent;
 
         const recentPostsHTML = recentPosts.map(post => {
             const date = new Date(post.publishDate);
@@ -417,19 +636,9 @@ class BlogManager {
 
     renderTagCloud() {
         const tagCloudContainer = document.getElementById('tagCloud');
-        const tagCounts = {};
 
-        // Count tag occurrences
-        this.posts.forEach(post => {
-            post.tags.forEach(tag => {
-                tagCounts[tag] = (tagCounts[tag] || 0) + 1;
-            });
-        });
-
-        // Sort tags by count
-        const sortedTags = Object.entries(tagCounts)
-            .sort((a, b) => b[1] - a[1])
-            .slice(0, 20);
+        // Top tags by count, precomputed in the summary
+        const sortedTags = this.summary.tags;
 
         // Determine tag sizes
         const maxCount = Math.max(...sortedTags.map(([, count]) => count));
@@ -446,15 +655,10 @@ class BlogManager {
     }
 
     filterByCategory(category) {
+        this.filterType = 'category';
         this.currentCategory = category;
         this.currentPage = 1;
 
-        if (category === 'all') {
-            this.filteredPosts = [...this.posts];
-        } else {
-            this.filteredPosts = this.posts.filter(post => post.category === category);
-        }
-
         this.renderPosts();
 
         // Update active category
@@ -466,10 +670,20 @@ class BlogManager {
         });
     }
 
-    filterByTag(tag) {
+    async filterByTag(tag) {
         this.currentCategory = 'all';
         this.currentPage = 1;
-        this.filteredPosts = this.posts.filter(post => post.tags.includes(tag));
+
+        try {
+            const [index, listing] = await Promise.all([this.loadSearchIndex(), this.loadListing()]);
+            this.filteredPosts = this.decodeGaps(index.tags[tag] || []).map(doc => listing[doc]);
+            this.filterType = 'tag';
+        } catch (error) {
+            console.error('Error loading blog posts:', error);
+            this.showError();
+            return;
+        }
+
         this.renderPosts();
     }
 
@@ -502,6 +716,22 @@ class BlogManager {
                 this.filterByTag(e.target.dataset.tag);
             }
         });
+
+        // Search
+        const searchForm = document.getElementById('blogSearch');
+        const searchInput = document.getElementById('blogSearchInput');
+        if (searchForm && searchInput) {
+            let searchTimer;
+            searchForm.addEventListener('submit', (e) => {
+                e.preventDefault();
+                clearTimeout(searchTimer);
+                this.searchPosts(searchInput.value);
+            });
+            searchInput.addEventListener('input', () => {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => this.searchPosts(searchInput.value), 250);
+            });
+        }
     }
 
     showError() {
@@ -2,111 +2,36 @@
 """
 Analyze WordPress export.xml to extract correct post-to-image relationships
 and fix featured images in blog-posts.json
+
+Usage:
+    python3 scripts/analyze_correct_images.py [--download]
+        (--download fetches the images missing locally into imagenes-blog)
 """
 
-import xml.etree.ElementTree as ET
-import json
-import os
+import argparse
 from pathlib import Path
-from typing import Dict, Optional
+from typing import List, Optional
+
+from blog_data import load_posts, save_posts
+from migrate_wordpress_posts import ImageIndex, WXRIndex
 
 class WordPressImageAnalyzer:
-    def __init__(self, xml_path: str, images_dir: str):
+    def __init__(self, xml_path: str, images_dir: str, store_path: Optional[Path] = None):
         self.xml_path = xml_path
+        self.store_path = store_path
         self.images_dir = Path(images_dir)
-        self.namespaces = {
-            'content': 'http://purl.org/rss/1.0/modules/content/',
-            'wp': 'http://wordpress.org/export/1.2/',
-            'dc': 'http://purl.org/dc/elements/1.1/',
-            'excerpt': 'http://wordpress.org/export/1.2/excerpt/'
-        }
 
         # Maps
-        self.attachment_map = {}  # attachment_id -> {url, filename}
+        self.attachment_map = {}  # attachment_id -> {url, filename, post_name, parent}
         self.post_thumbnail_map = {}  # post_name -> attachment_id
-        self.available_images = self._scan_local_images()
-
-    def _scan_local_images(self) -> Dict[str, str]:
-        """Scan local images directory and create filename map."""
-        image_map = {}
-
-        if not self.images_dir.exists():
-            return image_map
-
-        for file_path in self.images_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                filename = file_path.name
-                # Store lowercase key for case-insensitive matching
-                image_map[filename.lower()] = filename
-
-        return image_map
+        self.image_index = ImageIndex.for_directory(images_dir)
 
     def parse_xml(self):
         """Parse XML and extract attachments and post-thumbnail relationships."""
-        print("📖 Parsing WordPress export XML...")
-
-        tree = ET.parse(self.xml_path)
-        root = tree.getroot()
-        channel = root.find('channel')
-
-        if not channel:
-            print("❌ No channel found in XML")
-            return
-
-        items = channel.findall('item')
-        print(f"   Found {len(items)} items in XML")
-
-        # First pass: collect all attachments
-        for item in items:
-            post_type = item.find('wp:post_type', self.namespaces)
-            if post_type is not None and post_type.text == 'attachment':
-                self._process_attachment(item)
-
-        print(f"   Found {len(self.attachment_map)} attachments")
-
-        # Second pass: collect post-thumbnail relationships
-        for item in items:
-            post_type = item.find('wp:post_type', self.namespaces)
-            status = item.find('wp:status', self.namespaces)
-
-            if post_type is not None and post_type.text == 'post':
-                if status is not None and status.text == 'publish':
-                    self._process_post_thumbnail(item)
-
-        print(f"   Found {len(self.post_thumbnail_map)} post-thumbnail relationships")
-
-    def _process_attachment(self, item):
-        """Extract attachment information."""
-        attachment_id = self._get_text(item.find('wp:post_id', self.namespaces))
-        attachment_url = self._get_text(item.find('wp:attachment_url', self.namespaces))
-        post_name = self._get_text(item.find('wp:post_name', self.namespaces))
-
-        if attachment_id and attachment_url:
-            filename = attachment_url.split('/')[-1]
-            self.attachment_map[attachment_id] = {
-                'url': attachment_url,
-                'filename': filename,
-                'post_name': post_name
-            }
-
-    def _process_post_thumbnail(self, item):
-        """Extract post thumbnail ID for each post."""
-        post_name = self._get_text(item.find('wp:post_name', self.namespaces))
-
-        # Look for _thumbnail_id in postmeta
-        for meta in item.findall('wp:postmeta', self.namespaces):
-            key = self._get_text(meta.find('wp:meta_key', self.namespaces))
-            if key == '_thumbnail_id':
-                thumbnail_id = self._get_text(meta.find('wp:meta_value', self.namespaces))
-                if post_name and thumbnail_id:
-                    self.post_thumbnail_map[post_name] = thumbnail_id
-                break
-
-    def _get_text(self, element) -> str:
-        """Safely extract text from XML element."""
-        if element is not None and element.text:
-            return element.text.strip()
-        return ''
+        index = WXRIndex.build(self.xml_path, self.store_path)
+
+        self.attachment_map = index.attachments
+        self.post_thumbnail_map = index.thumbnails
 
     def get_correct_image_for_post(self, post_slug: str) -> Optional[str]:
         """Get the correct local image path for a post."""
@@ -133,31 +58,13 @@ class WordPressImageAnalyzer:
 
     def _find_local_image(self, wp_filename: str) -> Optional[str]:
         """Find local image matching WordPress filename."""
-        # Try exact match (case-insensitive)
-        if wp_filename.lower() in self.available_images:
-            return self.available_images[wp_filename.lower()]
-
-        # Try without size suffix (-300x200, -1024x768, etc.)
-        import re
-        base_filename = re.sub(r'-\d+x\d+(\.[a-z]+)$', r'\1', wp_filename)
-        if base_filename.lower() in self.available_images:
-            return self.available_images[base_filename.lower()]
-
-        # Try fuzzy match on base name
-        base_name_no_ext = os.path.splitext(base_filename)[0].lower()
-        for local_key, local_filename in self.available_images.items():
-            local_base = os.path.splitext(local_filename)[0].lower()
-            if base_name_no_ext in local_base or local_base in base_name_no_ext:
-                return local_filename
-
-        return None
+        return self.image_index.find(wp_filename)
 
     def analyze_and_fix(self, posts_json_path: str):
         """Analyze current posts and fix incorrect images."""
         print("\n🔍 Analyzing current blog posts...")
 
-        with open(posts_json_path, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
+        posts = load_posts(Path(posts_json_path))
 
         corrections = []
         missing_images = []
@@ -211,8 +118,7 @@ class WordPressImageAnalyzer:
 
         # Save updated posts
         if corrections:
-            with open(posts_json_path, 'w', encoding='utf-8') as f:
-                json.dump(posts, f, indent=2, ensure_ascii=False)
+            save_posts(posts, Path(posts_json_path))
 
         # Print report
         print("\n" + "="*70)
@@ -253,13 +159,19 @@ class WordPressImageAnalyzer:
         return corrections, missing_images
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Fix blog featured images from the WordPress export.')
+    arg_parser.add_argument('--download', action='store_true',
+                            help='download the images missing locally from WordPress')
+    args = arg_parser.parse_args(argv)
+
     base_dir = Path('/Users/miguel/Desktop/CarlosRodgarman.com')
     xml_path = '/Users/miguel/Desktop/export.xml'
     images_dir = base_dir / 'assets' / 'images' / 'imagenes-blog'
     posts_json_path = base_dir / 'data' / 'blog-posts.json'
+    wxr_store_path = base_dir / 'data' / '.wxr-cache.sqlite'
 
-    analyzer = WordPressImageAnalyzer(xml_path, str(images_dir))
+    analyzer = WordPressImageAnalyzer(xml_path, str(images_dir), wxr_store_path)
     analyzer.parse_xml()
     corrections, missing = analyzer.analyze_and_fix(str(posts_json_path))
 
@@ -269,6 +181,14 @@ def main():
     else:
         print("\n✅ Todas las imágenes ya estaban correctas")
 
+    if missing and args.download:
+        from download_media import download_missing, print_results
+
+        print(f"\n📡 Descargando {len(missing)} imágenes faltantes en {images_dir}")
+        print_results(download_missing(missing, images_dir, state_path=base_dir / 'data' / '.media-downloads.json'))
+    elif missing:
+        print(f"\nℹ️  {len(missing)} imágenes faltantes: vuelve a ejecutar con --download para descargarlas")
+
     return 0
 
 
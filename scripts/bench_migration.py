@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark the WordPress migration path on synthetic exports.
+
+For each size (posts) a synthetic export and uploads directory are
+generated (and kept in --workdir for later runs), then a fresh process
+times each stage:
+
+- parse:     WXRIndex.build (streaming parse, attachments, thumbnails)
+- index:     ImageManager over the uploads directory (ImageIndex build)
+- transform: ContentTransformer.transform over every post body
+- images:    ImageManager.find_local_image for every image URL and thumbnail
+- build:     PostBuilder.build for every post (serial, no build cache)
+
+It reports throughput and the peak RSS of the process per size (best of
+--repeat runs, each in its own process). Results are written as JSON and
+compared with a stored baseline. A stage whose throughput drops, or a
+size whose peak RSS grows, by more than --tolerance is a regression and
+makes the run exit with status 1.
+
+Usage:
+    python3 scripts/bench_migration.py [--sizes 1000,10000,100000] [--repeat 3] [--output results.json]
+        [--baseline scripts/bench_baseline.json] [--save-baseline] [--tolerance 0.15]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from generate_wxr import write_export, write_uploads
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [1000, 10000, 100000]
+BASELINE_PATH = Path(__file__).parent / 'bench_baseline.json'
+WORKDIR = Path(tempfile.gettempdir()) / 'wxr-bench'
+
+# Generator settings (part of the workdir key, so changing them regenerates)
+EXPORT_SETTINGS = {'attachments_per_post': 3, 'gallery_rate': 0.3, 'postmeta': 8, 'seed': 42}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def prepare(size: int, workdir: Path) -> Dict[str, Path]:
+    """Generate (or reuse) the export and uploads directory for a size."""
+    key = '-'.join(f'{value}' for value in EXPORT_SETTINGS.values())
+    directory = workdir / f'{size}-{key}'
+    export = directory / 'export.xml'
+    uploads = directory / 'uploads'
+
+    if not (directory / 'complete').exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        print(f"🧪 Generating {size} post export in {directory}...")
+        attachments = write_export(export, size, **EXPORT_SETTINGS)
+        write_uploads(uploads, attachments, EXPORT_SETTINGS['seed'])
+        (directory / 'complete').touch()
+
+    return {'export': export, 'uploads': uploads}
+
+
+def timed(stages: Dict, name: str, items: int, nbytes: int, start: float):
+    seconds = time.perf_counter() - start
+    stages[name] = {
+        'seconds': round(seconds, 4),
+        'items': items,
+        'per_second': round(items / seconds, 1) if seconds else None,
+        'mb_per_second': round(nbytes / 1e6 / seconds, 2) if seconds and nbytes else None,
+        'rss_mb': peak_rss_mb(),
+    }
+
+
+def run_stages(export: Path, uploads: Path) -> Dict:
+    """Time every stage in this process. Returns the size's results."""
+    from migrate_wordpress_posts import ContentTransformer, ImageManager, PostBuilder, WXRIndex
+
+    stages: Dict[str, Dict] = {}
+    export_bytes = export.stat().st_size
+
+    # Library progress output is not part of the measurement
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        wxr_index = WXRIndex.build(str(export))
+        posts = wxr_index.posts
+        timed(stages, 'parse', len(posts), export_bytes, start)
+
+        start = time.perf_counter()
+        image_manager = ImageManager(str(uploads))
+        timed(stages, 'index', len(image_manager.image_index.names), 0, start)
+
+        transformer = ContentTransformer()
+        content_bytes = sum(len(post['content'].encode('utf-8')) for post in posts)
+        start = time.perf_counter()
+        contents = [transformer.transform(post['content']) for post in posts]
+        timed(stages, 'transform', len(posts), content_bytes, start)
+
+        urls = [url for content in contents for url in transformer.img_src_pattern.findall(content)]
+        urls += [attachment['url'] for attachment in wxr_index.attachments.values()]
+        start = time.perf_counter()
+        found = sum(1 for url in urls if image_manager.find_local_image(url))
+        timed(stages, 'images', len(urls), 0, start)
+        stages['images']['found'] = found
+
+        # A fresh manager so the build stage does not reuse the lookups above
+        image_manager = ImageManager(str(uploads))
+        builder = PostBuilder(image_manager, ContentTransformer(), wxr_index)
+        start = time.perf_counter()
+        for post in posts:
+            builder.build(post)
+        timed(stages, 'build', len(posts), content_bytes, start)
+
+    return {'posts': len(posts), 'export_mb': round(export_bytes / 1e6, 2),
+            'stages': stages, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_size(size: int, workdir: Path, repeat: int = 1) -> Dict:
+    """Benchmark one size, each run in a fresh process so peak RSS is its own.
+
+    Keeps the fastest run of each stage and the lowest peak RSS.
+    """
+    paths = prepare(size, workdir)
+    command = [sys.executable, __file__, '--child', str(paths['export']), str(paths['uploads'])]
+
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None:
+            best = result
+            continue
+        for stage, data in result['stages'].items():
+            if data['seconds'] < best['stages'][stage]['seconds']:
+                best['stages'][stage] = data
+        if result['peak_rss_mb'] is not None:
+            best['peak_rss_mb'] = min(best['peak_rss_mb'], result['peak_rss_mb'])
+    return best
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print a comparison table. Returns regression messages."""
+    regressions = []
+    print()
+    print(f"{'size':>8} {'stage':<10} {'baseline/s':>12} {'current/s':>12} {'change':>8}")
+    for size, current in results['sizes'].items():
+        base = baseline['sizes'].get(size)
+        if not base:
+            continue
+        for stage, data in current['stages'].items():
+            before = base['stages'].get(stage, {}).get('per_second')
+            after = data['per_second']
+            if not before or not after:
+                continue
+            change = after / before - 1
+            flag = '  ⚠️' if change < -tolerance else ''
+            print(f"{size:>8} {stage:<10} {before:>12.1f} {after:>12.1f} {change:>+7.1%}{flag}")
+            if change < -tolerance:
+                regressions.append(f"{size} posts, {stage}: {change:+.1%} throughput")
+
+        before, after = base.get('peak_rss_mb'), current.get('peak_rss_mb')
+        if before and after:
+            change = after / before - 1
+            flag = '  ⚠️' if change > tolerance else ''
+            print(f"{size:>8} {'peak RSS':<10} {before:>10.1f}MB {after:>10.1f}MB {change:>+7.1%}{flag}")
+            if change > tolerance:
+                regressions.append(f"{size} posts, peak RSS: {change:+.1%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Benchmark the WordPress migration path.')
+    arg_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help='comma-separated post counts')
+    arg_parser.add_argument('--repeat', type=int, default=1, help='runs per size (best is kept)')
+    arg_parser.add_argument('--workdir', type=Path, default=WORKDIR, help='where generated exports are kept')
+    arg_parser.add_argument('--output', type=Path, help='write results JSON here')
+    arg_parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='baseline results JSON')
+    arg_parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    arg_parser.add_argument('--tolerance', type=float, default=0.15,
+                            help='allowed throughput drop / RSS growth before a regression is reported')
+    arg_parser.add_argument('--child', nargs=2, metavar=('EXPORT', 'UPLOADS'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_stages(Path(args.child[0]), Path(args.child[1]))))
+        return 0
+
+    results = {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': EXPORT_SETTINGS,
+        'repeat': args.repeat,
+        'sizes': {},
+    }
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        result = run_size(size, args.workdir, args.repeat)
+        results['sizes'][str(size)] = result
+
+        print(f"📊 {size} posts ({result['export_mb']} MB export), peak RSS {result['peak_rss_mb']:.0f} MB")
+        for stage, data in result['stages'].items():
+            rate = f"{data['per_second']:>12,.0f}/s"
+            mb_rate = f"  {data['mb_per_second']:>7.2f} MB/s" if data['mb_per_second'] else ''
+            print(f"   {stage:<10} {data['items']:>8} items  {data['seconds']:>8.3f}s {rate}{mb_rate}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"💾 Results written to {args.output}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print()
+            print(f"❌ {len(regressions)} regressions beyond {args.tolerance:.0%}:")
+            for message in regressions:
+                print(f"   {message}")
+        else:
+            print(f"\n✓ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    exit(main())
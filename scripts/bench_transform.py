@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark ContentTransformer.transform (the single-scan RewriteEngine)
+against the same rewrites as separate re.sub passes followed by the
+HTMLParser-based tag balancer.
+
+Reports throughput in MB/s and checks that both produce the same output.
+Uses post bodies from a WordPress export when one is given, otherwise a
+synthetic Gutenberg corpus.
+
+Usage:
+    python3 scripts/bench_transform.py [--export export.xml] [--posts 2000] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from typing import Callable, List
+
+from migrate_wordpress_posts import ContentTransformer, WordPressParser
+
+
+def synthetic_post(rng: random.Random, index: int) -> str:
+    """Build one Gutenberg post body with paragraphs, images and a gallery."""
+    blocks = []
+    for _ in range(rng.randint(4, 12)):
+        kind = rng.random()
+        if kind < 0.6:
+            words = ' '.join(rng.choice(['studio', 'mix', 'neve', 'analog', 'session', 'record'])
+                             for _ in range(rng.randint(20, 80)))
+            blocks.append(f'<!-- wp:paragraph -->\n<p>{words}</p>\n<!-- /wp:paragraph -->')
+        elif kind < 0.8:
+            image_id = rng.randint(1, 9999)
+            blocks.append(
+                f'<!-- wp:image {{"id":{image_id}}} -->\n'
+                f'<figure class="wp-block-image"><img src="https://carlosrodgarman.com/wp-content/uploads/'
+                f'2020/01/photo-{image_id}-1024x768.jpg" alt="" class="wp-image-{image_id}"/></figure>\n'
+                f'<!-- /wp:image -->'
+            )
+        elif kind < 0.9:
+            items = ''.join(
+                f'<li class="blocks-gallery-item"><figure><img src="https://carlosrodgarman.com/wp-content/'
+                f'uploads/2020/01/g-{index}-{n}.jpg" data-id="{n}" data-full-url="x" data-link="y" '
+                f'class="wp-image-{n}"/></figure></li>'
+                for n in range(rng.randint(2, 8))
+            )
+            blocks.append(f'<!-- wp:gallery -->\n<ul class="wp-block-gallery columns-3 is-cropped">{items}</ul>\n'
+                          f'<!-- /wp:gallery -->')
+        else:
+            blocks.append('<!-- wp:paragraph -->\n<p> </p>\n<!-- /wp:paragraph -->')
+    return '\n\n'.join(blocks)
+
+
+def load_corpus(export_path: str, post_count: int) -> List[str]:
+    """Return post bodies from an export, or a synthetic corpus."""
+    if export_path:
+        return [post['content'] for post in WordPressParser(export_path).iter_posts()]
+
+    rng = random.Random(42)
+    return [synthetic_post(rng, i) for i in range(post_count)]
+
+
+def measure(transform: Callable[[str], str], corpus: List[str], repeat: int) -> float:
+    """Return the best wall time (seconds) of transforming the corpus."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in corpus:
+            transform(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--export', help='WordPress export (.xml or .xml.gz) to take post bodies from')
+    arg_parser.add_argument('--posts', type=int, default=2000, help='synthetic posts to generate')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timed runs of each implementation (best is kept)')
+    args = arg_parser.parse_args()
+
+    engine = ContentTransformer().engine
+    corpus = load_corpus(args.export, args.posts)
+    size_mb = sum(len(content.encode('utf-8')) for content in corpus) / 1e6
+
+    def single_scan(content: str) -> str:
+        return engine.rewrite(content, Counter(), Counter())
+
+    def multipass(content: str) -> str:
+        return engine.rewrite_multipass(content, Counter(), Counter())
+
+    mismatches = sum(1 for content in corpus if content and single_scan(content) != multipass(content))
+    fused = measure(single_scan, corpus, args.repeat)
+    chained = measure(multipass, corpus, args.repeat)
+
+    print(f"Corpus: {len(corpus)} posts, {size_mb:.2f} MB")
+    print(f"Multi-pass + HTMLParser: {size_mb / chained:8.2f} MB/s")
+    print(f"Single scan:             {size_mb / fused:8.2f} MB/s  ({chained / fused:.2f}x)")
+    print(f"Output mismatches: {mismatches}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    exit(main())
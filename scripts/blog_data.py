@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Shared loading and saving of data/blog-posts.json for the fix-up tooling.
+
+save_posts() only touches the file when its serialized content actually
+changes, writes through a temporary file and an atomic rename, and appends
+a per-post change journal next to the file so incremental consumers can
+rebuild just the posts that changed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+POSTS_PATH = Path('data/blog-posts.json')
+BACKUP_PATH = Path('data/blog-posts.json.backup')
+
+
+def load_posts(posts_path: Path = POSTS_PATH) -> List[Dict]:
+    """Load the blog posts array."""
+    with open(posts_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def serialize_posts(posts: List[Dict]) -> str:
+    """Serialize posts in the repo's JSON layout."""
+    return json.dumps(posts, indent=2, ensure_ascii=False)
+
+
+def journal_path(posts_path: Path) -> Path:
+    """Change journal of a posts file, e.g. data/blog-posts.journal.jsonl."""
+    posts_path = Path(posts_path)
+    return posts_path.with_name(posts_path.stem + '.journal.jsonl')
+
+
+def post_hashes(posts: List[Dict]) -> Dict[str, str]:
+    """Map each post ID to a hash of its canonical JSON."""
+    hashes = {}
+    for i, post in enumerate(posts):
+        post_id = str(post.get('id', f'#{i}'))
+        payload = json.dumps(post, sort_keys=True, ensure_ascii=False)
+        hashes[post_id] = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return hashes
+
+
+def diff_posts(old_posts: List[Dict], new_posts: List[Dict]) -> Dict[str, List[str]]:
+    """Return the IDs of added, removed and changed posts."""
+    old_hashes = post_hashes(old_posts)
+    new_hashes = post_hashes(new_posts)
+
+    return {
+        'added': [post_id for post_id in new_hashes if post_id not in old_hashes],
+        'removed': [post_id for post_id in old_hashes if post_id not in new_hashes],
+        'changed': [post_id for post_id, digest in new_hashes.items()
+                    if post_id in old_hashes and old_hashes[post_id] != digest],
+    }
+
+
+def save_posts(posts: List[Dict], posts_path: Path = POSTS_PATH) -> Optional[Dict]:
+    """Write the blog posts array if it changed, atomically.
+
+    Returns None when the file already holds exactly this content (nothing
+    is written), otherwise the journal entry describing the write.
+    """
+    posts_path = Path(posts_path)
+    data = serialize_posts(posts).encode('utf-8')
+    new_digest = hashlib.sha256(data).hexdigest()
+
+    old_data = posts_path.read_bytes() if posts_path.exists() else None
+    old_digest = hashlib.sha256(old_data).hexdigest() if old_data is not None else None
+    if old_digest == new_digest:
+        return None
+
+    try:
+        old_posts = json.loads(old_data) if old_data is not None else []
+    except ValueError:
+        old_posts = []
+
+    return write_journaled(posts_path, data, old_digest, diff_posts(old_posts, posts))
+
+
+def write_journaled(posts_path: Path, data: bytes, previous_sha256: Optional[str],
+                    changes: Dict[str, List[str]]) -> Dict:
+    """Atomically write serialized posts and journal the added/removed/changed IDs.
+
+    Returns the journal entry.
+    """
+    posts_path = Path(posts_path)
+    _atomic_write(posts_path, data)
+
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'file': str(posts_path),
+        'previous_sha256': previous_sha256,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        **changes,
+    }
+    with open(journal_path(posts_path), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    return entry
+
+
+def describe_save(entry: Optional[Dict], posts_path: Path = POSTS_PATH) -> str:
+    """One-line summary of a save_posts() result."""
+    if entry is None:
+        return f"No changes - {posts_path} left untouched"
+    return (f"Wrote {posts_path}: {len(entry['changed'])} changed, "
+            f"{len(entry['added'])} added, {len(entry['removed'])} removed")
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write bytes unless the file already holds them. Returns True if written."""
+    path = Path(path)
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(path, data)
+    return True
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write bytes via a temporary file in the same directory and rename it into place."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            mode = path.stat().st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Lazy, read-only access to a posts file without loading it.
+
+BlogStore memory-maps data/blog-posts.json (or an NDJSON file with one
+post per line) and reads posts through a byte-offset index: for every
+post, the span of the post and of each of its top-level fields. Asking
+for a post or a single field decodes just those bytes, so a report that
+needs ids and titles never decodes a post's content, and memory stays
+flat however large the archive grows.
+
+    with BlogStore.open() as store:
+        for post_id, title in store.rows('id', 'title'):
+            ...
+        store.field(0, 'publishDate')   # one field of the first post
+        store.get('post-123')           # one whole post, by ID
+
+The index is built by one scan of the file's structure (strings are
+skipped whole, nothing is decoded) and kept in a sidecar file next to it,
+e.g. data/.blog-posts.json.offsets: a JSON header (file size and mtime,
+field names, post IDs) followed by the offsets as a flat array of 64-bit
+integers, which is memory-mapped too. Opening a store whose file did not
+change reads the header and nothing else; a changed file is scanned again.
+
+Usage:
+    python3 scripts/blog_store.py [--posts data/blog-posts.json] [--fields id,title,publishDate]
+        [--id ID] [--rebuild]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from blog_data import POSTS_PATH, write_if_changed
+
+INDEX_VERSION = 1
+
+# The tokens that make up a JSON document's structure; a string is one token
+STRUCTURE_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},:]')
+
+OPEN_OBJECT, CLOSE_OBJECT, OPEN_ARRAY, CLOSE_ARRAY, COMMA, COLON, QUOTE = b'{}[],:"'
+
+MISSING = -1  # offset of a field the post does not have
+
+
+def index_path(posts_path: Path) -> Path:
+    """Offset index of a posts file, e.g. data/.blog-posts.json.offsets."""
+    posts_path = Path(posts_path)
+    return posts_path.with_name(f'.{posts_path.name}.offsets')
+
+
+def scan_posts(data) -> Tuple[List[str], List[Tuple[int, int, Dict[str, Tuple[int, int]]]]]:
+    """Spans of each post and of its top-level fields in a JSON array or NDJSON buffer.
+
+    Returns the field names in order of first appearance and, per post,
+    (start, end, {field: (start, end)}). Field spans include any
+    whitespace around the value.
+    """
+    first = re.compile(rb'\s*').match(data).end()
+    base = 1 if data[first:first + 1] == b'[' else 0  # depth at which posts open
+
+    keys: Dict[str, None] = {}
+    posts = []
+    depth = 0
+    post_start = 0
+    fields: Dict[str, Tuple[int, int]] = {}
+    key = None
+    value_start = None  # set while inside a top-level field's value
+
+    for match in STRUCTURE_TOKEN.finditer(data):
+        token = data[match.start()]
+        if depth == base + 1:
+            # Directly inside a post: keys, colons and the separators that end values
+            if token == QUOTE:
+                if value_start is None:
+                    key = match.group()
+                continue
+            if token == COLON:
+                value_start = match.end()
+                continue
+            if token == COMMA or token == CLOSE_OBJECT:
+                if value_start is not None:
+                    name = json.loads(key)
+                    fields[name] = (value_start, match.start())
+                    keys[name] = None
+                    value_start = None
+
+        if token == OPEN_OBJECT or token == OPEN_ARRAY:
+            if depth == base and token == OPEN_OBJECT:
+                post_start = match.start()
+                fields = {}
+            depth += 1
+        elif token == CLOSE_OBJECT or token == CLOSE_ARRAY:
+            depth -= 1
+            if depth < 0:
+                raise ValueError(f'Unbalanced {chr(token)} at byte {match.start()}')
+            if depth == base and token == CLOSE_OBJECT:
+                posts.append((post_start, match.end(), fields))
+
+    if depth != 0:
+        raise ValueError('Truncated JSON: unclosed object or array')
+    return list(keys), posts
+
+
+class BlogStore:
+    """Posts of one file, decoded a post or a field at a time; open() builds or loads the index.
+
+    The posts file and its index stay mapped until close(), or the end of a
+    with block.
+    """
+
+    def __init__(self, posts_path: Path, data: mmap.mmap, header: Dict, offsets: memoryview,
+                 index: Optional[mmap.mmap] = None):
+        self.posts_path = Path(posts_path)
+        self.built = False  # True if open() scanned the file in this run
+        self.keys: List[str] = header['keys']
+        self.ids: List[Optional[str]] = header['ids']
+        self._data = data
+        self._index = index      # the mapped index file, when it was loaded rather than built
+        self._offsets = offsets  # per post: start, end, then (start, end) of each key
+        self._stride = 2 + 2 * len(self.keys)
+        self._key_slots = {key: 2 + 2 * i for i, key in enumerate(self.keys)}
+        self._positions: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def open(cls, posts_path: Path = POSTS_PATH, offsets_path: Optional[Path] = None,
+             rebuild: bool = False) -> 'BlogStore':
+        """Map a posts file, scanning it first unless its index is current."""
+        posts_path = Path(posts_path)
+        offsets_path = Path(offsets_path) if offsets_path else index_path(posts_path)
+        with open(posts_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if not stat.st_size:
+                raise ValueError(f'{posts_path} is empty')
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if not rebuild:
+            loaded = cls._load_index(offsets_path, stat)
+            if loaded:
+                return cls(posts_path, data, *loaded)
+
+        store = cls(posts_path, data, *cls._build_index(data, offsets_path, stat))
+        store.built = True
+        return store
+
+    @staticmethod
+    def _load_index(offsets_path: Path, stat: os.stat_result):
+        """(header, offsets, index mapping) of an index made for this exact file, or None."""
+        try:
+            with open(offsets_path, 'rb') as f:
+                line = f.readline()
+                header = json.loads(line)
+                if (header.get('version'), header.get('byteorder'), header.get('size'), header.get('mtime')) != (
+                        INDEX_VERSION, sys.byteorder, stat.st_size, stat.st_mtime_ns):
+                    return None
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(index) - len(line) != 8 * header['count'] * (2 + 2 * len(header['keys'])):
+            index.close()
+            return None
+        with memoryview(index) as view:
+            offsets = view[len(line):].cast('q')
+        return header, offsets, index
+
+    @staticmethod
+    def _build_index(data: mmap.mmap, offsets_path: Path, stat: os.stat_result):
+        keys, posts = scan_posts(data)
+        offsets = array('q')
+        ids = []
+        for start, end, fields in posts:
+            offsets.extend((start, end))
+            for key in keys:
+                offsets.extend(fields.get(key, (MISSING, MISSING)))
+            span = fields.get('id')
+            post_id = json.loads(data[span[0]:span[1]]) if span else None
+            ids.append(str(post_id) if post_id is not None else None)
+
+        header = {'version': INDEX_VERSION, 'byteorder': sys.byteorder, 'size': stat.st_size,
+                  'mtime': stat.st_mtime_ns, 'count': len(posts), 'keys': keys, 'ids': ids}
+        # The header line is padded so the offsets start at a multiple of 8 bytes
+        line = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        line += b' ' * (-(len(line) + 1) % 8) + b'\n'
+
+        try:
+            write_if_changed(offsets_path, line + offsets.tobytes())
+        except OSError:
+            pass  # read-only directory: the index is still usable in memory
+        return header, memoryview(offsets)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _span(self, index: int, key: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        if not 0 <= index < len(self.ids):
+            raise IndexError(f'post index {index} out of range')
+        slot = index * self._stride
+        if key is not None:
+            if key not in self._key_slots:
+                return None
+            slot += self._key_slots[key]
+        start = self._offsets[slot]
+        return None if start == MISSING else (start, self._offsets[slot + 1])
+
+    def raw(self, index: int, key: Optional[str] = None) -> Optional[bytes]:
+        """Undecoded JSON of a post, or of one of its fields (None if it has no such field)."""
+        span = self._span(index, key)
+        return self._data[span[0]:span[1]].strip() if span else None
+
+    def post(self, index: int) -> Dict:
+        """The post at a position in the file."""
+        start, end = self._span(index)
+        return json.loads(self._data[start:end])
+
+    def field(self, index: int, key: str, default=None):
+        """One field of the post at a position, decoding nothing else."""
+        span = self._span(index, key)
+        return json.loads(self._data[span[0]:span[1]]) if span else default
+
+    def position(self, post_id: str) -> Optional[int]:
+        """Position of the post with this ID (the first one, if IDs repeat)."""
+        if self._positions is None:
+            self._positions = {}
+            for i, known_id in enumerate(self.ids):
+                self._positions.setdefault(known_id, i)
+        return self._positions.get(str(post_id))
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        index = self.position(post_id)
+        return self.post(index) if index is not None else None
+
+    def values(self, key: str, default=None) -> Iterator:
+        """One field of every post, in file order."""
+        for index in range(len(self)):
+            yield self.field(index, key, default)
+
+    def rows(self, *keys: str) -> Iterator[Tuple]:
+        """Tuples of the given fields of every post, in file order."""
+        for index in range(len(self)):
+            yield tuple(self.field(index, key) for key in keys)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self.post(index)
+
+    def close(self):
+        """Unmap the posts file and its index."""
+        self._offsets.release()
+        if self._index is not None:
+            self._index.close()
+        self._data.close()
+
+    def __enter__(self) -> 'BlogStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='List fields of the blog posts without loading the file.')
+    arg_parser.add_argument('--posts', type=Path, default=POSTS_PATH, help='posts JSON (array or NDJSON) file')
+    arg_parser.add_argument('--fields', default='id,title,publishDate',
+                            help='comma-separated fields to print, one tab-separated line per post')
+    arg_parser.add_argument('--id', help='print this post as JSON instead')
+    arg_parser.add_argument('--rebuild', action='store_true', help='scan the file even if its index is current')
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with BlogStore.open(args.posts, rebuild=args.rebuild) as store:
+        print(f"📇 {len(store)} posts in {args.posts} ({'indexed' if store.built else 'index current'}, "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+
+        if args.id:
+            post = store.get(args.id)
+            if post is None:
+                print(f"❌ No post with ID {args.id}", file=sys.stderr)
+                return 1
+            print(json.dumps(post, indent=2, ensure_ascii=False))
+            return 0
+
+        keys = [key.strip() for key in args.fields.split(',') if key.strip()]
+        for row in store.rows(*keys):
+            print('\t'.join('' if value is None else str(value) for value in row))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
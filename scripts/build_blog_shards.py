@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Build the sharded blog data consumed by js/blog.js and js/blog-post.js.
+
+From data/blog-posts.json this writes data/blog/:
+- summary.json              sidebar data (categories, recent posts, tag cloud, months)
+- index.json                compact listing of every post with card fields only
+- pages/<category>/<n>.json listing pages of POSTS_PER_PAGE cards ("all" = every post)
+- months/<YYYY-MM>.json     cards of the posts published in a month (calendar)
+- posts/<id>.json           one full post per file
+- search.json               inverted search index (see build_search_index.py)
+- search-trigrams.json      trigram table for fuzzy search queries
+
+The blog page only fetches the summary and the page it shows, and a post
+page only fetches its own file, so bytes transferred stay flat as the
+archive grows. Files are only rewritten when their content changes, and
+shards of posts that no longer exist are removed.
+
+Usage:
+    python3 scripts/build_blog_shards.py [--posts data/blog-posts.json] [--out data/blog]
+"""
+
+import argparse
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from blog_data import POSTS_PATH, load_posts, write_if_changed
+from build_search_index import build_search_index, build_trigram_table
+
+SHARDS_DIR = Path('data/blog')
+
+# Must match BlogManager.postsPerPage in js/blog.js
+POSTS_PER_PAGE = 4
+RECENT_POSTS = 5
+TAG_CLOUD_SIZE = 20
+
+CARD_FIELDS = ('id', 'title', 'excerpt', 'featuredImage', 'featuredImageSrcset', 'category', 'tags',
+               'author', 'publishDate', 'updatedDate')
+
+# Post IDs become file names
+SAFE_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+
+def slugify(text: str) -> str:
+    """Convert a category name to a URL-safe slug."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^\w\s-]', '', text.lower())
+    return re.sub(r'[-\s]+', '-', text).strip('-') or 'category'
+
+
+def to_card(post: Dict) -> Dict:
+    """Reduce a post to the fields a listing card needs."""
+    return {field: post[field] for field in CARD_FIELDS if field in post}
+
+
+def encode(data) -> bytes:
+    """Compact JSON encoding used for every shard."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def category_slugs(categories: List[str]) -> Dict[str, str]:
+    """Assign each category a unique slug ('all' is reserved)."""
+    slugs = {}
+    used = {'all'}
+    for category in categories:
+        base = slugify(category)
+        slug = base
+        n = 2
+        while slug in used:
+            slug = f'{base}-{n}'
+            n += 1
+        slugs[category] = slug
+        used.add(slug)
+    return slugs
+
+
+def paginate(cards: List[Dict], category: Optional[str]) -> List[Dict]:
+    """Split cards into page documents."""
+    total_pages = max(1, -(-len(cards) // POSTS_PER_PAGE))
+    return [
+        {
+            'category': category,
+            'page': page,
+            'totalPages': total_pages,
+            'totalPosts': len(cards),
+            'posts': cards[(page - 1) * POSTS_PER_PAGE:page * POSTS_PER_PAGE],
+        }
+        for page in range(1, total_pages + 1)
+    ]
+
+
+def build_shards(posts: List[Dict]) -> Dict[str, bytes]:
+    """Return every shard file (relative path -> content) for the posts."""
+    posts = [post for post in posts if SAFE_ID_PATTERN.match(str(post.get('id', '')))]
+    posts.sort(key=lambda post: post['publishDate'], reverse=True)
+    cards = [to_card(post) for post in posts]
+
+    files: Dict[str, bytes] = {}
+
+    for post in posts:
+        files[f"posts/{post['id']}.json"] = encode(post)
+
+    files['index.json'] = encode(cards)
+
+    # Search index documents are numbered like index.json
+    search_index = build_search_index(posts)
+    files['search.json'] = encode(search_index)
+    files['search-trigrams.json'] = encode(build_trigram_table(search_index['terms']))
+
+    # Listing pages: all posts, then each category in first-seen order
+    category_counts = Counter(card['category'] for card in cards)
+    slugs = category_slugs(list(category_counts))
+
+    for page in paginate(cards, None):
+        files[f"pages/all/{page['page']}.json"] = encode(page)
+
+    for category, slug in slugs.items():
+        for page in paginate([card for card in cards if card['category'] == category], category):
+            files[f"pages/{slug}/{page['page']}.json"] = encode(page)
+
+    # Calendar months
+    months: Dict[str, List[Dict]] = {}
+    for card in cards:
+        months.setdefault(card['publishDate'][:7], []).append(card)
+    for month, month_cards in months.items():
+        files[f'months/{month}.json'] = encode(month_cards)
+
+    tag_counts = Counter(tag for card in cards for tag in card.get('tags', []))
+
+    files['summary.json'] = encode({
+        'postsPerPage': POSTS_PER_PAGE,
+        'totalPosts': len(cards),
+        'categories': [
+            {'name': category, 'slug': slugs[category], 'count': count,
+             'pages': max(1, -(-count // POSTS_PER_PAGE))}
+            for category, count in category_counts.items()
+        ],
+        'recent': [{'id': card['id'], 'title': card['title'], 'publishDate': card['publishDate']}
+                   for card in cards[:RECENT_POSTS]],
+        'tags': tag_counts.most_common(TAG_CLOUD_SIZE),
+        'months': {month: len(month_cards) for month, month_cards in months.items()},
+        'latestMonth': cards[0]['publishDate'][:7] if cards else None,
+    })
+
+    return files
+
+
+def write_shards(files: Dict[str, bytes], out_dir: Path) -> Dict[str, int]:
+    """Write changed shards and delete stale ones. Returns counts."""
+    written = 0
+    for relative, data in files.items():
+        if write_if_changed(out_dir / relative, data):
+            written += 1
+
+    removed = 0
+    if out_dir.exists():
+        for path in sorted(out_dir.rglob('*.json')):
+            if path.relative_to(out_dir).as_posix() not in files:
+                path.unlink()
+                removed += 1
+        for directory in sorted((p for p in out_dir.rglob('*') if p.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+
+    return {'total': len(files), 'written': written, 'removed': removed}
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Build sharded blog data for the site.')
+    arg_parser.add_argument('--posts', type=Path, default=POSTS_PATH, help='posts JSON file')
+    arg_parser.add_argument('--out', type=Path, default=SHARDS_DIR, help='output directory')
+    args = arg_parser.parse_args(argv)
+
+    posts = load_posts(args.posts)
+    skipped = [post.get('id') for post in posts if not SAFE_ID_PATTERN.match(str(post.get('id', '')))]
+    for post_id in skipped:
+        print(f"   ⚠️  Skipping post with unsafe ID: {post_id!r}")
+
+    counts = write_shards(build_shards(posts), args.out)
+
+    print(f"✓ {counts['total']} shard files for {len(posts) - len(skipped)} posts in {args.out}")
+    print(f"   {counts['written']} written, {counts['removed']} stale removed, "
+          f"{counts['total'] - counts['written']} unchanged")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
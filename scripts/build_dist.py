@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Build a deployable copy of the site in dist/ with fingerprinted assets and
+precompressed siblings.
+
+- CSS, JS, component data and data/*.json files (FINGERPRINT_PATTERNS) are
+  written as name.<hash>.ext, where the hash covers the file's final
+  content, so they can be served with an immutable, long-lived cache
+  lifetime.
+- Every reference to those assets, written as a quoted or url() site path,
+  is rewritten in the HTML pages, CSS, JS and data files. Assets are
+  processed dependencies first, so a JS file's hash changes when a data
+  file it fetches changes.
+- Text files get .gz (and .br when the brotli module is installed) siblings
+  at maximum compression for servers that serve precompressed files
+  (nginx gzip_static/brotli_static and similar). Siblings are only
+  recompressed when their file changed.
+- dist/asset-manifest.json maps each original path to its fingerprinted one.
+
+Pages and the dynamically addressed data/blog/ shards keep their names and
+should be served with short cache lifetimes.
+
+Usage:
+    python3 scripts/build_dist.py [--out dist] [--no-compress]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from blog_data import write_if_changed
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped without it
+    brotli = None
+
+DIST_DIR = Path('dist')
+
+FINGERPRINT_PATTERNS = [
+    'css/**/*.css',
+    'js/**/*.js',
+    'components/**/*.css',
+    'components/**/*.js',
+    'components/**/*.json',
+    'assets/technical-videos/*.css',
+    'assets/technical-videos/*.js',
+    'assets/technical-videos/*.json',
+    'data/*.json',
+]
+
+# Not part of the deployed site
+EXCLUDED_DIRS = {'dev', 'dist', 'docs', 'scripts', '__pycache__'}
+EXCLUDED_SUFFIXES = {'.md', '.sh', '.py', '.pyc', '.backup', '.jsonl'}
+EXCLUDED_FILES = {'data/image-manifest.json'}
+
+TEXT_SUFFIXES = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt'}
+COMPRESSED_SUFFIXES = TEXT_SUFFIXES
+MIN_COMPRESS_SIZE = 1024
+
+HASH_LENGTH = 10
+
+COMPRESSION_STATE = '.precompressed.json'
+
+
+def site_files(root: Path, out_dir: Path) -> List[str]:
+    """Site-relative paths of every file that belongs in the deployed site."""
+    files = []
+    for path in root.rglob('*'):
+        relative = path.relative_to(root)
+        if not path.is_file() or any(part.startswith('.') for part in relative.parts):
+            continue
+        if out_dir in path.parents:
+            continue
+        if relative.parts[0] in EXCLUDED_DIRS or '__pycache__' in relative.parts:
+            continue
+        if path.suffix.lower() in EXCLUDED_SUFFIXES or relative.as_posix() in EXCLUDED_FILES:
+            continue
+        files.append(relative.as_posix())
+    return sorted(files)
+
+
+def fingerprint_candidates(root: Path, files: List[str]) -> Set[str]:
+    """Files matched by FINGERPRINT_PATTERNS."""
+    included = set(files)
+    matched = set()
+    for pattern in FINGERPRINT_PATTERNS:
+        matched.update(path.relative_to(root).as_posix() for path in root.glob(pattern))
+    return matched & included
+
+
+def fingerprinted_name(path: str, data: bytes) -> str:
+    """path/to/name.<hash>.ext"""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    relative = Path(path)
+    return relative.with_name(f'{relative.stem}.{digest}{relative.suffix}').as_posix()
+
+
+class AssetRewriter:
+    """Fingerprints assets and rewrites references to them."""
+
+    def __init__(self, root: Path, assets: Set[str]):
+        self.root = root
+        self.assets = assets
+        self.names: Dict[str, str] = {}
+        self.contents: Dict[str, bytes] = {}
+        self._in_progress: Set[str] = set()
+
+        # Longest paths first so a path never matches as part of a longer one
+        alternation = '|'.join(re.escape(path) for path in sorted(assets, key=len, reverse=True))
+        self.reference_pattern = re.compile(
+            rf'''(?<=["'(`])(\./)?({alternation})(?=["'?#)`])''') if assets else None
+
+    def references(self, text: str) -> Set[str]:
+        if not self.reference_pattern:
+            return set()
+        return {match.group(2) for match in self.reference_pattern.finditer(text)}
+
+    def rewrite(self, path: str) -> bytes:
+        """Content of a file with asset references replaced by fingerprinted names."""
+        data = (self.root / path).read_bytes()
+        if Path(path).suffix.lower() not in TEXT_SUFFIXES or not self.reference_pattern:
+            return data
+
+        text = data.decode('utf-8')
+        references = self.references(text)
+        if not references:
+            return data
+
+        for reference in references:
+            self.fingerprint(reference)
+
+        def replace(match):
+            return (match.group(1) or '') + self.names.get(match.group(2), match.group(2))
+
+        return self.reference_pattern.sub(replace, text).encode('utf-8')
+
+    def fingerprint(self, path: str) -> str:
+        """Fingerprinted name of an asset (dependencies first)."""
+        if path in self.names:
+            return self.names[path]
+        if path in self._in_progress:
+            # Reference cycle: the asset's name stays unhashed for this reference
+            return path
+
+        self._in_progress.add(path)
+        content = self.rewrite(path)
+        self._in_progress.discard(path)
+
+        self.contents[path] = content
+        self.names[path] = fingerprinted_name(path, content)
+        return self.names[path]
+
+
+def compressed_siblings(output: str) -> List[str]:
+    """Precompressed sibling paths written for an output file."""
+    return [output + '.gz'] + ([output + '.br'] if brotli is not None else [])
+
+
+def compress(path: Path, data: bytes) -> int:
+    """Write .gz/.br siblings of a file at maximum compression. Returns files written."""
+    written = write_if_changed(path.with_name(path.name + '.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        written += write_if_changed(path.with_name(path.name + '.br'), brotli.compress(data, quality=11))
+    return written
+
+
+def build(root: Path, out_dir: Path, precompress: bool = True) -> Dict[str, int]:
+    """Write the deployable site to out_dir. Returns counts."""
+    files = site_files(root, out_dir)
+    rewriter = AssetRewriter(root, fingerprint_candidates(root, files))
+
+    outputs: Dict[str, Optional[bytes]] = {}  # output path -> content (None = copy as is)
+    for path in files:
+        if path in rewriter.assets:
+            rewriter.fingerprint(path)
+            outputs[rewriter.names[path]] = rewriter.contents[path]
+        elif Path(path).suffix.lower() in TEXT_SUFFIXES:
+            outputs[path] = rewriter.rewrite(path)
+        else:
+            outputs[path] = None
+
+    manifest = json.dumps(dict(sorted(rewriter.names.items())), indent=2) + '\n'
+    outputs['asset-manifest.json'] = manifest.encode('utf-8')
+
+    written = 0
+    for output, content in outputs.items():
+        target = out_dir / output
+        if content is not None:
+            written += write_if_changed(target, content)
+            continue
+
+        source = root / output
+        stat = source.stat()
+        if target.exists() and target.stat().st_size == stat.st_size and target.stat().st_mtime == stat.st_mtime:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        written += 1
+
+    # Precompressed siblings of text files, redone only when the file's hash changed
+    state_path = out_dir / COMPRESSION_STATE
+    previous = json.loads(state_path.read_text()) if state_path.exists() else {}
+    state: Dict[str, str] = {}
+    siblings: Set[str] = set()
+    compressed = 0
+    if precompress:
+        for output, content in outputs.items():
+            if Path(output).suffix.lower() not in COMPRESSED_SUFFIXES:
+                continue
+            data = content if content is not None else (out_dir / output).read_bytes()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+
+            digest = hashlib.sha256(data).hexdigest()
+            paths = compressed_siblings(output)
+            if previous.get(output) != digest or not all((out_dir / path).exists() for path in paths):
+                compressed += compress(out_dir / output, data)
+            state[output] = digest
+            siblings.update(paths)
+        write_if_changed(state_path, (json.dumps(state, indent=2, sort_keys=True) + '\n').encode('utf-8'))
+
+    # Remove files left over from earlier builds
+    keep = set(outputs) | siblings | {COMPRESSION_STATE}
+    removed = 0
+    for path in sorted(out_dir.rglob('*'), reverse=True):
+        relative = path.relative_to(out_dir).as_posix()
+        if path.is_file() and relative not in keep:
+            path.unlink()
+            removed += 1
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+
+    return {
+        'files': len(outputs),
+        'fingerprinted': len(rewriter.names),
+        'written': written,
+        'compressed': compressed,
+        'removed': removed,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Build the deployable site with fingerprinted assets.')
+    arg_parser.add_argument('--out', type=Path, default=DIST_DIR, help='output directory')
+    arg_parser.add_argument('--no-compress', action='store_true', help='skip .gz/.br siblings')
+    args = arg_parser.parse_args(argv)
+
+    root = Path('.').resolve()
+    out_dir = args.out.resolve()
+    if out_dir == root or root not in out_dir.parents:
+        print(f"❌ Output directory must be inside the site: {args.out}")
+        return 1
+
+    if brotli is None and not args.no_compress:
+        print("⚠️  brotli not installed; writing .gz siblings only (pip install brotli)")
+
+    counts = build(root, out_dir, precompress=not args.no_compress)
+
+    print(f"✓ {counts['files']} files in {args.out} ({counts['fingerprinted']} fingerprinted)")
+    print(f"   {counts['written']} written, {counts['compressed']} compressed siblings written, "
+          f"{counts['removed']} stale removed")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
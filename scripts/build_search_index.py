@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Build a compact inverted search index over the blog posts.
+
+build_blog_shards.py writes it to data/blog/ so document numbers line up
+with data/blog/index.json (newest first).
+
+search.json:
+- terms:      sorted vocabulary (accent-folded, lowercase)
+- postings:   per term, [doc gap, score, doc gap, score, ...] with docs
+              ascending and delta-encoded; score is the field-weighted
+              term frequency
+- tags:       exact tag -> delta-encoded doc list (tag filter)
+- categories: exact category -> delta-encoded doc list
+- prefixes:   two-letter prefix -> [first, last + 1] term range
+- stopwords:  words left out of the index (queries skip them too)
+
+search-trigrams.json (only fetched when a query term has no exact or
+prefix match): trigram of "^term$" -> delta-encoded term numbers.
+
+Usage:
+    python3 scripts/build_search_index.py [--posts data/blog-posts.json]
+    (prints index statistics; build_blog_shards.py writes the files)
+"""
+
+import argparse
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from blog_data import POSTS_PATH, load_posts
+from post_text import post_text
+
+INDEX_VERSION = 1
+
+# Score weight of a term occurrence per field
+FIELD_WEIGHTS = {
+    'title': 8,
+    'tags': 6,
+    'category': 4,
+    'excerpt': 2,
+    'content': 1,
+}
+
+MIN_TOKEN_LENGTH = 2
+PREFIX_LENGTH = 2
+
+STOPWORDS = frozenset('''
+    a an and are as at be been but by for from had has have he her his i in is it its
+    of on or our she so than that the their them then there these they this to was
+    we were what when which who will with you your
+    al con de del el en es la las lo los para por que se su un una y
+'''.split())
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents so 'Bublé' matches 'buble'."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> Iterable[str]:
+    """Yield index terms from plain text."""
+    for token in TOKEN_PATTERN.findall(fold(text)):
+        token = token.strip('_')
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS:
+            yield token
+
+
+def post_fields(post: Dict) -> Dict[str, str]:
+    """Plain-text value of every indexed field of a post."""
+    return {
+        'title': post.get('title', ''),
+        'tags': ' '.join(post.get('tags', [])),
+        'category': post.get('category', ''),
+        'excerpt': post.get('excerpt', ''),
+        'content': post_text(post.get('content', '')).search_text,
+    }
+
+
+def term_scores(post: Dict) -> Counter:
+    """Field-weighted term frequencies of a post."""
+    scores = Counter()
+    for field, text in post_fields(post).items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            scores[token] += weight
+    return scores
+
+
+def delta_encode(numbers: List[int]) -> List[int]:
+    """Gaps between ascending numbers (the first is kept as is)."""
+    previous = 0
+    gaps = []
+    for number in numbers:
+        gaps.append(number - previous)
+        previous = number
+    return gaps
+
+
+def trigrams(term: str) -> List[str]:
+    """Distinct trigrams of a term padded with ^ and $."""
+    padded = f'^{term}$'
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def build_search_index(posts: List[Dict]) -> Dict:
+    """Build the index for posts already in listing order (doc n = posts[n])."""
+    postings: Dict[str, List[int]] = {}
+    tags: Dict[str, List[int]] = {}
+    categories: Dict[str, List[int]] = {}
+
+    for doc, post in enumerate(posts):
+        for term, score in term_scores(post).items():
+            postings.setdefault(term, []).extend((doc, score))
+        for tag in dict.fromkeys(post.get('tags', [])):
+            tags.setdefault(tag, []).append(doc)
+        categories.setdefault(post.get('category', ''), []).append(doc)
+
+    terms = sorted(postings)
+
+    encoded_postings = []
+    for term in terms:
+        flat = postings[term]
+        docs = delta_encode(flat[0::2])
+        encoded = [0] * len(flat)
+        encoded[0::2] = docs
+        encoded[1::2] = flat[1::2]
+        encoded_postings.append(encoded)
+
+    prefixes: Dict[str, List[int]] = {}
+    for number, term in enumerate(terms):
+        prefix = term[:PREFIX_LENGTH]
+        if prefix in prefixes:
+            prefixes[prefix][1] = number + 1
+        else:
+            prefixes[prefix] = [number, number + 1]
+
+    return {
+        'version': INDEX_VERSION,
+        'docs': len(posts),
+        'terms': terms,
+        'postings': encoded_postings,
+        'tags': {tag: delta_encode(docs) for tag, docs in tags.items()},
+        'categories': {category: delta_encode(docs) for category, docs in categories.items()},
+        'prefixes': prefixes,
+        'stopwords': sorted(STOPWORDS),
+    }
+
+
+def build_trigram_table(terms: List[str]) -> Dict[str, List[int]]:
+    """Map each trigram to the (delta-encoded) numbers of the terms containing it."""
+    trigram_terms: Dict[str, List[int]] = {}
+    for number, term in enumerate(terms):
+        for gram in trigrams(term):
+            trigram_terms.setdefault(gram, []).append(number)
+    return {gram: delta_encode(numbers) for gram, numbers in sorted(trigram_terms.items())}
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Print search index statistics.')
+    arg_parser.add_argument('--posts', type=Path, default=POSTS_PATH, help='posts JSON file')
+    args = arg_parser.parse_args(argv)
+
+    posts = sorted(load_posts(args.posts), key=lambda post: post['publishDate'], reverse=True)
+    index = build_search_index(posts)
+    trigram_table = build_trigram_table(index['terms'])
+
+    def size(data) -> float:
+        return len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')) / 1024
+
+    print(f"✓ {index['docs']} posts, {len(index['terms'])} terms, {len(trigram_table)} trigrams")
+    print(f"   {len(index['tags'])} tags, {len(index['categories'])} categories")
+    print(f"   search.json {size(index):.1f} KB, search-trigrams.json {size(trigram_table):.1f} KB "
+          f"({size(posts):.1f} KB of posts)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Check that every asset the site references exists, and list asset files
+nothing references.
+
+References are extracted from:
+- the data JSON files (string values that are file paths, and the HTML of
+  blog post content)
+- the top-level *.html pages
+- CSS url()s (resolved relative to the stylesheet)
+- JS string literals that start with an asset directory
+
+Asset files are those under ASSET_DIRS. Both the filesystem index and the
+references of each source file are cached in .asset-check-cache.json: a
+directory is only listed again when its mtime changed, and a source file
+is only parsed again when its mtime or size changed, so a re-run stats
+files instead of reading them.
+
+Exits with status 1 when a referenced file is missing.
+
+Usage:
+    python3 scripts/check_assets.py [--unreferenced] [--no-cache]
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import posixpath
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from blog_data import write_if_changed
+
+CACHE_PATH = Path('.asset-check-cache.json')
+CACHE_VERSION = 1
+
+# Directories holding referenced files (assets) and files that reference them (sources)
+INDEXED_DIRS = ['assets', 'components', 'css', 'js', 'data']
+ASSET_DIRS = ['assets', 'components/*/images']
+SOURCE_PATTERNS = ['*.html', 'data/*.json', 'components/**/*.json', 'assets/**/*.json',
+                   'css/**/*.css', 'components/**/*.css', 'assets/**/*.css',
+                   'js/**/*.js', 'components/**/*.js', 'assets/**/*.js']
+
+# Data of the standalone component demo (components/cd-player/cd-player.html)
+EXCLUDED_SOURCES = {'components/cd-player/data.json'}
+
+# Generated at build time (image_derivatives.py), not committed
+GENERATED_DIRS = ['assets/images/responsive']
+
+# JSON values that the page prefixes with a directory
+JSON_PREFIXES = {'data/gallery-photos.json': 'assets/images/gallery/'}
+
+ASSET_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg', '.ico',
+                  '.mp4', '.webm', '.mov', '.mp3', '.wav', '.m4a',
+                  '.woff', '.woff2', '.ttf', '.otf', '.pdf')
+JS_ASSET_PREFIXES = ('assets/', 'components/', './assets/', '../assets/')
+
+QUOTED_PATTERN = re.compile(r'''"([^"\n]*)"|'([^'\n]*)'|`([^`\n]*)`|url\(\s*([^)'"]+?)\s*\)''')
+SRCSET_DESCRIPTOR = re.compile(r'\s+\d+(\.\d+)?[wx]$')
+SCHEME_PATTERN = re.compile(r'^[a-z][a-z0-9+.-]*:', re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.DOTALL)
+
+
+class FileIndex:
+    """Files under a set of directories, with per-directory listings cached by mtime."""
+
+    def __init__(self, cached: Optional[Dict] = None):
+        self.cached = cached or {}
+        self.listings: Dict[str, Dict] = {}
+        self.files: Set[str] = set()
+        self.listed = 0
+
+    def scan(self, directories: Iterable[str]):
+        for directory in directories:
+            if os.path.isdir(directory):
+                self._scan(directory)
+
+    def _scan(self, directory: str):
+        mtime = os.stat(directory).st_mtime_ns
+        listing = self.cached.get(directory)
+        if listing is None or listing['mtime'] != mtime:
+            files, dirs = [], []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or entry.name == '__pycache__':
+                        continue
+                    (dirs if entry.is_dir() else files).append(entry.name)
+            listing = {'mtime': mtime, 'files': sorted(files), 'dirs': sorted(dirs)}
+            self.listed += 1
+
+        self.listings[directory] = listing
+        self.files.update(f'{directory}/{name}' for name in listing['files'])
+        for name in listing['dirs']:
+            self._scan(f'{directory}/{name}')
+
+    def matching(self, patterns: Iterable[str]) -> List[str]:
+        return sorted(path for path in self.files if any(fnmatch.fnmatch(path, pattern) for pattern in patterns))
+
+    def under(self, directories: Iterable[str]) -> Set[str]:
+        return {path for path in self.files
+                if any(fnmatch.fnmatch(path, directory + '/*') for directory in directories)}
+
+
+def is_asset_path(value: str) -> bool:
+    value = value.split('?', 1)[0].split('#', 1)[0]
+    return (value.lower().endswith(ASSET_SUFFIXES) and '${' not in value and '+' not in value
+            and not value.startswith('//') and not SCHEME_PATTERN.match(value))
+
+
+def path_values(value: str) -> Iterable[str]:
+    """Asset paths in an attribute or JSON value (srcset lists give several)."""
+    value = value.strip()
+    parts = value.split(',') if SRCSET_DESCRIPTOR.search(value.split(',')[0]) else [value]
+    for part in parts:
+        part = SRCSET_DESCRIPTOR.sub('', part.strip())
+        if part and is_asset_path(part):
+            yield part
+
+
+def text_references(text: str, js: bool = False) -> Set[str]:
+    """Asset paths quoted (or in url()) in HTML, CSS or JS."""
+    if not js:
+        text = COMMENT_PATTERN.sub('', text)
+    references = set()
+    for match in QUOTED_PATTERN.finditer(text):
+        value = next(group for group in match.groups() if group is not None)
+        for path in path_values(value):
+            if not js or path.startswith(JS_ASSET_PREFIXES):
+                references.add(path)
+    return references
+
+
+def json_references(data, prefix: str = '') -> Set[str]:
+    """Asset paths in JSON string values, including HTML content."""
+    references = set()
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, str):
+            if '<' in value:
+                references.update(text_references(value))
+            else:
+                references.update(prefix + path if '/' not in path else path for path in path_values(value))
+    return references
+
+
+def extract_references(source: str) -> List[str]:
+    """Asset paths referenced by a source file, resolved to site paths."""
+    text = Path(source).read_text(encoding='utf-8', errors='replace')
+    suffix = Path(source).suffix
+    if suffix == '.json':
+        try:
+            references = json_references(json.loads(text), JSON_PREFIXES.get(source, ''))
+        except ValueError:
+            references = text_references(text)
+    else:
+        references = text_references(text, js=suffix == '.js')
+
+    # CSS url()s are relative to the stylesheet, everything else to the site root
+    base = posixpath.dirname(source) if suffix == '.css' else ''
+    resolved = set()
+    for reference in references:
+        path = unquote(reference.split('?', 1)[0].split('#', 1)[0])
+        if path.startswith('/'):
+            path = path.lstrip('/')
+        else:
+            path = posixpath.join(base, path)
+        resolved.add(posixpath.normpath(path))
+    return sorted(resolved)
+
+
+class ReferenceIndex:
+    """References of each source file, cached by mtime and size."""
+
+    def __init__(self, cached: Optional[Dict] = None):
+        self.cached = cached or {}
+        self.sources: Dict[str, Dict] = {}
+        self.parsed = 0
+
+    def update(self, sources: Iterable[str]):
+        for source in sources:
+            stat = os.stat(source)
+            entry = self.cached.get(source)
+            if entry is None or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                entry = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'refs': extract_references(source)}
+                self.parsed += 1
+            self.sources[source] = entry
+
+    def referenced_by(self) -> Dict[str, List[str]]:
+        """Referenced path -> sources referencing it."""
+        references: Dict[str, List[str]] = {}
+        for source, entry in self.sources.items():
+            for path in entry['refs']:
+                references.setdefault(path, []).append(source)
+        return references
+
+
+def load_cache(path: Path) -> Dict:
+    try:
+        cache = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+
+def check(use_cache: bool = True) -> Tuple[Dict[str, List[str]], List[str], Dict[str, int]]:
+    """Returns (missing path -> referencing sources, unreferenced assets, stats)."""
+    cache = load_cache(CACHE_PATH) if use_cache else {}
+
+    files = FileIndex(cache.get('dirs'))
+    files.scan(INDEXED_DIRS)
+    pages = sorted(name for name in os.listdir('.') if name.endswith('.html'))
+
+    references = ReferenceIndex(cache.get('sources'))
+    references.update(source for source in pages + files.matching(SOURCE_PATTERNS)
+                      if source not in EXCLUDED_SOURCES)
+    referenced_by = references.referenced_by()
+
+    generated = tuple(directory + '/' for directory in GENERATED_DIRS)
+    existing = files.files | set(pages)
+    missing = {path: sources for path, sources in sorted(referenced_by.items())
+               if path not in existing and not path.startswith(generated) and not os.path.isfile(path)}
+
+    assets = {path for path in files.under(ASSET_DIRS)
+              if path.lower().endswith(ASSET_SUFFIXES) and not path.startswith(generated)}
+    unreferenced = sorted(assets - set(referenced_by))
+
+    if use_cache:
+        cache = {'version': CACHE_VERSION, 'dirs': files.listings, 'sources': references.sources}
+        write_if_changed(CACHE_PATH, json.dumps(cache, separators=(',', ':')).encode('utf-8'))
+
+    stats = {
+        'files': len(files.files),
+        'sources': len(references.sources),
+        'references': len(referenced_by),
+        'dirs_listed': files.listed,
+        'sources_parsed': references.parsed,
+    }
+    return missing, unreferenced, stats
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Check that referenced assets exist.')
+    arg_parser.add_argument('--unreferenced', action='store_true', help='list asset files nothing references')
+    arg_parser.add_argument('--no-cache', action='store_true', help='ignore and do not write the cache')
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    missing, unreferenced, stats = check(use_cache=not args.no_cache)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"🔍 {stats['references']} referenced paths in {stats['sources']} files, {stats['files']} files indexed "
+          f"({stats['sources_parsed']} parsed, {stats['dirs_listed']} directories listed, {elapsed:.0f} ms)")
+
+    if args.unreferenced:
+        print(f"\n📦 {len(unreferenced)} unreferenced asset files:")
+        for path in unreferenced:
+            print(f"   {path}")
+
+    if missing:
+        print(f"\n❌ {len(missing)} missing files:")
+        for path, sources in missing.items():
+            more = f" (+{len(sources) - 1} more)" if len(sources) > 1 else ''
+            print(f"   {path}  ← {sources[0]}{more}")
+        return 1
+
+    print(f"✓ All referenced files exist ({len(unreferenced)} asset files unreferenced)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
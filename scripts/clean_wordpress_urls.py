@@ -3,17 +3,13 @@
 Clean remaining WordPress URLs from post content.
 """
 
-import json
 import re
-from pathlib import Path
+from typing import Dict, List
 
-def clean_wordpress_urls():
-    """Remove WordPress CDN URLs from content."""
-
-    posts_path = Path('data/blog-posts.json')
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+from blog_data import describe_save, load_posts, save_posts
 
+def clean_posts(posts: List[Dict]) -> int:
+    """Remove WordPress CDN URLs from content, in memory. Returns posts changed."""
     fixes = 0
     for post in posts:
         content = post['content']
@@ -34,10 +30,19 @@ def clean_wordpress_urls():
             fixes += 1
             print(f"✓ Cleaned: {post['title']}")
 
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2, ensure_ascii=False)
+    return fixes
+
+def clean_wordpress_urls():
+    """Remove WordPress CDN URLs from content."""
+
+    posts = load_posts()
+
+    fixes = clean_posts(posts)
+
+    saved = save_posts(posts)
 
     print(f"\nTotal posts cleaned: {fixes}")
+    print(describe_save(saved))
 
 if __name__ == '__main__':
     clean_wordpress_urls()
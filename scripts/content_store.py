@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store of the blog posts, with data/blog-posts.json as its export.
+
+The JSON array stays the file the site (and git) reads; the store is a
+working copy next to it (data/.blog-posts.sqlite) that tools can query and
+edit without loading or rewriting the whole array:
+
+- lookups by id, slug, title, tag, category and publishDate use indexes
+- edits are grouped in transactions (batch()); a failed batch changes nothing
+- each post is kept as the exact text it has in the JSON file, so export()
+  writes the file by concatenating posts instead of re-serializing all of
+  them, and journals the changed IDs it already knows instead of diffing
+
+Posts are exported newest first (publishDate descending, ties in the order
+they were imported or added), which is the order every other tool writes;
+exporting an unchanged store reproduces the file byte for byte. The store
+re-imports the JSON whenever the file's SHA-256 differs from the one it
+last imported or exported (the hash is only computed when the file's size
+or mtime changed), so edits made by tools that still use save_posts()
+are picked up.
+
+    store = ContentStore.open()
+    with store.batch():
+        for post in store.with_tag('Neve'):
+            post['featured'] = True
+            store.put(post)
+    store.export()
+
+Usage:
+    python3 scripts/content_store.py [--posts data/blog-posts.json] [--shards data/blog]
+        (imports if needed, exports, and optionally rebuilds the shards)
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from blog_data import POSTS_PATH, write_journaled
+
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE posts (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    slug TEXT,
+    title TEXT,
+    category TEXT,
+    publish_date TEXT,
+    featured_image TEXT,
+    json TEXT NOT NULL
+);
+CREATE TABLE post_tags (post_id TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE TABLE changes (post_id TEXT PRIMARY KEY, kind TEXT NOT NULL);
+CREATE INDEX posts_slug ON posts (slug);
+CREATE INDEX posts_title ON posts (title);
+CREATE INDEX posts_category ON posts (category);
+CREATE INDEX posts_order ON posts (publish_date DESC, position);
+CREATE INDEX posts_featured_image ON posts (featured_image);
+CREATE INDEX post_tags_tag ON post_tags (tag);
+CREATE INDEX post_tags_post ON post_tags (post_id);
+'''
+
+EXPORT_ORDER = 'ORDER BY publish_date DESC, position'
+
+# (pending change, new change) -> combined change; None cancels both
+CHANGE_MERGE = {
+    ('added', 'changed'): 'added',
+    ('added', 'removed'): None,
+    ('changed', 'removed'): 'removed',
+    ('removed', 'added'): 'changed',
+}
+
+
+def store_path(posts_path: Path) -> Path:
+    """Store of a posts file, e.g. data/.blog-posts.sqlite."""
+    posts_path = Path(posts_path)
+    return posts_path.with_name(f'.{posts_path.stem}.sqlite')
+
+
+def serialize_post(post: Dict) -> str:
+    """A post as it appears inside the JSON array (serialize_posts layout)."""
+    return '  ' + json.dumps(post, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+
+
+class ContentStore:
+    """Indexed posts of one JSON file; open() brings it in sync with the file."""
+
+    def __init__(self, posts_path: Path, db_path: Path):
+        self.posts_path = Path(posts_path)
+        self.db_path = Path(db_path)
+        self.connection = sqlite3.connect(self.db_path, isolation_level=None)
+        self.imported = False  # True if open() re-imported the JSON file
+        self._in_batch = False
+
+    @classmethod
+    def open(cls, posts_path: Path = POSTS_PATH, db_path: Optional[Path] = None) -> 'ContentStore':
+        """Open the store of a posts file, importing the file first if it changed."""
+        posts_path = Path(posts_path)
+        store = cls(posts_path, db_path or store_path(posts_path))
+        if not store._in_sync():
+            store._import()
+        return store
+
+    def _meta(self) -> Dict[str, str]:
+        try:
+            return dict(self.connection.execute('SELECT key, value FROM meta'))
+        except sqlite3.DatabaseError:
+            return {}
+
+    def _set_meta(self, values: Dict):
+        self.connection.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                    [(key, str(value)) for key, value in values.items()])
+
+    def _file_meta(self, data: bytes) -> Dict:
+        stat = self.posts_path.stat()
+        return {'json_sha256': hashlib.sha256(data).hexdigest(),
+                'json_size': stat.st_size, 'json_mtime': stat.st_mtime_ns}
+
+    def _in_sync(self) -> bool:
+        """Whether the store holds the posts file's current content."""
+        meta = self._meta()
+        if meta.get('schema_version') != str(SCHEMA_VERSION) or not self.posts_path.exists():
+            return False
+
+        stat = self.posts_path.stat()
+        if (meta.get('json_size'), meta.get('json_mtime')) == (str(stat.st_size), str(stat.st_mtime_ns)):
+            return True
+
+        # Touched or rewritten: only a changed hash means changed posts
+        data = self.posts_path.read_bytes()
+        if hashlib.sha256(data).hexdigest() != meta.get('json_sha256'):
+            return False
+        self._set_meta(self._file_meta(data))
+        return True
+
+    def _import(self):
+        """Replace the store's content with the posts file."""
+        pending = self._meta() and self.connection.execute('SELECT COUNT(*) FROM changes').fetchone()[0]
+        if pending:
+            print(f"   ⚠️  {self.posts_path} changed since the last export; "
+                  f"discarding {pending} unexported changes in {self.db_path}")
+
+        data = self.posts_path.read_bytes() if self.posts_path.exists() else b'[]'
+        posts = json.loads(data)
+
+        connection = self.connection
+        connection.execute('BEGIN')
+        try:
+            for (name,) in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                connection.execute(f'DROP TABLE {name}')
+            for statement in SCHEMA.split(';'):
+                connection.execute(statement)
+            for position, post in enumerate(posts):
+                self._insert(post, position)
+            self._set_meta({'schema_version': SCHEMA_VERSION, 'next_position': len(posts)})
+            if self.posts_path.exists():
+                self._set_meta(self._file_meta(data))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self.imported = True
+
+    def _insert(self, post: Dict, position: int):
+        self.connection.execute(
+            'INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (post['id'], position, post.get('slug'), post.get('title'), post.get('category'),
+             post.get('publishDate'), post.get('featuredImage'), serialize_post(post)))
+        self.connection.executemany('INSERT INTO post_tags VALUES (?, ?)',
+                                    [(post['id'], tag) for tag in post.get('tags') or ()])
+
+    # Queries
+
+    def _posts(self, where: str = '', params: tuple = ()) -> List[Dict]:
+        condition = f'WHERE {where}' if where else ''
+        return [json.loads(text) for (text,) in self.connection.execute(
+            f'SELECT json FROM posts {condition} {EXPORT_ORDER}', params)]
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def all(self) -> List[Dict]:
+        """Every post, in export order."""
+        return self._posts()
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        posts = self._posts('id = ?', (post_id,))
+        return posts[0] if posts else None
+
+    def by_slug(self, slug: str) -> List[Dict]:
+        return self._posts('slug = ?', (slug,))
+
+    def by_title(self, title: str) -> List[Dict]:
+        return self._posts('title = ?', (title,))
+
+    def with_tag(self, tag: str) -> List[Dict]:
+        return self._posts('id IN (SELECT post_id FROM post_tags WHERE tag = ?)', (tag,))
+
+    def in_category(self, category: str) -> List[Dict]:
+        return self._posts('category = ?', (category,))
+
+    def published(self, since: str = '', until: str = '9999-12-31') -> List[Dict]:
+        """Posts with since <= publishDate <= until (YYYY-MM-DD)."""
+        return self._posts('publish_date BETWEEN ? AND ?', (since, until))
+
+    def with_featured_image(self, image: str) -> List[Dict]:
+        return self._posts('featured_image = ?', (image,))
+
+    # Edits
+
+    @contextmanager
+    def batch(self):
+        """Group edits in one transaction: all of them are applied, or none."""
+        if self._in_batch:
+            yield self
+            return
+        self.connection.execute('BEGIN')
+        self._in_batch = True
+        try:
+            yield self
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        else:
+            self.connection.execute('COMMIT')
+        finally:
+            self._in_batch = False
+
+    def _record(self, post_id: str, kind: str):
+        row = self.connection.execute('SELECT kind FROM changes WHERE post_id = ?', (post_id,)).fetchone()
+        if row:
+            kind = CHANGE_MERGE.get((row[0], kind), row[0])
+            if kind is None:
+                self.connection.execute('DELETE FROM changes WHERE post_id = ?', (post_id,))
+                return
+        self.connection.execute('INSERT OR REPLACE INTO changes VALUES (?, ?)', (post_id, kind))
+
+    def put(self, post: Dict) -> bool:
+        """Add or replace a post by ID. Returns False if the stored post was already identical."""
+        with self.batch():
+            row = self.connection.execute('SELECT position, json FROM posts WHERE id = ?',
+                                          (post['id'],)).fetchone()
+            if row is None:
+                position = int(self._meta().get('next_position', 0))
+                self._set_meta({'next_position': position + 1})
+                kind = 'added'
+            else:
+                position, text = row
+                if text == serialize_post(post):
+                    return False
+                self.delete(post['id'], record=False)
+                kind = 'changed'
+            self._insert(post, position)
+            self._record(post['id'], kind)
+        return True
+
+    def delete(self, post_id: str, record: bool = True) -> bool:
+        """Remove a post. Returns False if there was no such post."""
+        with self.batch():
+            deleted = self.connection.execute('DELETE FROM posts WHERE id = ?', (post_id,)).rowcount
+            self.connection.execute('DELETE FROM post_tags WHERE post_id = ?', (post_id,))
+            if deleted and record:
+                self._record(post_id, 'removed')
+        return bool(deleted)
+
+    # Export
+
+    def serialize(self) -> bytes:
+        """The posts file content: serialize_posts() layout, in export order."""
+        texts = [text for (text,) in self.connection.execute(f'SELECT json FROM posts {EXPORT_ORDER}')]
+        return ('[\n' + ',\n'.join(texts) + '\n]' if texts else '[]').encode('utf-8')
+
+    def export(self, shards_dir: Optional[Path] = None) -> Optional[Dict]:
+        """Write the posts file if it differs from the store, journaling the changed IDs.
+
+        Returns None when nothing was written, otherwise the journal entry.
+        With shards_dir, also rebuilds the blog shards (build_blog_shards.py).
+        """
+        data = self.serialize()
+        digest = hashlib.sha256(data).hexdigest()
+        meta = self._meta()
+
+        entry = None
+        if digest != meta.get('json_sha256') or not self.posts_path.exists():
+            changes = {'added': [], 'removed': [], 'changed': []}
+            for post_id, kind in self.connection.execute('SELECT post_id, kind FROM changes ORDER BY post_id'):
+                changes[kind].append(post_id)
+            entry = write_journaled(self.posts_path, data, meta.get('json_sha256'), changes)
+
+        with self.batch():
+            self.connection.execute('DELETE FROM changes')
+            self._set_meta(self._file_meta(data))
+
+        if shards_dir is not None:
+            from build_blog_shards import build_shards, write_shards
+            write_shards(build_shards(self.all()), Path(shards_dir))
+        return entry
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    from blog_data import describe_save
+
+    arg_parser = argparse.ArgumentParser(description='Sync the blog posts store and export the JSON files.')
+    arg_parser.add_argument('--posts', type=Path, default=POSTS_PATH, help='posts JSON file')
+    arg_parser.add_argument('--shards', type=Path, help='also rebuild the blog shards in this directory')
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = ContentStore.open(args.posts)
+    print(f"🗄️  {len(store)} posts in {store.db_path} "
+          f"({'imported' if store.imported else 'in sync'}, {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    saved = store.export(args.shards)
+    print(f"💾 {describe_save(saved, args.posts)}")
+    if args.shards:
+        print(f"✓ Shards rebuilt in {args.shards}")
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
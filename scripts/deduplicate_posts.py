@@ -1,62 +1,270 @@
 #!/usr/bin/env python3
 """
-Deduplicate blog posts by title, keeping manually created posts over WordPress imports.
+Deduplicate blog posts, keeping manually created posts over WordPress imports.
+
+Two posts are duplicates when their titles match after folding case,
+accents and whitespace, or when their content is near-identical: each
+post is shingled into overlapping word n-grams of its title and text, the
+shingle sets are summarised as MinHash signatures, and LSH banding only
+compares posts that share a band, so a re-import with a slightly edited
+title or body is caught in roughly linear time.
+
+Of each group of duplicates the manually created post (its ID is in the
+pre-migration backup) is kept; between two WordPress posts the first one
+is kept.
+
+POSTS defaults to the migration output, data/blog-posts-migrated.json. The
+result goes to a separate file, data/blog-posts-deduplicated.json for the
+default POSTS (--in-place rewrites POSTS instead), and the manual posts are
+read from the backup of the live file, data/blog-posts.json.backup. For
+another POSTS, e.g. other.json, these are other-deduplicated.json and
+other.json.backup.
+
+Usage:
+    python3 scripts/deduplicate_posts.py [POSTS] [--output PATH | --in-place] [--original BACKUP]
+        [--threshold 0.9] [--dry-run]
 """
 
-import json
+import argparse
+import random
+import re
+import zlib
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from blog_data import describe_save, load_posts, save_posts
+from blog_store import BlogStore
+from build_search_index import fold, tokenize
+from post_text import post_text
+
+MIGRATED_PATH = Path('data/blog-posts-migrated.json')
+
+SHINGLE_SIZE = 3          # words per shingle
+NUM_PERMUTATIONS = 128    # MinHash signature length
+BANDS = 32                # LSH bands of NUM_PERMUTATIONS // BANDS rows
+DEFAULT_THRESHOLD = 0.9   # estimated Jaccard similarity of near-duplicates
+
+MIX_MULTIPLIER = 0x9E3779B97F4A7C15  # 64-bit golden ratio, spreads crc32 values
+MASK_64 = (1 << 64) - 1
+MASK_BIN = (1 << 48) - 1
+EMPTY_BIN = 1 << 48
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def title_key(title: str) -> str:
+    """Title compared for exact duplicates: case, accents and spacing folded."""
+    return WHITESPACE_PATTERN.sub(' ', fold(title)).strip()
+
+
+def shingles(post: Dict, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word n-grams of a post's title and text."""
+    words = list(tokenize(post.get('title', '') + ' ' + post_text(post.get('content', '')).search_text))
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+def _probe_orders(size: int, seed: int = 1) -> List[List[int]]:
+    """Fixed pseudo-random order in which each bin borrows from the others."""
+    rng = random.Random(seed)
+    return [rng.sample(range(size), size) for _ in range(size)]
+
+
+PROBE_ORDERS = _probe_orders(NUM_PERMUTATIONS)
+
+
+def signature(hashes: Set[int]) -> Tuple[int, ...]:
+    """MinHash signature by one-permutation hashing.
+
+    Each shingle hash is mixed once and lands in one of NUM_PERMUTATIONS
+    bins by its high bits; a bin keeps its smallest value. An empty bin
+    (short posts) copies the first non-empty bin of its fixed probe order,
+    so equal sets still produce equal bins and the estimate stays close to
+    that of independent permutations. One pass over the shingles instead of
+    one per permutation.
+    """
+    if not hashes:
+        return ()
+    size = NUM_PERMUTATIONS
+    bins = [EMPTY_BIN] * size
+    for h in hashes:
+        mixed = (h * MIX_MULTIPLIER) & MASK_64
+        slot = mixed * size >> 64
+        value = mixed & MASK_BIN
+        if value < bins[slot]:
+            bins[slot] = value
+
+    if EMPTY_BIN in bins:
+        filled = bins.copy()
+        for i in range(size):
+            if filled[i] == EMPTY_BIN:
+                bins[i] = next(filled[j] for j in PROBE_ORDERS[i] if filled[j] != EMPTY_BIN)
+    return tuple(bins)
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not first or not second:
+        return 0.0
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class NearDuplicateIndex:
+    """LSH index of the kept posts' signatures.
 
-def deduplicate_posts():
-    """Remove duplicate posts, prioritizing manually created ones."""
+    A post is only compared with kept posts that share at least one band
+    of its signature; with 32 bands of 4 rows a post at 0.8 similarity is
+    a candidate with probability above 99.99%, an unrelated one at 0.1
+    with about 0.3%.
+    """
 
-    # Load migrated posts
-    migrated_path = Path('data/blog-posts-migrated.json')
-    with open(migrated_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self.buckets: Dict[int, List[int]] = {}
+        self.signatures: Dict[int, Tuple[int, ...]] = {}
 
-    # Load original posts to identify manual ones
-    backup_path = Path('data/blog-posts.json.backup')
-    with open(backup_path, 'r', encoding='utf-8') as f:
-        original_posts = json.load(f)
+    def _band_keys(self, signature: Tuple[int, ...]):
+        """Hash of each band (a collision only adds a candidate to verify)."""
+        rows = len(signature) // self.bands
+        for band in range(self.bands):
+            yield hash((band, signature[band * rows:(band + 1) * rows]))
 
-    original_ids = {post['id'] for post in original_posts}
+    def add(self, key: int, signature: Tuple[int, ...]):
+        if not signature:
+            return
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(key)
 
-    # Build map of title -> post, preferring original posts
-    posts_by_title = {}
+    def remove(self, key: int):
+        self.signatures.pop(key, None)
+
+    def most_similar(self, signature: Tuple[int, ...], threshold: float) -> Optional[Tuple[int, float]]:
+        """Kept post most similar to a signature, if at or above threshold."""
+        if not signature:
+            return None
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            if key not in self.signatures:
+                continue  # replaced by a manual post
+            score = similarity(signature, self.signatures[key])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+
+def deduplicate(posts: List[Dict], original_ids: Set[str],
+                threshold: float = DEFAULT_THRESHOLD) -> Tuple[List[Dict], List[str]]:
+    """Remove duplicate posts in memory, preferring posts whose ID is in original_ids.
+
+    Returns (deduplicated posts sorted newest first, descriptions of removed duplicates).
+    """
+    index = NearDuplicateIndex()
+
+    kept: Dict[int, Dict] = {}           # slot -> post
+    slots_by_title: Dict[str, int] = {}  # title key -> slot
     duplicates_removed = []
 
-    for post in posts:
+    for slot, post in enumerate(posts):
         title = post['title']
         post_id = post['id']
+        post_signature = signature(shingles(post))
 
-        if title in posts_by_title:
-            # Already have a post with this title
-            existing_id = posts_by_title[title]['id']
-
-            # If existing is original (manually created), skip this WordPress one
-            if existing_id in original_ids:
-                duplicates_removed.append(f"{title} (kept manual ID: {existing_id}, removed WP ID: {post_id})")
+        existing_slot = slots_by_title.get(title_key(title))
+        match = 'same title'
+        if existing_slot is None:
+            similar = index.most_similar(post_signature, threshold)
+            if similar is None:
+                kept[slot] = post
+                slots_by_title[title_key(title)] = slot
+                index.add(slot, post_signature)
                 continue
+            existing_slot, score = similar
+            match = f'{score:.0%} similar'
 
-            # If this one is original, replace the existing
-            if post_id in original_ids:
-                duplicates_removed.append(f"{title} (kept manual ID: {post_id}, removed WP ID: {existing_id})")
-                posts_by_title[title] = post
-                continue
+        existing = kept[existing_slot]
+        existing_id = existing['id']
+
+        # If existing is original (manually created), skip this WordPress one
+        if existing_id in original_ids:
+            duplicates_removed.append(f"{title} (kept manual ID: {existing_id}, removed WP ID: {post_id}, {match})")
+            continue
+
+        # If this one is original, it takes the existing post's place
+        if post_id in original_ids:
+            duplicates_removed.append(
+                f"{title} (kept manual ID: {post_id}, removed WP ID: {existing_id} '{existing['title']}', {match})")
+            del kept[existing_slot]
+            index.remove(existing_slot)
+            kept[slot] = post
+            for key in (title_key(existing['title']), title_key(title)):
+                slots_by_title[key] = slot
+            index.add(slot, post_signature)
+            continue
 
-            # If both are from WP, keep first one
-            duplicates_removed.append(f"{title} (kept {existing_id}, removed duplicate {post_id})")
-        else:
-            posts_by_title[title] = post
+        # If both are from WP, keep first one
+        duplicates_removed.append(f"{title} (kept {existing_id}, removed duplicate {post_id}, {match})")
 
-    # Convert back to list and sort by date
-    deduplicated = list(posts_by_title.values())
+    # Sort by date (newest first)
+    deduplicated = list(kept.values())
     deduplicated.sort(key=lambda x: x['publishDate'], reverse=True)
 
-    # Write output
-    output_path = Path('data/blog-posts-deduplicated.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(deduplicated, f, indent=2, ensure_ascii=False)
+    return deduplicated, duplicates_removed
+
+
+def load_original_ids(backup_path: Path) -> Set[str]:
+    """IDs of the manually created posts, from the pre-migration backup."""
+    if not backup_path.exists():
+        return set()
+
+    # Only the IDs are needed: read them from the offset index, not every post body
+    with BlogStore.open(backup_path) as store:
+        return {post_id for post_id in store.ids if post_id is not None}
+
+
+def _live_stem(posts_path: Path) -> str:
+    """Name of the live posts file a file belongs to: blog-posts for blog-posts-migrated.json."""
+    stem = posts_path.stem
+    return stem[:-len('-migrated')] if stem.endswith('-migrated') else stem
+
+
+def backup_path(posts_path: Path) -> Path:
+    """Pre-migration backup holding the manual posts, e.g. data/blog-posts.json.backup."""
+    return posts_path.with_name(f'{_live_stem(posts_path)}{posts_path.suffix}.backup')
+
+
+def deduplicated_path(posts_path: Path) -> Path:
+    """Default output for a posts file, e.g. data/blog-posts-deduplicated.json."""
+    return posts_path.with_name(f'{_live_stem(posts_path)}-deduplicated{posts_path.suffix}')
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Remove duplicate and near-duplicate blog posts.')
+    arg_parser.add_argument('posts', nargs='?', type=Path, default=MIGRATED_PATH,
+                            help='posts JSON file (default: the migration output)')
+    output_group = arg_parser.add_mutually_exclusive_group()
+    output_group.add_argument('--output', type=Path,
+                              help='output file (default: data/blog-posts-deduplicated.json for the default POSTS)')
+    output_group.add_argument('--in-place', action='store_true', help='rewrite POSTS itself')
+    arg_parser.add_argument('--original', type=Path,
+                            help='posts file whose IDs are the manually created posts (default: the backup for POSTS)')
+    arg_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='estimated content similarity (0-1) at which posts are duplicates')
+    arg_parser.add_argument('--dry-run', action='store_true', help='report duplicates without writing')
+    args = arg_parser.parse_args(argv)
+
+    original = args.original or backup_path(args.posts)
+    posts = load_posts(args.posts)
+    original_ids = load_original_ids(original)
+    if not original_ids:
+        print(f"⚠️  No manual posts found in {original}; keeping the first of each duplicate group")
+
+    deduplicated, duplicates_removed = deduplicate(posts, original_ids, args.threshold)
 
     print(f"Original posts: {len(posts)}")
     print(f"After deduplication: {len(deduplicated)}")
@@ -67,7 +275,18 @@ def deduplicate_posts():
         for dup in duplicates_removed:
             print(f"  - {dup}")
 
-    print(f"\n✓ Output written to: {output_path}")
+    if args.dry_run:
+        print("\nDry run: nothing written")
+        return 0
+
+    if args.in_place:
+        output_path = args.posts
+    else:
+        output_path = args.output or deduplicated_path(args.posts)
+    saved = save_posts(deduplicated, output_path)
+    print(f"\n✓ {describe_save(saved, output_path)}")
+    return 0
+
 
 if __name__ == '__main__':
-    deduplicate_posts()
+    exit(main())
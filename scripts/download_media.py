@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Download WordPress media that is missing locally, resumably.
+
+Takes the missing_images list of WordPressImageAnalyzer.analyze_and_fix()
+(or plain URLs) and fetches each file into assets/images/imagenes-blog:
+
+- downloads run concurrently under asyncio, at most PER_HOST at a time per
+  host and MAX_CONCURRENCY overall; each host has a pool of keep-alive
+  connections that later downloads reuse
+- a file is written to NAME.part and moved into place once complete; an
+  interrupted download resumes from the part with a Range request
+  (If-Range makes the server send the whole file if it changed meanwhile)
+- the ETag and Last-Modified of every download are kept in
+  data/.media-downloads.json, so a re-run revalidates files it fetched
+  before (If-None-Match / If-Modified-Since) instead of fetching them again
+- the SHA-256 of every file is checked against the expected one, when the
+  item or the server (Repr-Digest / Digest) gives it, and recorded
+
+HTTP is http.client (no third-party client), each transfer running in a
+worker thread while the event loop schedules them.
+
+Usage:
+    python3 scripts/download_media.py URL [URL ...] [--dir assets/images/imagenes-blog]
+        [--per-host 4] [--jobs 8]
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import http.client
+import json
+import os
+import ssl
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from blog_data import write_if_changed
+
+IMAGES_DIR = Path('assets/images/imagenes-blog')
+STATE_PATH = Path('data/.media-downloads.json')
+STATE_VERSION = 1
+
+PER_HOST = 4          # simultaneous downloads per host
+MAX_CONCURRENCY = 8   # simultaneous downloads overall
+TIMEOUT = 30          # seconds per connect or read
+RETRIES = 2           # further attempts after a connection error or a 5xx/429
+RETRY_DELAY = 0.5     # seconds before the first retry, doubling after each
+MAX_REDIRECTS = 5
+BLOCK_SIZE = 1 << 16
+
+USER_AGENT = 'CarlosRodgarman.com media downloader'
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class DownloadError(Exception):
+    """A download that failed for good (bad status, checksum or size)."""
+
+
+class TransientError(Exception):
+    """A failure worth retrying (5xx or 429)."""
+
+
+class ConnectionPool:
+    """Idle keep-alive connections by (scheme, host:port), shared by worker threads."""
+
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_context)
+        if scheme == 'http':
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise DownloadError(f'unsupported URL scheme {scheme!r}')
+
+    def release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def response_sha256(response: http.client.HTTPResponse) -> Optional[str]:
+    """SHA-256 (hex) the server states for the whole file, from Repr-Digest or Digest."""
+    # Repr-Digest: sha-256=:BASE64:   (RFC 9530)     Digest: SHA-256=BASE64   (RFC 3230)
+    for header in ('Repr-Digest', 'Digest'):
+        for part in (response.getheader(header) or '').split(','):
+            algorithm, _, value = part.strip().partition('=')
+            if algorithm.lower() == 'sha-256' and value:
+                try:
+                    return base64.b64decode(value.strip(':')).hex()
+                except ValueError:
+                    return None
+    return None
+
+
+def media_items(missing_images: Iterable[Dict]) -> List[Dict]:
+    """Download items ({url, filename}) of analyze_and_fix()'s missing_images."""
+    items = []
+    for image in missing_images:
+        url = image.get('wp_url', '')
+        if not url.startswith(('http://', 'https://')):
+            continue
+        filename = image.get('wp_filename', 'unknown')
+        if filename == 'unknown':
+            filename = unquote(urlsplit(url).path.rsplit('/', 1)[-1])
+        items.append({'url': url, 'filename': filename})
+    return items
+
+
+class MediaDownloader:
+    """Concurrent, resumable, revalidating downloads into one directory."""
+
+    def __init__(self, dest_dir: Path = IMAGES_DIR, state_path: Optional[Path] = STATE_PATH,
+                 per_host: int = PER_HOST, max_concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = TIMEOUT, retries: int = RETRIES):
+        self.dest_dir = Path(dest_dir)
+        self.state_path = Path(state_path) if state_path else None
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.pool = ConnectionPool(timeout)
+        self.state: Dict[str, Dict] = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            state = json.loads(self.state_path.read_text())
+        except ValueError:
+            return {}
+        return state['files'] if state.get('version') == STATE_VERSION else {}
+
+    def _save_state(self):
+        if self.state_path:
+            state = {'version': STATE_VERSION, 'files': self.state}
+            write_if_changed(self.state_path, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
+
+    def download(self, items: Iterable[Dict]) -> List[Dict]:
+        """Download items ({url, filename, optional sha256}); one result per item, in order."""
+        try:
+            return asyncio.run(self.download_all(list(items)))
+        finally:
+            self.pool.close()
+            self._save_state()
+
+    async def download_all(self, items: List[Dict]) -> List[Dict]:
+        overall = asyncio.Semaphore(self.max_concurrency)
+        hosts: Dict[str, asyncio.Semaphore] = {}
+        for item in items:
+            host = urlsplit(item['url']).netloc.lower()
+            if host not in hosts:
+                hosts[host] = asyncio.Semaphore(self.per_host)
+
+        async def run(item: Dict) -> Dict:
+            async with hosts[urlsplit(item['url']).netloc.lower()], overall:
+                return await self._download(item)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+    async def _download(self, item: Dict) -> Dict:
+        url = item['url']
+        name = Path(item.get('filename') or unquote(urlsplit(url).path.rsplit('/', 1)[-1])).name
+        result = {'url': url, 'path': str(self.dest_dir / name), 'status': 'failed', 'bytes': 0}
+        if not name:
+            result['error'] = 'no filename'
+            return result
+
+        # The entry is updated in the worker thread as headers arrive, so the
+        # validators of an interrupted download are kept for resuming it
+        entry = dict(self.state.get(url, {}))
+        try:
+            result.update(await asyncio.to_thread(self._fetch, url, self.dest_dir / name, item.get('sha256'), entry))
+        except (DownloadError, TransientError, OSError, http.client.HTTPException) as e:
+            result['error'] = str(e) or type(e).__name__
+        if entry:
+            self.state[url] = entry
+        return result
+
+    def _fetch(self, url: str, dest: Path, expected_sha256: Optional[str], entry: Dict) -> Dict:
+        """Download url to dest, retrying transient failures (runs in a worker thread)."""
+        for attempt in range(self.retries + 1):
+            try:
+                return self._fetch_once(url, dest, expected_sha256, entry)
+            except (TransientError, OSError, http.client.HTTPException):
+                if attempt == self.retries:
+                    raise
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+
+    def _fetch_once(self, url: str, dest: Path, expected_sha256: Optional[str], entry: Dict) -> Dict:
+        part = dest.with_name(dest.name + '.part')
+        headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity'}
+        etag, last_modified = entry.get('etag'), entry.get('last_modified')
+        strong_etag = etag if etag and not etag.startswith('W/') else None
+
+        offset = 0
+        if dest.exists():
+            if not (etag or last_modified):
+                return {'status': 'exists'}
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        elif part.exists() and (strong_etag or last_modified):
+            offset = part.stat().st_size
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = strong_etag or last_modified
+
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            connection = self.pool.acquire(parts.scheme, parts.netloc)
+            location = None
+            try:
+                connection.request('GET', target, headers=headers)
+                response = connection.getresponse()
+                if response.status in REDIRECT_STATUSES and response.getheader('Location'):
+                    response.read()
+                    location = urljoin(url, response.getheader('Location'))
+                else:
+                    result = self._receive(response, dest, part, offset, expected_sha256, entry)
+            except BaseException:
+                connection.close()
+                raise
+
+            # The response has been read to the end, so the connection can serve the next request
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(parts.scheme, parts.netloc, connection)
+            if location is None:
+                return result
+            url = location
+        raise DownloadError(f'more than {MAX_REDIRECTS} redirects')
+
+    def _receive(self, response: http.client.HTTPResponse, dest: Path, part: Path, offset: int,
+                 expected_sha256: Optional[str], entry: Dict) -> Dict:
+        status = response.status
+        if status == 304:
+            response.read()
+            return {'status': 'current'}
+        if status == 416 and offset:
+            # The part is stale or already whole: start over next attempt
+            response.read()
+            part.unlink()
+            entry.pop('etag', None)
+            entry.pop('last_modified', None)
+            raise TransientError('range not satisfiable; restarting')
+        if status in (429,) or status >= 500:
+            response.read()
+            raise TransientError(f'HTTP {status}')
+        if status == 206 and offset:
+            content_range = response.getheader('Content-Range', '')
+            if not content_range.startswith(f'bytes {offset}-'):
+                response.read()
+                part.unlink()
+                raise TransientError(f'unexpected Content-Range {content_range!r}; restarting')
+        elif status == 200:
+            offset = 0
+        else:
+            response.read()
+            raise DownloadError(f'HTTP {status} {response.reason}')
+
+        entry['etag'] = response.getheader('ETag')
+        entry['last_modified'] = response.getheader('Last-Modified')
+
+        digest = hashlib.sha256()
+        if offset:
+            with open(part, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+
+        received = 0
+        part.parent.mkdir(parents=True, exist_ok=True)
+        with open(part, 'ab' if offset else 'wb') as f:
+            for block in iter(lambda: response.read(BLOCK_SIZE), b''):
+                f.write(block)
+                digest.update(block)
+                received += len(block)
+
+        length = response.getheader('Content-Length')
+        if length is not None and received != int(length):
+            # Truncated: keep the part to resume from
+            raise TransientError(f'received {received} of {length} bytes')
+
+        sha256 = digest.hexdigest()
+        for source, expected in (('expected', expected_sha256), ('server', response_sha256(response))):
+            if expected and expected.lower() != sha256:
+                part.unlink()
+                entry.pop('etag', None)
+                entry.pop('last_modified', None)
+                raise DownloadError(f'SHA-256 mismatch with the {source} checksum')
+
+        os.replace(part, dest)
+        entry.update({'path': str(dest), 'size': offset + received, 'sha256': sha256})
+        return {'status': 'resumed' if offset else 'downloaded', 'bytes': received, 'sha256': sha256}
+
+
+def download_missing(missing_images: List[Dict], images_dir: Path = IMAGES_DIR, **options) -> List[Dict]:
+    """Download analyze_and_fix()'s missing_images into images_dir."""
+    return MediaDownloader(images_dir, **options).download(media_items(missing_images))
+
+
+def print_results(results: List[Dict]):
+    icons = {'downloaded': '⬇️ ', 'resumed': '⏯️ ', 'current': '✓', 'exists': '✓', 'failed': '❌'}
+    for result in results:
+        detail = f"{result['bytes']} bytes" if result['bytes'] else result['status']
+        if result.get('error'):
+            detail = result['error']
+        print(f"   {icons.get(result['status'], '•')} {result['path']} ({detail})")
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(f"\n{', '.join(f'{n} {status}' for status, n in sorted(counts.items())) or 'nothing to download'}")
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Download media files, resuming partial downloads.')
+    arg_parser.add_argument('urls', nargs='+', help='media URLs')
+    arg_parser.add_argument('--dir', type=Path, default=IMAGES_DIR, help='destination directory')
+    arg_parser.add_argument('--per-host', type=int, default=PER_HOST, help='simultaneous downloads per host')
+    arg_parser.add_argument('--jobs', type=int, default=MAX_CONCURRENCY, help='simultaneous downloads overall')
+    args = arg_parser.parse_args(argv)
+
+    downloader = MediaDownloader(args.dir, per_host=args.per_host, max_concurrency=args.jobs)
+    print(f"📡 Downloading {len(args.urls)} files into {args.dir}")
+    results = downloader.download({'url': url} for url in args.urls)
+    print_results(results)
+    return 0 if all(result['status'] != 'failed' for result in results) else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -3,72 +3,94 @@
 Fix featured images to use correct, specific images for each post.
 """
 
-import json
-from pathlib import Path
+from typing import Dict, List
 
-def fix_featured_images():
-    """Update featured images with specific, relevant images."""
+from blog_data import describe_save
+from content_store import ContentStore
+
+PLACEHOLDER = 'assets/images/blog/placeholder.jpg'
 
-    # Load posts
-    posts_path = Path('data/blog-posts.json')
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+# Specific image mappings for posts
+IMAGE_UPDATES = {
+    'Carlos Rodgarman: Excellence in Music Production in Los Angeles':
+        'assets/images/imagenes-blog/neve-genesys-g3d-dolby-atmos-los-angeles.jpg',
 
-    # Specific image mappings for posts
-    image_updates = {
-        'Carlos Rodgarman: Excellence in Music Production in Los Angeles':
-            'assets/images/imagenes-blog/neve-genesys-g3d-dolby-atmos-los-angeles.jpg',
+    'Carlos Rodgarman Adds Prestige To His Studio By Installing A Genesys Black':
+        'assets/images/imagenes-blog/rodgarman_neve.jpg',
 
-        'Carlos Rodgarman Adds Prestige To His Studio By Installing A Genesys Black':
-            'assets/images/imagenes-blog/rodgarman_neve.jpg',
+    'RG Music Mixes Immersive Michael Bublé Collection':
+        'assets/images/imagenes-blog/2022-08-25-genelec-726x408-1.jpg',
 
-        'RG Music Mixes Immersive Michael Bublé Collection':
-            'assets/images/imagenes-blog/2022-08-25-genelec-726x408-1.jpg',
+    'Celebration night.':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Celebration night.':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'Interview for holahollywood.com':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Interview for holahollywood.com':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'Press release in Faro de Vigo':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Press release in Faro de Vigo':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'Practicing with the Harpejji':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Practicing with the Harpejji':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'Thanks Marcodi Musical':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Thanks Marcodi Musical':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'Thank you Anna Sarkisova for this beautiful video as my dear friend Arturo.':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
 
-        'Thank you Anna Sarkisova for this beautiful video as my dear friend Arturo.':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+    'My Journey in Music: From Galicia to Los Angeles':
+        'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
+}
 
-        'My Journey in Music: From Galicia to Los Angeles':
-            'assets/images/imagenes-blog/Carlos-Rodgarman-Music-Producer-at-RG-Studios.jpg',
-    }
+def _set_image(post: Dict, new_image: str) -> bool:
+    """Set a post's featured image, printing the change. Returns True if it changed."""
+    old_image = post['featuredImage']
+    if old_image == new_image:
+        return False
+    post['featuredImage'] = new_image
+    print(f"✓ {post['title']}")
+    print(f"  FROM: {old_image}")
+    print(f"  TO:   {new_image}")
+    return True
 
-    updates = []
+def fix_posts(posts: List[Dict]) -> int:
+    """Set specific featured images by exact post title, in memory. Returns posts changed."""
+    updates = 0
     for post in posts:
         title = post['title']
-        if title in image_updates:
-            old_image = post['featuredImage']
-            new_image = image_updates[title]
-            if old_image != new_image:
-                post['featuredImage'] = new_image
-                updates.append(f"✓ {title}")
-                updates.append(f"  FROM: {old_image}")
-                updates.append(f"  TO:   {new_image}")
+        if title in IMAGE_UPDATES and _set_image(post, IMAGE_UPDATES[title]):
+            updates += 1
+
+    return updates
+
+def fix_store(store: ContentStore) -> int:
+    """fix_posts() through the store's title index, in one transaction. Returns posts changed."""
+    updates = 0
+    with store.batch():
+        for title, new_image in IMAGE_UPDATES.items():
+            for post in store.by_title(title):
+                if _set_image(post, new_image):
+                    store.put(post)
+                    updates += 1
+
+    return updates
+
+def fix_featured_images():
+    """Update featured images with specific, relevant images."""
+
+    store = ContentStore.open()
+
+    updates = fix_store(store)
 
     # Write updated posts
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2, ensure_ascii=False)
+    saved = store.export()
 
-    print(f"Updated {len(updates)//3} featured images:\n")
-    for update in updates:
-        print(update)
+    print(f"\nUpdated {updates} featured images")
+    print(describe_save(saved))
 
     # Count remaining placeholders
-    placeholder_count = sum(1 for p in posts if p['featuredImage'] == 'assets/images/blog/placeholder.jpg')
+    placeholder_count = len(store.with_featured_image(PLACEHOLDER))
     print(f"\nRemaining placeholders: {placeholder_count}")
 
 if __name__ == '__main__':
@@ -1,68 +1,44 @@
 #!/usr/bin/env python3
 """
 Fix HTML tag issues in post content.
-Specifically: <li> items that close with </div> instead of </li>
+Balances every post's tags (html_balancer.py): <li> items that close with
+</div>, elements left unclosed and stray closing tags.
 """
 
-import json
-import re
-from pathlib import Path
+from collections import Counter
+from typing import Dict, List
 
-def fix_html_tags():
-    """Fix HTML tag mismatches in post content."""
-
-    # Load posts
-    posts_path = Path('data/blog-posts.json')
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+from blog_data import describe_save, load_posts, save_posts
+from html_balancer import balance_html
 
+def fix_posts(posts: List[Dict]) -> int:
+    """Fix HTML tag mismatches in post content, in memory. Returns posts changed."""
     fixes = 0
     for post in posts:
-        content = post['content']
-        original = content
-
-        # Fix list items: <li>...</div> should be <li>...</li>
-        # Look for <li> followed by content and closing with </div>
-        content = re.sub(r'<li>([^<]*)</div>', r'<li>\1</li>', content)
-
-        # More complex case: <li>...content...</div>
-        # This regex handles li tags that have content and close with div
-        def fix_list_item(match):
-            # If we have <li> and the closing is </div> and we're in a <ul>, fix it
-            li_content = match.group(1)
-            # Check if there's a </ul> or </ol> after this
-            return f'<li>{li_content}</li>'
-
-        # Find <li>...text...</div> patterns that aren't part of gallery-item
-        lines = content.split('\n')
-        fixed_lines = []
-        in_list = False
+        counts = Counter()
+        content = balance_html(post['content'], counts=counts)
 
-        for line in lines:
-            # Track if we're in a list
-            if '<ul>' in line or '<ol>' in line:
-                in_list = True
-            elif '</ul>' in line or '</ol>' in line:
-                in_list = False
+        if content != post['content']:
+            post['content'] = content
+            fixes += 1
+            repairs = ', '.join(f"{n} {name}" for name, n in sorted(counts.items()))
+            print(f"✓ Fixed: {post['title']} ({repairs})")
 
-            # If we're in a list and line has <li>...</div>, fix it
-            if in_list and '<li>' in line and '</div>' in line and 'gallery-item' not in line:
-                line = re.sub(r'</div>', '</li>', line)
+    return fixes
 
-            fixed_lines.append(line)
+def fix_html_tags():
+    """Fix HTML tag mismatches in post content."""
 
-        content = '\n'.join(fixed_lines)
+    # Load posts
+    posts = load_posts()
 
-        if content != original:
-            post['content'] = content
-            fixes += 1
-            print(f"✓ Fixed: {post['title']}")
+    fixes = fix_posts(posts)
 
     # Write updated posts
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2, ensure_ascii=False)
+    saved = save_posts(posts)
 
     print(f"\nTotal posts fixed: {fixes}")
+    print(describe_save(saved))
 
 if __name__ == '__main__':
     fix_html_tags()
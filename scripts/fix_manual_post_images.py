@@ -4,16 +4,12 @@ Fix images for the 4 manually created posts that reference assets/images/blog/*
 These should use actual images from imagenes-blog instead.
 """
 
-import json
-from pathlib import Path
+from typing import Dict, List
 
-def fix_manual_post_images():
-    """Update manually created posts to use correct image paths."""
+from blog_data import describe_save, load_posts, save_posts
 
-    # Load posts
-    posts_path = Path('data/blog-posts.json')
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+def fix_posts(posts: List[Dict]) -> int:
+    """Point the manually created posts at their imagenes-blog images, in memory. Returns posts changed."""
 
     # Mappings for the 4 manually created posts
     manual_post_images = {
@@ -23,7 +19,7 @@ def fix_manual_post_images():
         'neve-genesys-antelope-galaxy-synergy': 'assets/images/imagenes-blog/neve-genesys-g3d-dolby-atmos-los-angeles.jpg',
     }
 
-    updates = []
+    updates = 0
     for post in posts:
         post_id = post['id']
         if post_id in manual_post_images:
@@ -32,20 +28,29 @@ def fix_manual_post_images():
 
             if old_image != new_image:
                 post['featuredImage'] = new_image
-                updates.append(f"{post['title']}")
-                updates.append(f"  FROM: {old_image}")
-                updates.append(f"  TO:   {new_image}")
+                updates += 1
+                print(f"  {post['title']}")
+                print(f"    FROM: {old_image}")
+                print(f"    TO:   {new_image}")
+
+    return updates
+
+def fix_manual_post_images():
+    """Update manually created posts to use correct image paths."""
+
+    # Load posts
+    posts = load_posts()
+
+    updates = fix_posts(posts)
 
     # Write updated posts
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2, ensure_ascii=False)
+    saved = save_posts(posts)
 
     if updates:
-        print(f"Updated {len(updates)//3} post images:")
-        for update in updates:
-            print(f"  {update}")
+        print(f"Updated {updates} post images")
     else:
         print("No updates needed - all images already correct")
+    print(describe_save(saved))
 
 if __name__ == '__main__':
     fix_manual_post_images()
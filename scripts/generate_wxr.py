@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic WordPress export (WXR) and a matching uploads directory
+for benchmarking the migration.
+
+Each post gets its own attachments (uploaded images with WordPress size
+variants referenced from the content), Gutenberg paragraph, image and
+gallery blocks, categories, tags and postmeta (thumbnail, Yoast fields and
+filler keys). A share of drafts, pages and nav menu items is mixed in, as
+in real exports. The uploads directory holds an empty file per attachment,
+with some left out and some renamed so the image lookup exercises its
+exact, size-less and fuzzy paths.
+
+Usage:
+    python3 scripts/generate_wxr.py export.xml[.gz] [--posts 1000] [--attachments 3]
+        [--gallery-rate 0.3] [--postmeta 8] [--uploads DIR] [--seed 42]
+"""
+
+import argparse
+import gzip
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+SITE_URL = 'https://carlosrodgarman.com'
+
+WXR_HEADER = '''<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0"
+    xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
+    xmlns:content="http://purl.org/rss/1.0/modules/content/"
+    xmlns:wfw="http://wellformedweb.org/CommentAPI/"
+    xmlns:dc="http://purl.org/dc/elements/1.1/"
+    xmlns:wp="http://wordpress.org/export/1.2/">
+<channel>
+    <title>Carlos Rodgarman</title>
+    <link>{site}</link>
+    <wp:wxr_version>1.2</wp:wxr_version>
+    <wp:author><wp:author_login><![CDATA[carlos]]></wp:author_login></wp:author>
+    <wp:category><wp:term_id>1</wp:term_id><wp:category_nicename><![CDATA[blog]]></wp:category_nicename></wp:category>
+'''
+WXR_FOOTER = '</channel>\n</rss>\n'
+
+WORDS = ('studio mix neve analog session record console genesys black immersive atmos dolby '
+         'orchestra strings brass vocal producer engineer mastering tracking microphone preamp '
+         'compressor equalizer reverb los angeles album grammy latin pop film score symphony').split()
+CATEGORIES = ['Blog', 'Events', 'Studio', 'News', 'Gear']
+TAGS = ['Neve', 'Studio', 'Mixing', 'Dolby Atmos', 'Analog Console', 'Interview', 'Grammy',
+        'Orchestra', 'Film Score', 'Mastering', 'Genesys Black', 'Immersive Audio']
+SIZE_VARIANTS = ['300x200', '768x512', '1024x683', '150x150']
+
+# Share of extra non-post items per post
+DRAFT_RATE = 0.05
+PAGE_RATE = 0.02
+MENU_ITEM_RATE = 0.03
+
+# Uploads directory: share of attachments left out, and renamed (fuzzy lookup)
+MISSING_RATE = 0.05
+RENAMED_RATE = 0.05
+
+
+def cdata(text: str) -> str:
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def upload_url(attachment: Dict, size: Optional[str] = None) -> str:
+    stem, extension = attachment['filename'].rsplit('.', 1)
+    name = f'{stem}-{size}.{extension}' if size else attachment['filename']
+    return f"{SITE_URL}/wp-content/uploads/{attachment['folder']}/{name}"
+
+
+def post_content(rng: random.Random, attachments: List[Dict], gallery_rate: float) -> str:
+    """Gutenberg content with paragraphs, image blocks and an optional gallery."""
+    blocks = []
+    images = list(attachments)
+
+    for _ in range(rng.randint(3, 10)):
+        kind = rng.random()
+        if kind < 0.7 or not images:
+            blocks.append(f'<!-- wp:paragraph -->\n<p>{sentence(rng, 20, 90).capitalize()}.</p>\n'
+                          f'<!-- /wp:paragraph -->')
+        elif kind < 0.9:
+            attachment = images.pop(0)
+            size = rng.choice(SIZE_VARIANTS)
+            blocks.append(
+                f'<!-- wp:image {{"id":{attachment["id"]},"sizeSlug":"large"}} -->\n'
+                f'<figure class="wp-block-image size-large"><img src="{upload_url(attachment, size)}" '
+                f'alt="" class="wp-image-{attachment["id"]}"/><figcaption>{sentence(rng, 4, 10)}</figcaption>'
+                f'</figure>\n<!-- /wp:image -->'
+            )
+        else:
+            blocks.append('<!-- wp:paragraph -->\n<p> </p>\n<!-- /wp:paragraph -->')
+
+    if attachments and rng.random() < gallery_rate:
+        ids = ','.join(str(a['id']) for a in attachments)
+        items = ''.join(
+            f'<li class="blocks-gallery-item"><figure><img src="{upload_url(a, "1024x683")}" '
+            f'alt="" data-id="{a["id"]}" data-full-url="{upload_url(a)}" data-link="{SITE_URL}/?attachment_id={a["id"]}" '
+            f'class="wp-image-{a["id"]}"/></figure></li>'
+            for a in attachments
+        )
+        blocks.append(f'<!-- wp:gallery {{"ids":[{ids}]}} -->\n'
+                      f'<ul class="wp-block-gallery columns-3 is-cropped">{items}</ul>\n<!-- /wp:gallery -->')
+
+    return '\n\n'.join(blocks)
+
+
+def attachment_item(attachment: Dict, parent_id: int, date: str) -> str:
+    return f'''    <item>
+        <title>{escape(attachment['filename'])}</title>
+        <link>{SITE_URL}/?attachment_id={attachment['id']}</link>
+        <wp:post_id>{attachment['id']}</wp:post_id>
+        <wp:post_date>{cdata(date)}</wp:post_date>
+        <wp:post_name>{cdata(attachment['filename'].rsplit('.', 1)[0])}</wp:post_name>
+        <wp:status>{cdata('inherit')}</wp:status>
+        <wp:post_parent>{parent_id}</wp:post_parent>
+        <wp:post_type>{cdata('attachment')}</wp:post_type>
+        <wp:attachment_url>{cdata(upload_url(attachment))}</wp:attachment_url>
+        <wp:postmeta><wp:meta_key>{cdata('_wp_attached_file')}</wp:meta_key><wp:meta_value>{cdata(attachment['folder'] + '/' + attachment['filename'])}</wp:meta_value></wp:postmeta>
+    </item>
+'''
+
+
+def post_item(rng: random.Random, post_id: int, slug: str, title: str, date: str, content: str,
+              post_type: str, status: str, meta: Dict[str, str]) -> str:
+    category = rng.choice(CATEGORIES)
+    tags = rng.sample(TAGS, rng.randint(0, 4))
+    terms = f'        <category domain="category" nicename="{category.lower()}">{cdata(category)}</category>\n'
+    terms += ''.join(f'        <category domain="post_tag" nicename="{tag.lower().replace(" ", "-")}">{cdata(tag)}</category>\n'
+                     for tag in tags)
+    postmeta = ''.join(f'        <wp:postmeta><wp:meta_key>{cdata(key)}</wp:meta_key>'
+                       f'<wp:meta_value>{cdata(value)}</wp:meta_value></wp:postmeta>\n'
+                       for key, value in meta.items())
+    excerpt = sentence(rng, 10, 25) if rng.random() < 0.3 else ''
+
+    return f'''    <item>
+        <title>{escape(title)}</title>
+        <link>{SITE_URL}/{slug}/</link>
+        <pubDate>{datetime.strptime(date, '%Y-%m-%d %H:%M:%S').strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>
+        <dc:creator>{cdata('carlos')}</dc:creator>
+        <content:encoded>{cdata(content)}</content:encoded>
+        <excerpt:encoded>{cdata(excerpt)}</excerpt:encoded>
+        <wp:post_id>{post_id}</wp:post_id>
+        <wp:post_date>{cdata(date)}</wp:post_date>
+        <wp:post_name>{cdata(slug)}</wp:post_name>
+        <wp:status>{cdata(status)}</wp:status>
+        <wp:post_parent>0</wp:post_parent>
+        <wp:post_type>{cdata(post_type)}</wp:post_type>
+{terms}{postmeta}    </item>
+'''
+
+
+def post_meta(rng: random.Random, title: str, thumbnail_id: Optional[int], count: int) -> Dict[str, str]:
+    """Thumbnail and Yoast fields, padded with filler keys up to count entries."""
+    meta = {}
+    if thumbnail_id:
+        meta['_thumbnail_id'] = str(thumbnail_id)
+    meta['_yoast_wpseo_metadesc'] = f'{title}. {sentence(rng, 8, 20)}'
+    meta['_yoast_wpseo_focuskw'] = rng.choice(TAGS)
+    meta['_yoast_wpseo_estimated-reading-time-minutes'] = str(rng.randint(1, 8))
+    filler = 0
+    while len(meta) < count:
+        meta[f'_edit_meta_{filler}'] = str(rng.randint(1, 10 ** 6))
+        filler += 1
+    return meta
+
+
+def iter_items(posts: int, attachments_per_post: int, gallery_rate: float, postmeta: int,
+               seed: int, uploads: List[Dict]) -> Iterator[str]:
+    """Yield every <item> of the export; attachments are appended to uploads."""
+    rng = random.Random(seed)
+    next_id = 1
+    start = datetime(2012, 1, 1)
+
+    for n in range(posts):
+        date = start + timedelta(minutes=n * 137 + rng.randint(0, 60))
+        date_text = date.strftime('%Y-%m-%d %H:%M:%S')
+        post_id = next_id
+        next_id += 1
+
+        attachments = []
+        for _ in range(rng.randint(max(0, attachments_per_post - 1), attachments_per_post + 1)):
+            attachment = {'id': next_id, 'folder': date.strftime('%Y/%m'),
+                          'filename': f'{rng.choice(WORDS)}-{rng.choice(WORDS)}-{next_id}.jpg'}
+            next_id += 1
+            attachments.append(attachment)
+            uploads.append(attachment)
+            yield attachment_item(attachment, post_id, date_text)
+
+        title = sentence(rng, 3, 9).title()
+        slug = f"{title.lower().replace(' ', '-')}-{post_id}"
+        content = post_content(rng, attachments, gallery_rate)
+        thumbnail = attachments[0]['id'] if attachments and rng.random() < 0.85 else None
+        meta = post_meta(rng, title, thumbnail, postmeta)
+        yield post_item(rng, post_id, slug, title, date_text, content, 'post', 'publish', meta)
+
+        # Items the migration must skip
+        for rate, post_type, status in ((DRAFT_RATE, 'post', 'draft'), (PAGE_RATE, 'page', 'publish'),
+                                        (MENU_ITEM_RATE, 'nav_menu_item', 'publish')):
+            if rng.random() < rate:
+                extra_id = next_id
+                next_id += 1
+                yield post_item(rng, extra_id, f'{post_type}-{extra_id}', sentence(rng, 2, 5).title(),
+                                date_text, post_content(rng, [], 0), post_type, status, {})
+
+
+def write_export(path: Path, posts: int, attachments_per_post: int = 3, gallery_rate: float = 0.3,
+                 postmeta: int = 8, seed: int = 42) -> List[Dict]:
+    """Write the export (gzipped for .gz paths). Returns the attachments."""
+    uploads: List[Dict] = []
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write(WXR_HEADER.format(site=SITE_URL))
+        for item in iter_items(posts, attachments_per_post, gallery_rate, postmeta, seed, uploads):
+            f.write(item)
+        f.write(WXR_FOOTER)
+    return uploads
+
+
+def write_uploads(directory: Path, attachments: List[Dict], seed: int = 42) -> int:
+    """Create an empty local file per attachment (some missing or renamed). Returns files created."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    created = 0
+    for attachment in attachments:
+        roll = rng.random()
+        if roll < MISSING_RATE:
+            continue
+        filename = attachment['filename']
+        if roll < MISSING_RATE + RENAMED_RATE:
+            stem, extension = filename.rsplit('.', 1)
+            filename = f'{stem}-1.{extension}'
+        (directory / filename).touch()
+        created += 1
+    return created
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Generate a synthetic WordPress export.')
+    arg_parser.add_argument('output', type=Path, help='export path (.xml or .xml.gz)')
+    arg_parser.add_argument('--posts', type=int, default=1000, help='published posts')
+    arg_parser.add_argument('--attachments', type=int, default=3, help='attachments per post (average)')
+    arg_parser.add_argument('--gallery-rate', type=float, default=0.3, help='share of posts with a gallery')
+    arg_parser.add_argument('--postmeta', type=int, default=8, help='postmeta entries per post')
+    arg_parser.add_argument('--uploads', type=Path, help='also create a matching uploads directory')
+    arg_parser.add_argument('--seed', type=int, default=42)
+    args = arg_parser.parse_args(argv)
+
+    attachments = write_export(args.output, args.posts, args.attachments, args.gallery_rate,
+                               args.postmeta, args.seed)
+    size_mb = args.output.stat().st_size / 1e6
+    print(f"✓ {args.output}: {args.posts} posts, {len(attachments)} attachments ({size_mb:.1f} MB)")
+
+    if args.uploads:
+        created = write_uploads(args.uploads, attachments, args.seed)
+        print(f"✓ {args.uploads}: {created} upload files")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Balance the tags of an HTML fragment in one streaming pass.
+
+The fragment is tokenized by html.parser's incremental parser and copied
+through unchanged, except for closing tags: a stack of open elements
+decides, for each closing tag, whether it closes what is open, closes
+elements left unclosed inside it, stands in for the innermost open element
+(a mismatched closer such as ``<li>...</div>``) or is a stray to drop.
+Elements still open at the end are closed, and elements with an implied
+end (``<li>`` before the next ``<li>``, ``<p>`` before a block) are closed
+explicitly. Open elements are also counted by name, so every token is
+handled in constant amortized time and the pass is linear in the input.
+
+Elements can be renamed as they are opened (ElementRename): the closing tag
+of a renamed element is rewritten to match, wherever it occurs, instead of
+rewriting every closing tag of that name.
+
+The decisions are made by a TagStack, which other tokenizers can drive
+too (migrate_wordpress_posts.RewriteEngine balances with its own).
+
+The output is the input with only those tags replaced: each handler finds
+its tag in the input from getpos() and get_starttag_text(), and everything
+between edits is copied verbatim. Input after the last '>' cannot hold a
+complete tag, so it is held back from the parser and copied at close().
+
+Usage:
+    python3 scripts/html_balancer.py FILE [--output PATH]
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Elements that never have content or a closing tag
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+
+BLOCK_ELEMENTS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul',
+])
+
+# Elements whose content html.parser reads as raw text, not markup
+RAW_TEXT_ELEMENTS = frozenset(HTMLParser.CDATA_CONTENT_ELEMENTS) | frozenset(
+    getattr(HTMLParser, 'RCDATA_CONTENT_ELEMENTS', ())) | frozenset(['plaintext'])
+
+# Tag names the balancer tracks; anything else html.parser accepts (e.g. "a<b") is copied as is
+TAG_NAME = re.compile(r'[a-z][a-z0-9-]*$')
+
+TABLE_SECTIONS = frozenset(['thead', 'tbody', 'tfoot'])
+
+# Open element -> opening tags that end it implicitly (HTML optional end tags)
+IMPLIED_END = {
+    'p': BLOCK_ELEMENTS,
+    'li': frozenset(['li']),
+    'dt': frozenset(['dt', 'dd']),
+    'dd': frozenset(['dt', 'dd']),
+    'option': frozenset(['option']),
+    'td': frozenset(['td', 'th', 'tr']) | TABLE_SECTIONS,
+    'th': frozenset(['td', 'th', 'tr']) | TABLE_SECTIONS,
+    'tr': frozenset(['tr']) | TABLE_SECTIONS,
+    'thead': frozenset(['tbody', 'tfoot']),
+    'tbody': frozenset(['tbody', 'tfoot']),
+    'tfoot': frozenset(['tbody']),
+}
+
+
+class ElementRename:
+    """Replace the opening tag of matching elements, e.g. a gallery <ul> with a <div>.
+
+    An element matches when its tag is ``tag`` and its class attribute
+    matches ``class_pattern`` from the start. The element's closing tag
+    becomes that of the replacement's tag.
+    """
+
+    def __init__(self, name: str, tag: str, class_pattern: str, replacement: str):
+        self.name = name
+        self.tag = tag
+        self.class_pattern = class_pattern
+        self.replacement = replacement
+        self.closer = f'</{re.match(r"<([a-zA-Z][a-zA-Z0-9-]*)", replacement).group(1).lower()}>'
+        self._match = re.compile(class_pattern).match
+
+    def matches(self, attrs: List[Tuple[str, Optional[str]]]) -> bool:
+        for name, value in attrs:
+            if name == 'class':
+                return bool(self._match(value or ''))
+        return False
+
+
+class TagStack:
+    """The balancing decisions, for a tokenizer that reports each tag in order.
+
+    start() and end() say what to write for a start or end tag, close() what
+    to write at the end. Counts: renamed elements, 'closed' (closing tags
+    inserted for unclosed or implicitly ended elements), 'mismatched'
+    (closing tags rewritten to the innermost open element), 'dropped' (stray
+    closing tags removed) and 'br' (stray </br> written as <br>, as browsers
+    read it).
+    """
+
+    def __init__(self, renames: Iterable[ElementRename] = ()):
+        self.renames: Dict[str, List[ElementRename]] = {}
+        for rename in renames:
+            self.renames.setdefault(rename.tag, []).append(rename)
+        self.counts: Counter = Counter()
+        self._stack: List[Tuple[str, str]] = []  # (tag, closing tag to write)
+        self._open: Counter = Counter()          # open elements by tag
+        self._implied: Counter = Counter()       # elements ended implicitly, by tag, awaiting a closer
+
+    def _close_top(self):
+        tag, closer = self._stack.pop()
+        self._open[tag] -= 1
+        return closer
+
+    def start(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> Tuple[str, Optional[str]]:
+        """Closing tags to write before a start tag, and what replaces the tag (None keeps it)."""
+        parts = []
+        while self._stack and tag in IMPLIED_END.get(self._stack[-1][0], ()):
+            self._implied[self._stack[-1][0]] += 1
+            parts.append(self._close_top())
+            self.counts['closed'] += 1
+
+        opening = None
+        closer = f'</{tag}>'
+        for rename in self.renames.get(tag, ()):
+            if rename.matches(attrs):
+                opening, closer = rename.replacement, rename.closer
+                self.counts[rename.name] += 1
+                break
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append((tag, closer))
+            self._open[tag] += 1
+        return ''.join(parts), opening
+
+    def end(self, tag: str) -> Optional[str]:
+        """What replaces an end tag (None keeps it)."""
+        if self._open[tag]:
+            # Close it, and anything left open inside it
+            parts = []
+            while True:
+                open_tag = self._stack[-1][0]
+                closer = self._close_top()
+                if open_tag == tag:
+                    break
+                parts.append(closer)
+                self.counts['closed'] += 1
+            if parts or closer != f'</{tag}>':
+                parts.append(closer)
+                return ''.join(parts)
+            return None
+        if tag == 'br':
+            self.counts['br'] += 1
+            return '<br>'
+        if tag in VOID_ELEMENTS or self._implied[tag] or not self._stack:
+            # Nothing to close, or the closer of an element that already ended implicitly
+            if self._implied[tag]:
+                self._implied[tag] -= 1
+            self.counts['dropped'] += 1
+            return ''
+        # A mismatched closer, e.g. </div> for an open <li>
+        self.counts['mismatched'] += 1
+        return self._close_top()
+
+    def close(self) -> str:
+        """Closing tags of every element still open."""
+        parts = []
+        while self._stack:
+            parts.append(self._close_top())
+            self.counts['closed'] += 1
+        return ''.join(parts)
+
+
+class HTMLBalancer(HTMLParser):
+    """Streaming tag balancer: feed() chunks, read() balanced output, close() at the end.
+
+    Tags are tokenized by html.parser and balanced by a TagStack, whose
+    counts are the balancer's counts.
+    """
+
+    def __init__(self, renames: Iterable[ElementRename] = ()):
+        super().__init__(convert_charrefs=False)
+        self._tags = TagStack(renames)
+        self.counts = self._tags.counts
+        self._out: List[str] = []
+        self._input = ''         # input from absolute offset _input_start on
+        self._input_start = 0
+        self._copied = 0         # absolute offset up to which input is written to _out
+        self._parsed = 0         # absolute offset up to which input is fed to the parser
+        self._line_starts = [0]  # absolute offset of each line from line _first_line on
+        self._first_line = 1
+
+    def feed(self, data: str):
+        self._input += data
+        offset = self._input_start + len(self._input) - len(data)
+        newline = data.find('\n')
+        while newline >= 0:
+            self._line_starts.append(offset + newline + 1)
+            newline = data.find('\n', newline + 1)
+
+        # Only input up to the last '>' can complete a tag; the rest waits for more
+        last_gt = self._input.rfind('>', self._parsed - self._input_start)
+        if last_gt >= 0:
+            end = self._input_start + last_gt + 1
+            super().feed(self._input[self._parsed - self._input_start:last_gt + 1])
+            self._parsed = end
+
+    def _position(self) -> int:
+        """Absolute input offset of the token being handled (or of the next one)."""
+        line, column = self.getpos()
+        return self._line_starts[line - self._first_line] + column
+
+    def _replace(self, start: int, end: int, text: str):
+        """Write the input up to start, then text in place of input[start:end]."""
+        base = self._input_start
+        self._out.append(self._input[self._copied - base:start - base])
+        self._out.append(text)
+        self._copied = end
+
+    def _replace_starttag(self, text: str):
+        start = self._position()
+        self._replace(start, start + len(self.get_starttag_text()), text)
+
+    def _replace_endtag(self, text: str):
+        start = self._position()
+        end = self._input.index('>', start - self._input_start) + 1 + self._input_start
+        self._replace(start, end, text)
+
+    def handle_starttag(self, tag, attrs):
+        if not TAG_NAME.match(tag):
+            return
+        closers, opening = self._tags.start(tag, attrs)
+        if closers or opening is not None:
+            self._replace_starttag(closers + (self.get_starttag_text() if opening is None else opening))
+
+    def handle_startendtag(self, tag, attrs):
+        """Self-closing tags (<br/>, <img ... />) are copied as they are."""
+
+    def handle_endtag(self, tag):
+        if not TAG_NAME.match(tag):
+            return
+        replacement = self._tags.end(tag)
+        if replacement is not None:
+            self._replace_endtag(replacement)
+
+    def read(self) -> str:
+        """Balanced output produced so far."""
+        # Input before the parser's position is final: write it and let it go
+        position = self._position()
+        self._replace(position, position, '')
+        self._input = self._input[position - self._input_start:]
+        self._input_start = position
+        line = self.getpos()[0]
+        del self._line_starts[:line - self._first_line]
+        self._first_line = line
+
+        output = ''.join(self._out)
+        self._out.clear()
+        return output
+
+    def close(self):
+        """Flush buffered input and close every element still open."""
+        super().close()
+        # The rest of the input (after the last '>') holds no tags: copy it as is
+        self._replace(self._input_start + len(self._input), self._input_start + len(self._input), '')
+        self._out.append(self._tags.close())
+
+
+def balance_html(content: str, renames: Iterable[ElementRename] = (),
+                 counts: Optional[Counter] = None) -> str:
+    """Balanced copy of an HTML fragment. Adds the balancer's counts to counts."""
+    balancer = HTMLBalancer(renames)
+    balancer.feed(content)
+    balancer.close()
+    if counts is not None:
+        counts.update(balancer.counts)
+    return balancer.read()
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Balance the tags of an HTML fragment.')
+    arg_parser.add_argument('file', help='HTML file (- for stdin)')
+    arg_parser.add_argument('--output', help='write here instead of stdout')
+    args = arg_parser.parse_args(argv)
+
+    source = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+    balancer = HTMLBalancer()
+    with source, (open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout) as output:
+        for chunk in iter(lambda: source.read(1 << 16), ''):
+            balancer.feed(chunk)
+            output.write(balancer.read())
+        balancer.close()
+        output.write(balancer.read())
+
+    summary = ', '.join(f'{n} {name}' for name, n in sorted(balancer.counts.items())) or 'already balanced'
+    print(f"✓ {summary}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
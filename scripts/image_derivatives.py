@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Generate width-stepped JPEG and WebP derivatives of the site images and a
+manifest the data files and PostBuilder use to emit srcset.
+
+Sources are the images under SOURCE_DIRS. Each one gets a derivative per
+step in WIDTHS well below its own width, plus a WebP at its own width; the
+original file stays the largest JPEG candidate. Derivatives are written to
+assets/images/responsive/ across a process pool. data/image-manifest.json
+records each source's content hash, so unchanged images are skipped on the
+next run, and derivatives of removed images are deleted.
+
+--annotate then writes coverImageSrcset / featuredImageSrcset
+({"jpeg": srcset, "webp": srcset}) into the data JSON files for every
+image the manifest covers.
+
+Derivatives and the manifest are build output (git-ignored): run this with
+--annotate as part of the deploy build. Requires Pillow (pip install
+Pillow) to generate derivatives; --annotate only needs an existing manifest.
+
+Usage:
+    python3 scripts/image_derivatives.py [--jobs N] [--force] [--annotate]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from blog_data import POSTS_PATH, load_posts, save_posts, describe_save, write_if_changed
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; only generating derivatives needs it
+    Image = None
+
+SOURCE_DIRS = [
+    Path('assets/images/imagenes-blog'),
+    Path('assets/images/portadas'),
+    Path('assets/images/films'),
+    Path('components/advertising/images'),
+    Path('assets/technical-videos/images/miniaturas'),
+]
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+OUTPUT_DIR = Path('assets/images/responsive')
+MANIFEST_PATH = Path('data/image-manifest.json')
+
+WIDTHS = (320, 640, 960, 1280)
+
+# Steps above this fraction of the source width save too little to be worth a file
+MIN_STEP_RATIO = 0.8
+
+# Format -> (extension, Pillow save options)
+FORMATS = {
+    'jpeg': ('.jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'webp': ('.webp', {'quality': 75, 'method': 6}),
+}
+
+# Bump when derivative output changes for the same source
+PIPELINE_VERSION = 1
+
+# Data files with an image field -> the srcset field written next to it
+DATA_FILES = [
+    (Path('components/films/films-data.json'), 'coverImage', 'coverImageSrcset'),
+    (Path('components/advertising/advertising-data.json'), 'coverImage', 'coverImageSrcset'),
+    (Path('assets/technical-videos/technical-videos-data.json'), 'coverImage', 'coverImageSrcset'),
+]
+
+CONTENT_SIZES = '(max-width: 768px) 100vw, 800px'
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+SRC_ATTR_PATTERN = re.compile(r'\ssrc=["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def pipeline_signature() -> str:
+    """Hash of the settings that determine derivative output."""
+    settings = json.dumps([PIPELINE_VERSION, WIDTHS, MIN_STEP_RATIO, FORMATS], sort_keys=True)
+    return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_path(source: str, width: int, extension: str) -> str:
+    """Site-relative path of a source image's derivative."""
+    relative = Path(source)
+    if relative.parts[:2] == ('assets', 'images'):
+        relative = Path(*relative.parts[2:])
+    return (OUTPUT_DIR / relative.parent / f'{relative.stem}-{width}{extension}').as_posix()
+
+
+def find_sources() -> List[str]:
+    """Site-relative paths of every source image, sorted."""
+    sources = []
+    for directory in SOURCE_DIRS:
+        if directory.exists():
+            sources.extend(path.as_posix() for path in directory.rglob('*')
+                           if path.is_file() and path.suffix.lower() in SOURCE_EXTENSIONS)
+    return sorted(sources)
+
+
+def render_derivatives(source: str, content_hash: str) -> Dict:
+    """Write every derivative of one source image. Returns its manifest entry."""
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        width, height = image.size
+
+        steps = [w for w in WIDTHS if w <= width * MIN_STEP_RATIO]
+        variants: Dict[str, List[Tuple[int, str]]] = {name: [] for name in FORMATS}
+
+        for name, (extension, options) in FORMATS.items():
+            for step in steps + [width]:
+                if name == 'jpeg' and step == width:
+                    variants[name].append((width, source))  # the original is the largest JPEG
+                    continue
+                resized = image if step == width else image.resize(
+                    (step, max(1, round(height * step / width))), Image.LANCZOS)
+                output = derivative_path(source, step, extension)
+                Path(output).parent.mkdir(parents=True, exist_ok=True)
+                resized.save(output, name.upper(), **options)
+                variants[name].append((step, output))
+
+    return {
+        'hash': content_hash,
+        'width': width,
+        'height': height,
+        'variants': {name: [list(v) for v in steps_] for name, steps_ in variants.items()},
+    }
+
+
+def _render_task(task: Tuple[str, str]) -> Tuple[str, Optional[Dict], Optional[str]]:
+    source, content_hash = task
+    try:
+        return source, render_derivatives(source, content_hash), None
+    except Exception as e:
+        return source, None, str(e)
+
+
+class ImageManifest:
+    """Derivatives per source image, as written by the pipeline."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.signature = pipeline_signature()
+        self.images: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == self.signature:
+                self.images = data.get('images', {})
+
+    def resolve(self, src: str) -> Optional[str]:
+        """Manifest key for an image reference as used in the data files."""
+        if not src or '://' in src:
+            return None
+        key = src.lstrip('./')
+        for candidate in (key, f'components/{key}'):
+            if candidate in self.images:
+                return candidate
+        return None
+
+    def srcsets(self, src: str) -> Optional[Dict[str, str]]:
+        """{"jpeg": srcset, "webp": srcset} for an image, or None if not covered."""
+        key = self.resolve(src)
+        if key is None:
+            return None
+        return {
+            name: ', '.join(f'{path} {width}w' for width, path in steps)
+            for name, steps in self.images[key]['variants'].items()
+        }
+
+    def add_srcset(self, content: str) -> str:
+        """Add a JPEG srcset to every <img> in post HTML the manifest covers."""
+        def replace(match):
+            tag = match.group(0)
+            if 'srcset=' in tag.lower():
+                return tag
+            src = SRC_ATTR_PATTERN.search(tag)
+            srcsets = self.srcsets(src.group(1)) if src else None
+            if not srcsets:
+                return tag
+            end = -2 if tag.endswith('/>') else -1
+            return f'{tag[:end].rstrip()} srcset="{srcsets["jpeg"]}" sizes="{CONTENT_SIZES}"{tag[end:]}'
+
+        return IMG_TAG_PATTERN.sub(replace, content)
+
+    def fingerprint(self) -> str:
+        """Hash of the manifest content (for build caches)."""
+        payload = json.dumps([self.signature, self.images], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def outputs(self) -> set:
+        """Every derivative file the manifest references."""
+        return {path for entry in self.images.values()
+                for steps in entry['variants'].values()
+                for _, path in steps if path.startswith(OUTPUT_DIR.as_posix() + '/')}
+
+    def is_fresh(self, source: str, content_hash: str) -> bool:
+        entry = self.images.get(source)
+        if not entry or entry['hash'] != content_hash:
+            return False
+        return all(os.path.exists(path) for steps in entry['variants'].values() for _, path in steps)
+
+    def save(self) -> bool:
+        data = {'signature': self.signature, 'images': dict(sorted(self.images.items()))}
+        return write_if_changed(self.path, (json.dumps(data, indent=2, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+def generate(manifest: ImageManifest, jobs: int, force: bool = False) -> Dict[str, int]:
+    """Bring derivatives and manifest up to date with the source images."""
+    sources = find_sources()
+
+    # Hash every source; unchanged ones with all outputs present are skipped
+    tasks = []
+    for source in sources:
+        content_hash = file_hash(Path(source))
+        if force or not manifest.is_fresh(source, content_hash):
+            tasks.append((source, content_hash))
+
+    failed = 0
+    if tasks:
+        print(f"🖼️  Rendering {len(tasks)} of {len(sources)} images" +
+              (f" with {jobs} workers..." if jobs > 1 else "..."))
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_render_task, tasks))
+        else:
+            results = [_render_task(task) for task in tasks]
+
+        for source, entry, error in results:
+            if error is None:
+                manifest.images[source] = entry
+            else:
+                failed += 1
+                print(f"   ❌ {source}: {error}")
+
+    # Drop sources that no longer exist, then derivatives nothing references
+    for source in set(manifest.images) - set(sources):
+        del manifest.images[source]
+
+    referenced = manifest.outputs()
+    removed = 0
+    if OUTPUT_DIR.exists():
+        for path in OUTPUT_DIR.rglob('*'):
+            if path.is_file() and path.as_posix() not in referenced:
+                path.unlink()
+                removed += 1
+
+    manifest.save()
+    return {'sources': len(sources), 'rendered': len(tasks) - failed, 'failed': failed,
+            'unchanged': len(sources) - len(tasks), 'removed': removed}
+
+
+def annotate_items(items: List[Dict], manifest: ImageManifest, image_field: str, srcset_field: str) -> int:
+    """Set or clear the srcset field of each item. Returns how many changed."""
+    changed = 0
+    for item in items:
+        srcsets = manifest.srcsets(item.get(image_field, ''))
+        if srcsets and item.get(srcset_field) != srcsets:
+            item[srcset_field] = srcsets
+            changed += 1
+        elif not srcsets and srcset_field in item:
+            del item[srcset_field]
+            changed += 1
+    return changed
+
+
+def annotate(manifest: ImageManifest):
+    """Write srcset fields into the data JSON files and blog posts."""
+    for path, image_field, srcset_field in DATA_FILES:
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        changed = annotate_items(items, manifest, image_field, srcset_field)
+        if changed:
+            write_if_changed(path, (json.dumps(items, indent=2, ensure_ascii=False) + '\n').encode('utf-8'))
+        print(f"   {path}: {changed} items updated")
+
+    posts = load_posts()
+    changed = annotate_items(posts, manifest, 'featuredImage', 'featuredImageSrcset')
+    for post in posts:
+        content = manifest.add_srcset(post['content'])
+        if content != post['content']:
+            post['content'] = content
+            changed += 1
+    print(f"   {POSTS_PATH}: {changed} updates")
+    print(describe_save(save_posts(posts), POSTS_PATH))
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Generate responsive image derivatives.')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=0,
+                            help='worker processes (0 = one per CPU)')
+    arg_parser.add_argument('--force', action='store_true', help='re-render every image')
+    arg_parser.add_argument('--annotate', action='store_true',
+                            help='write srcset fields into the data JSON files')
+    args = arg_parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+
+    manifest = ImageManifest()
+
+    if Image is None:
+        if not args.annotate:
+            print("❌ Pillow is required to generate derivatives (pip install Pillow)")
+            return 1
+        print("⚠️  Pillow not installed; annotating from the existing manifest only")
+    else:
+        counts = generate(manifest, jobs, args.force)
+        print(f"✓ {counts['sources']} images: {counts['rendered']} rendered, "
+              f"{counts['unchanged']} unchanged, "
+              f"{counts['failed']} failed, {counts['removed']} stale derivatives removed")
+
+    if args.annotate:
+        print("📝 Annotating data files...")
+        annotate(manifest)
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
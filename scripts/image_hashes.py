@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index of the local blog images.
+
+Every image in the directory gets a 64-bit average hash (aHash: pixels of
+an 8x8 greyscale thumbnail above their mean) and difference hash (dHash:
+each pixel of a 9x8 thumbnail brighter than its right neighbour). Both
+survive resizing, recompression and renaming, so a WordPress upload can be
+matched to its local copy by content when the filenames differ.
+
+The distance between two images is the Hamming distance of their aHashes
+plus that of their dHashes (0-128). With NumPy the hashes are held in
+uint64 arrays and a query (or a batch of queries) is one vectorised XOR and
+popcount over the whole index; without it, a loop of int.bit_count().
+
+Hashes are cached in data/.image-hashes.json by file mtime and size, so
+only new or changed images are decoded again.
+
+Usage:
+    python3 scripts/image_hashes.py IMAGE [IMAGE ...] [--dir assets/images/imagenes-blog] [--max-distance 16]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from blog_data import write_if_changed
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it no hashes can be computed
+    Image = None
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; searches fall back to a Python loop
+    np = None
+
+IMAGES_DIR = Path('assets/images/imagenes-blog')
+CACHE_PATH = Path('data/.image-hashes.json')
+CACHE_VERSION = 1
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+HASH_SIZE = 8  # 8x8 bits = 64-bit hashes
+
+# Combined aHash + dHash distance at or below which two images are the same picture
+DEFAULT_MAX_DISTANCE = 16
+
+# Queries compared per NumPy batch (bounds the queries x images distance matrix)
+BATCH_CELLS = 1 << 22
+
+if np is not None:
+    _BYTE_BITS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: 'np.ndarray') -> 'np.ndarray':
+    """Set bits of each uint64."""
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return _BYTE_BITS[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _bits(pixels: Iterable[bool]) -> int:
+    value = 0
+    for bit in pixels:
+        value = (value << 1) | bit
+    return value
+
+
+def image_hashes(path: Path) -> Tuple[int, int]:
+    """(aHash, dHash) of an image file."""
+    with Image.open(path) as image:
+        # JPEG decoders can downscale while decoding; far faster for large photos
+        image.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        image = ImageOps.exif_transpose(image).convert('L')
+
+        average = list(image.resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR, reducing_gap=2.0).tobytes())
+        mean = sum(average) / len(average)
+        ahash = _bits(pixel > mean for pixel in average)
+
+        width = HASH_SIZE + 1
+        difference = list(image.resize((width, HASH_SIZE), Image.BILINEAR, reducing_gap=2.0).tobytes())
+        dhash = _bits(difference[row * width + col] > difference[row * width + col + 1]
+                      for row in range(HASH_SIZE) for col in range(HASH_SIZE))
+
+    return ahash, dhash
+
+
+class PerceptualIndex:
+    """aHash/dHash of every image in a directory, searchable by Hamming distance."""
+
+    _shared: Dict[str, 'PerceptualIndex'] = {}
+
+    def __init__(self, images_dir: Path = IMAGES_DIR, cache_path: Optional[Path] = CACHE_PATH):
+        self.images_dir = Path(images_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.names: List[str] = []
+        self.ahashes: Sequence[int] = []
+        self.dhashes: Sequence[int] = []
+        self.hashed = 0
+        self.unreadable = 0
+        self.refresh()
+
+    @classmethod
+    def for_directory(cls, images_dir: Path, cache_path: Optional[Path] = CACHE_PATH) -> 'PerceptualIndex':
+        """Return the shared index for a directory, building it on first use."""
+        key = os.path.abspath(images_dir)
+        index = cls._shared.get(key)
+        if index is None:
+            index = cls._shared[key] = cls(images_dir, cache_path)
+        return index
+
+    def _load_cache(self) -> Dict[str, List]:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            cache = json.loads(self.cache_path.read_text())
+        except ValueError:
+            return {}
+        if cache.get('version') != CACHE_VERSION or cache.get('dir') != os.path.abspath(self.images_dir):
+            return {}
+        return cache['images']
+
+    def refresh(self):
+        """Hash new and changed images (in parallel) and rebuild the search arrays."""
+        cached = self._load_cache()
+        entries: Dict[str, List] = {}
+        stale: List[Tuple[str, int, int]] = []
+
+        if self.images_dir.is_dir():
+            for entry in os.scandir(self.images_dir):
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                    continue
+                stat = entry.stat()
+                known = cached.get(entry.name)
+                if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                    entries[entry.name] = known
+                else:
+                    stale.append((entry.name, stat.st_mtime_ns, stat.st_size))
+
+        if stale:
+            if Image is None:
+                raise RuntimeError('Pillow is required to hash images (pip install Pillow)')
+            # Decoding releases the GIL, so threads hash images in parallel
+            with ThreadPoolExecutor() as executor:
+                hashes = executor.map(self._hash_or_none, [self.images_dir / name for name, _, _ in stale])
+                for (name, mtime, size), pair in zip(stale, hashes):
+                    # Unreadable files are remembered too, so they are not decoded again
+                    entries[name] = [mtime, size] + ([f'{pair[0]:016x}', f'{pair[1]:016x}'] if pair else [None, None])
+            self.hashed = sum(1 for name, _, _ in stale if entries[name][2] is not None)
+
+        self.unreadable = sum(1 for entry in entries.values() if entry[2] is None)
+        self.names = sorted(name for name, entry in entries.items() if entry[2] is not None)
+        ahashes = [int(entries[name][2], 16) for name in self.names]
+        dhashes = [int(entries[name][3], 16) for name in self.names]
+        if np is not None:
+            self.ahashes = np.array(ahashes, dtype=np.uint64)
+            self.dhashes = np.array(dhashes, dtype=np.uint64)
+        else:
+            self.ahashes, self.dhashes = ahashes, dhashes
+
+        if self.cache_path and (stale or len(entries) != len(cached)):
+            cache = {'version': CACHE_VERSION, 'dir': os.path.abspath(self.images_dir), 'images': entries}
+            write_if_changed(self.cache_path, json.dumps(cache, sort_keys=True).encode('utf-8'))
+
+    @staticmethod
+    def _hash_or_none(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            return image_hashes(path)
+        except OSError:  # unreadable or truncated image
+            return None
+
+    def fingerprint(self) -> str:
+        """Hash of every indexed image's name and hashes; changes when images change."""
+        digest = hashlib.sha256()
+        for name, ahash, dhash in zip(self.names, self.ahashes, self.dhashes):
+            digest.update(f'{name}:{int(ahash):016x}{int(dhash):016x}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def distances(self, ahash: int, dhash: int) -> Sequence[int]:
+        """Combined Hamming distance from a hash pair to every indexed image."""
+        if np is not None:
+            return (_popcount(self.ahashes ^ np.uint64(ahash)).astype(np.uint16)
+                    + _popcount(self.dhashes ^ np.uint64(dhash)))
+        return [(a ^ ahash).bit_count() + (d ^ dhash).bit_count() for a, d in zip(self.ahashes, self.dhashes)]
+
+    def find(self, ahash: int, dhash: int,
+             max_distance: int = DEFAULT_MAX_DISTANCE) -> Optional[Tuple[str, int]]:
+        """Closest image (first filename on ties) within max_distance, with its distance."""
+        if not self.names:
+            return None
+        distances = self.distances(ahash, dhash)
+        if np is not None:
+            best = int(np.argmin(distances))
+        else:
+            best = min(range(len(distances)), key=distances.__getitem__)
+        distance = int(distances[best])
+        return (self.names[best], distance) if distance <= max_distance else None
+
+    def find_many(self, pairs: Sequence[Tuple[int, int]],
+                  max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Optional[Tuple[str, int]]]:
+        """find() for many hash pairs, a block of queries per vectorised comparison."""
+        if np is None or not self.names:
+            return [self.find(ahash, dhash, max_distance) for ahash, dhash in pairs]
+
+        results: List[Optional[Tuple[str, int]]] = []
+        batch = max(1, BATCH_CELLS // len(self.names))
+        for start in range(0, len(pairs), batch):
+            block = np.array(pairs[start:start + batch], dtype=np.uint64).reshape(-1, 2)
+            distances = (_popcount(self.ahashes[None, :] ^ block[:, 0:1]).astype(np.uint16)
+                         + _popcount(self.dhashes[None, :] ^ block[:, 1:2]))
+            best = distances.argmin(axis=1)
+            best_distances = distances[np.arange(len(block)), best]
+            results.extend((self.names[i], int(d)) if d <= max_distance else None
+                           for i, d in zip(best.tolist(), best_distances.tolist()))
+        return results
+
+    def find_file(self, path: Path, max_distance: int = DEFAULT_MAX_DISTANCE) -> Optional[Tuple[str, int]]:
+        """Closest indexed image to an image file."""
+        try:
+            ahash, dhash = image_hashes(path)
+        except OSError:
+            return None
+        return self.find(ahash, dhash, max_distance)
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Find local images matching image files by content.')
+    arg_parser.add_argument('images', nargs='+', type=Path, help='image files to look up')
+    arg_parser.add_argument('--dir', type=Path, default=IMAGES_DIR, help='indexed images directory')
+    arg_parser.add_argument('--max-distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                            help='largest combined aHash + dHash distance (0-128) that matches')
+    args = arg_parser.parse_args(argv)
+
+    if Image is None:
+        print("❌ Pillow is required to hash images (pip install Pillow)")
+        return 1
+
+    index = PerceptualIndex(args.dir)
+    print(f"🖼️  {len(index.names)} images indexed in {args.dir} ({index.hashed} hashed, "
+          f"{index.unreadable} unreadable, {'NumPy' if np is not None else 'pure Python'} search)")
+
+    queries = []
+    for path in args.images:
+        try:
+            queries.append(image_hashes(path))
+        except OSError as e:
+            print(f"   ❌ {path}: {e}")
+            queries.append(None)
+
+    matches = index.find_many([pair for pair in queries if pair is not None], args.max_distance)
+    found = 0
+    results = iter(matches)
+    for path, pair in zip(args.images, queries):
+        if pair is None:
+            continue
+        match = next(results)
+        if match:
+            found += 1
+            print(f"   ✓ {path} → {args.dir / match[0]} (distance {match[1]})")
+        else:
+            print(f"   ✗ {path}: no image within distance {args.max_distance}")
+
+    print(f"\n{found}/{len(args.images)} matched")
+    return 0 if found == len(args.images) else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,129 @@
+"""
+Stage timers, counters and memory peaks for a migration run.
+
+    metrics = Instrumentation(trace_memory=True, profile='auto')
+    with metrics.stage('parse'):
+        ...
+    metrics.count('build_cache.hits', 3)
+    metrics.record_item('build', post_id, seconds)
+    metrics.write_report(Path('migration-report.json'))
+
+Stages record wall and CPU time, and with trace_memory the tracemalloc
+peak above the memory in use when the stage started. profile names a stage
+to run under cProfile, or 'auto' to profile every stage and keep the
+hottest one for dump_profile().
+"""
+
+import cProfile
+import heapq
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+REPORT_VERSION = 1
+
+
+class Instrumentation:
+    """Collects per-stage timings, counters and the slowest items of a run."""
+
+    SLOWEST = 10
+
+    def __init__(self, trace_memory: bool = False, profile: Optional[str] = None):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.stages: Dict[str, Dict] = {}
+        self.timers: Counter = Counter()
+        self.counters: Counter = Counter()
+        self._slowest: Dict[str, List[Tuple[float, str]]] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage of the run (stages are not nested)."""
+        profiler = cProfile.Profile() if self.profile in ('auto', name) else None
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiles[name] = profiler
+
+            stats = {
+                'seconds': round(time.perf_counter() - wall, 4),
+                'cpu_seconds': round(time.process_time() - cpu, 4),
+            }
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                stats['peak_mb'] = round((peak - baseline) / 1e6, 2)
+                stats['retained_mb'] = round((current - baseline) / 1e6, 2)
+            self.stages[name] = stats
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def merge(self, counters: Mapping[str, int], timers: Optional[Mapping[str, float]] = None):
+        """Add counters and accumulated timers, e.g. collected in a worker process."""
+        self.counters.update(counters)
+        if timers:
+            self.timers.update(timers)
+
+    def record_item(self, stage: str, label: str, seconds: float):
+        """Track an item's duration, keeping the SLOWEST per stage."""
+        heap = self._slowest.setdefault(stage, [])
+        if len(heap) < self.SLOWEST:
+            heapq.heappush(heap, (seconds, label))
+        elif seconds > heap[0][0]:
+            heapq.heapreplace(heap, (seconds, label))
+
+    def hottest_stage(self) -> Optional[str]:
+        """Slowest stage that was profiled."""
+        profiled = [name for name in self._profiles if name in self.stages]
+        return max(profiled, key=lambda name: self.stages[name]['seconds'], default=None)
+
+    def dump_profile(self, path: Path) -> Optional[str]:
+        """Write cProfile stats of the hottest profiled stage. Returns the stage name."""
+        stage = self.profile if self.profile in self._profiles else self.hottest_stage()
+        if stage is None:
+            return None
+        self._profiles[stage].dump_stats(str(path))
+        return stage
+
+    def report(self) -> Dict:
+        total = sum(stats['seconds'] for stats in self.stages.values())
+        return {
+            'version': REPORT_VERSION,
+            'total_seconds': round(total, 4),
+            'stages': self.stages,
+            'timers': {name: round(seconds, 4) for name, seconds in sorted(self.timers.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'slowest': {
+                stage: [{'item': label, 'seconds': round(seconds, 4)}
+                        for seconds, label in sorted(heap, reverse=True)]
+                for stage, heap in self._slowest.items()
+            },
+        }
+
+    def write_report(self, path: Path):
+        Path(path).write_text(json.dumps(self.report(), indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+    def print_summary(self):
+        """Stage timing table, slowest first."""
+        total = sum(stats['seconds'] for stats in self.stages.values()) or 1
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            memory = f"  peak {stats['peak_mb']:>8.1f} MB" if 'peak_mb' in stats else ''
+            print(f"   {name:<12} {stats['seconds']:>9.3f}s  {stats['seconds'] / total:>6.1%}{memory}")
@@ -4,30 +4,56 @@ WordPress to Static Blog Migration Script
 
 This script migrates WordPress posts from export.xml to the static blog JSON format.
 It handles:
-- XML parsing and post extraction
-- Gutenberg block content transformation
+- Streaming XML parsing and post extraction (plain or gzipped exports)
+- Gutenberg block content transformation (single-scan rewrite engine with tag balancing)
 - Image URL to local file mapping
 - Yoast SEO metadata extraction
 - JSON structure generation matching existing blog posts
+- Optional parallel post building across worker processes (--jobs N)
+- Incremental re-migration through a content-hash build cache
+- srcset for images with responsive derivatives (image_derivatives.py)
+- Per-stage timing, counters and memory report (--report, --trace-memory, --profile)
+- Matching renamed or resized images by content (perceptual hashes, --uploads DIR)
+- Reading the export from a SQLite import that is refreshed only when it changes
 """
 
 import xml.etree.ElementTree as ET
+import argparse
+import gzip
+import hashlib
+import html
 import json
 import re
 import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import unquote
 import unicodedata
 
+from image_derivatives import ImageManifest
+from html_balancer import RAW_TEXT_ELEMENTS, ElementRename, TagStack, balance_html
+from image_hashes import PerceptualIndex
+from instrumentation import Instrumentation
+from post_text import PostText
+from validate_data import MIGRATED_POSTS, VALIDATORS, compile_schema
+from wxr_store import WXRStore
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# WordPress size variant suffix, e.g. image-300x200.jpg
+SIZE_SUFFIX_PATTERN = re.compile(r'-\d+x\d+(\.[a-z]+)$')
+
 
 class WordPressParser:
     """Parses WordPress XML export and extracts post data."""
 
     def __init__(self, xml_path: str):
         self.xml_path = xml_path
-        self.tree = None
-        self.root = None
         self.namespaces = {
             'content': 'http://purl.org/rss/1.0/modules/content/',
             'wp': 'http://wordpress.org/export/1.2/',
@@ -35,79 +61,152 @@ class WordPressParser:
             'excerpt': 'http://wordpress.org/export/1.2/excerpt/'
         }
 
+        wp = '{%s}' % self.namespaces['wp']
+        self._item_fields = {
+            'title': 'title',
+            'link': 'link',
+            'pubDate': 'pubDate',
+            wp + 'post_id': 'post_id',
+            wp + 'post_date': 'post_date',
+            wp + 'post_name': 'post_name',
+            wp + 'post_type': 'post_type',
+            wp + 'status': 'status',
+            wp + 'post_parent': 'post_parent',
+            wp + 'attachment_url': 'attachment_url',
+            '{%s}encoded' % self.namespaces['content']: 'content',
+            '{%s}encoded' % self.namespaces['excerpt']: 'excerpt'
+        }
+        self._postmeta_tag = wp + 'postmeta'
+
     def parse(self) -> List[Dict]:
         """Parse XML and return list of post dictionaries."""
+        posts = list(self.iter_posts())
+        print(f"✓  Extracted {len(posts)} published posts")
+        return posts
+
+    def iter_posts(self) -> Iterator[Dict]:
+        """Stream published posts from the export one at a time.
+
+        Uses incremental parsing so only the current <item> is held in
+        memory; each item is cleared and detached from <channel> once it
+        has been processed. Gzipped exports (.xml.gz) are read directly.
+        """
         print(f"📖 Parsing WordPress export: {self.xml_path}")
 
+        item_count = 0
         try:
-            self.tree = ET.parse(self.xml_path)
-            self.root = self.tree.getroot()
-        except ET.ParseError as e:
+            for item in self.iter_items():
+                item_count += 1
+                post = self._extract_post(item)
+                if post:
+                    yield post
+        except (ET.ParseError, OSError) as e:
             print(f"❌ XML parsing error: {e}")
-            return []
-
-        channel = self.root.find('channel')
-        if not channel:
-            print("❌ No channel found in XML")
-            return []
-
-        posts = []
-        items = channel.findall('item')
-        print(f"   Found {len(items)} items in export")
+            return
 
-        for item in items:
-            post = self._extract_post(item)
-            if post:
-                posts.append(post)
-
-        print(f"✓  Extracted {len(posts)} published posts")
-        return posts
+        if item_count == 0:
+            print("❌ No items found in XML")
+        else:
+            print(f"   Found {item_count} items in export")
+
+    def iter_items(self) -> Iterator[ET.Element]:
+        """Yield each <item> element of the export, releasing it afterwards."""
+        with self._open_export() as source:
+            channel = None
+            depth = 0
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and elem.tag == 'channel':
+                        channel = elem
+                    continue
+
+                depth -= 1
+                if channel is None or depth != 2:
+                    continue
+
+                # Direct child of <channel>: hand out items, then drop it
+                # (including channel-level terms and authors) from the tree
+                if elem.tag == 'item':
+                    yield elem
+                elem.clear()
+                channel.remove(elem)
+
+    def _open_export(self) -> BinaryIO:
+        """Open the export, transparently decompressing gzip files."""
+        with open(self.xml_path, 'rb') as f:
+            is_gzip = f.read(2) == b'\x1f\x8b'
+
+        if is_gzip:
+            return gzip.open(self.xml_path, 'rb')
+        return open(self.xml_path, 'rb')
 
     def _extract_post(self, item) -> Optional[Dict]:
         """Extract post data from XML item."""
-        # Check if it's a published post
-        post_type = item.find('wp:post_type', self.namespaces)
-        status = item.find('wp:status', self.namespaces)
-
-        if post_type is None or status is None:
-            return None
+        record = self.read_item(item)
 
-        if post_type.text != 'post' or status.text != 'publish':
+        # Check if it's a published post
+        if record['post_type'] != 'post' or record['status'] != 'publish':
             return None
 
-        # Extract basic fields
-        post = {
-            'title': self._get_text(item.find('title')),
-            'link': self._get_text(item.find('link')),
-            'pubDate': self._get_text(item.find('pubDate')),
-            'wp_post_date': self._get_text(item.find('wp:post_date', self.namespaces)),
-            'wp_post_name': self._get_text(item.find('wp:post_name', self.namespaces)),
-            'content': self._get_text(item.find('content:encoded', self.namespaces)),
-            'excerpt': self._get_text(item.find('excerpt:encoded', self.namespaces)),
+        return self.to_post(record)
+
+    def read_item(self, item) -> Dict:
+        """Read every field of an <item> in a single pass over its children."""
+        record = {
+            'title': '',
+            'link': '',
+            'pubDate': '',
+            'post_id': '',
+            'post_date': '',
+            'post_name': '',
+            'post_type': '',
+            'status': '',
+            'post_parent': '',
+            'attachment_url': '',
+            'content': '',
+            'excerpt': '',
             'categories': [],
             'tags': [],
             'postmeta': {}
         }
 
-        # Extract categories and tags
-        for category in item.findall('category'):
-            domain = category.get('domain', '')
-            cat_name = category.text
-
-            if cat_name:
-                if domain == 'category':
-                    post['categories'].append(cat_name)
-                elif domain == 'post_tag':
-                    post['tags'].append(cat_name)
-
-        # Extract postmeta
-        for meta in item.findall('wp:postmeta', self.namespaces):
-            key = self._get_text(meta.find('wp:meta_key', self.namespaces))
-            value = self._get_text(meta.find('wp:meta_value', self.namespaces))
-            if key:
-                post['postmeta'][key] = value
-
-        return post
+        for child in item:
+            field = self._item_fields.get(child.tag)
+            if field:
+                record[field] = self._get_text(child)
+            elif child.tag == 'category':
+                # Extract categories and tags
+                domain = child.get('domain', '')
+                cat_name = child.text
+                if cat_name:
+                    if domain == 'category':
+                        record['categories'].append(cat_name)
+                    elif domain == 'post_tag':
+                        record['tags'].append(cat_name)
+            elif child.tag == self._postmeta_tag:
+                key = self._get_text(child.find('wp:meta_key', self.namespaces))
+                value = self._get_text(child.find('wp:meta_value', self.namespaces))
+                if key:
+                    record['postmeta'][key] = value
+
+        return record
+
+    def to_post(self, record: Dict) -> Dict:
+        """Convert a raw item record into the post dict used by PostBuilder."""
+        return {
+            'title': record['title'],
+            'link': record['link'],
+            'pubDate': record['pubDate'],
+            'wp_post_id': record['post_id'],
+            'wp_post_date': record['post_date'],
+            'wp_post_name': record['post_name'],
+            'content': record['content'],
+            'excerpt': record['excerpt'],
+            'categories': record['categories'],
+            'tags': record['tags'],
+            'postmeta': record['postmeta']
+        }
 
     def _get_text(self, element) -> str:
         """Safely extract text from XML element."""
@@ -116,69 +215,343 @@ class WordPressParser:
         return ''
 
 
+class WXRIndex:
+    """Single-pass index of posts, attachments and postmeta in a WordPress export.
+
+    One streaming walk over the export collects published posts, every
+    attachment (keyed by attachment ID) and each post's ``_thumbnail_id``,
+    so featured images resolve with dictionary lookups instead of repeated
+    scans of the XML.
+    """
+
+    def __init__(self, parser: WordPressParser):
+        self.parser = parser
+        self.posts: List[Dict] = []
+        self.attachments: Dict[str, Dict] = {}  # attachment_id -> {url, filename, post_name, parent}
+        self.thumbnails: Dict[str, str] = {}  # post_name -> attachment_id
+        self.item_count = 0
+
+    @classmethod
+    def build(cls, xml_path: str, store_path: Optional[Path] = None, reimport: bool = False) -> 'WXRIndex':
+        """Parse the export once and return the populated index.
+
+        With store_path the items are read from the export's SQLite import
+        (wxr_store.py), which is only refreshed when the export changed.
+        """
+        index = cls(WordPressParser(xml_path))
+        if store_path:
+            try:
+                store = WXRStore.sync(index.parser, store_path, force=reimport)
+            except (ET.ParseError, OSError) as e:
+                # A missing or malformed export yields no posts, as load() does
+                print(f"❌ XML parsing error: {e}")
+                return index
+            index.load_store(store)
+        else:
+            index.load()
+        return index
+
+    def load(self):
+        """Walk the export once, indexing posts, attachments and postmeta."""
+        print(f"📖 Indexing WordPress export: {self.parser.xml_path}")
+
+        try:
+            for item in self.parser.iter_items():
+                self.item_count += 1
+                self._add(self.parser.read_item(item))
+        except (ET.ParseError, OSError) as e:
+            print(f"❌ XML parsing error: {e}")
+            return
+
+        print(f"   Found {self.item_count} items in export")
+        print(f"   Found {len(self.attachments)} attachments")
+        print(f"   Found {len(self.thumbnails)} post-thumbnail relationships")
+        print(f"✓  Extracted {len(self.posts)} published posts")
+
+    def load_store(self, store: WXRStore):
+        """Index the attachments and published posts of an imported export."""
+        print(f"📖 Reading WordPress export from {store.db_path}")
+
+        self.item_count = store.item_count
+        for record in store.records("post_type = 'attachment' OR (post_type = 'post' AND status = 'publish')"):
+            self._add(record)
+        store.close()
+
+        print(f"   Found {self.item_count} items in export")
+        print(f"   Found {len(self.attachments)} attachments")
+        print(f"   Found {len(self.thumbnails)} post-thumbnail relationships")
+        print(f"✓  Extracted {len(self.posts)} published posts")
+
+    def _add(self, record: Dict):
+        """Index a single item record."""
+        post_type = record['post_type']
+
+        if post_type == 'attachment':
+            attachment_id = record['post_id']
+            attachment_url = record['attachment_url']
+            if attachment_id and attachment_url:
+                self.attachments[attachment_id] = {
+                    'url': attachment_url,
+                    'filename': attachment_url.split('/')[-1],
+                    'post_name': record['post_name'],
+                    'parent': record['post_parent']
+                }
+
+        elif post_type == 'post' and record['status'] == 'publish':
+            self.posts.append(self.parser.to_post(record))
+
+            thumbnail_id = record['postmeta'].get('_thumbnail_id', '')
+            if record['post_name'] and thumbnail_id:
+                self.thumbnails[record['post_name']] = thumbnail_id
+
+    def get_attachment(self, attachment_id: str) -> Optional[Dict]:
+        """Return attachment info for a WordPress attachment ID."""
+        return self.attachments.get(attachment_id)
+
+    def get_thumbnail(self, post_name: str) -> Optional[Dict]:
+        """Return the featured-image attachment of a post, by post slug."""
+        thumbnail_id = self.thumbnails.get(post_name)
+        if not thumbnail_id:
+            return None
+        return self.attachments.get(thumbnail_id)
+
+    def __getstate__(self) -> Dict:
+        # Worker processes only need the lookup tables; posts are sent one at a time
+        state = self.__dict__.copy()
+        state['posts'] = []
+        return state
+
+
+# Rewrites applied by ContentTransformer.transform, in order: (name, token, pattern, replacement).
+# A rule rewrites whole tokens of one kind: 'comment' (<!-- ... -->) or 'tag' (a start tag)
+CONTENT_REWRITES = [
+    # Gutenberg block comments like <!-- wp:paragraph --> and <!-- /wp:paragraph -->
+    ('gutenberg-comment', 'comment', re.compile(r'<!--\s*/?wp:[^>]*-->'), ''),
+    # WordPress-specific attributes: data-id, data-link, data-full-url, ...
+    ('wp-attributes', 'tag', re.compile(r'\s+data-[a-z-]+="[^"]*"'), ''),
+    # WordPress CSS classes of images
+    ('wp-image-class', 'tag', re.compile(r'\s+class="wp-image-\d+"'), ''),
+]
+
+# Clean-ups that follow the rewrites: paragraphs left empty, and runs of blank lines
+EMPTY_PARAGRAPH = re.compile(r'<p>\s*</p>')
+NEWLINE_RUN = re.compile(r'\n{3,}')
+
+# Galleries: keep the images, remove gallery wrapper classes. Renamed by the
+# tag balancer, so only the closing tags of gallery elements become </div>
+GALLERY_RENAMES = [
+    ElementRename('gallery', 'ul', r'wp-block-gallery', '<div class="image-gallery">'),
+    ElementRename('gallery-item', 'li', r'blocks-gallery-item$', '<div class="gallery-item">'),
+]
+
+_WS = r'[ \t\n\r\f]'
+_ATTRIBUTE_VALUE = r'"[^"<]*"|\'[^\'<]*\'|[^ \t\n\r\f"\'=<>`]+'
+
+# The markup RewriteEngine tokenizes: comments, end tags and start tags in their
+# plain forms. Any other '<' (a doctype, a malformed tag, a stray '<') is a bare '<'
+CONTENT_TOKEN = re.compile(
+    rf'<(?:!--(?P<comment>[^<>]*?)--'
+    rf'|/(?P<end>[a-zA-Z][a-zA-Z0-9-]*){_WS}*'
+    rf'|(?P<start>[a-zA-Z][a-zA-Z0-9-]*)'
+    rf'(?:{_WS}+[a-zA-Z_:][-a-zA-Z0-9_:.]*(?:{_WS}*={_WS}*(?:{_ATTRIBUTE_VALUE}))?)*{_WS}*(?P<slash>/?))>|<')
+TAG_ATTRIBUTE = re.compile(rf'{_WS}+([a-zA-Z_:][-a-zA-Z0-9_:.]*)(?:{_WS}*={_WS}*({_ATTRIBUTE_VALUE}))?')
+
+
+def tag_attributes(tag: str) -> List[Tuple[str, Optional[str]]]:
+    """Attributes of a tokenized start tag, as html.parser reports them."""
+    attrs = []
+    for match in TAG_ATTRIBUTE.finditer(tag):
+        name, value = match.groups()
+        if value is not None:
+            if value[0] in '"\'':
+                value = value[1:-1]
+            if '&' in value:
+                value = html.unescape(value)
+        attrs.append((name.lower(), value))
+    return attrs
+
+
+class RewriteEngine:
+    """Rewrites and balances content in one scan.
+
+    The content is tokenized once into text, comments, start tags and end
+    tags. Each comment and start tag is rewritten by the rules of its kind,
+    paragraphs holding only whitespace are dropped, runs of three or more
+    newlines collapse to two, and tags go through a TagStack as they come,
+    so the balanced output is written in the same pass. Rules only see
+    whole tokens: an attribute rule leaves text that merely looks like an
+    attribute alone.
+
+    Content outside the markup CONTENT_TOKEN models (<script> and other raw
+    text elements, doctypes, a stray '<') takes rewrite_multipass(): each
+    rule as a re.sub over the whole content, then HTMLBalancer.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, re.Pattern, str]], renames: List[ElementRename]):
+        self.rules = list(rules)
+        self.renames = list(renames)
+        self._comment_rules = [(name, pattern, replacement)
+                               for name, token, pattern, replacement in self.rules if token == 'comment']
+        self._tag_rules = [(name, pattern, replacement)
+                           for name, token, pattern, replacement in self.rules if token == 'tag']
+
+    def rewrite(self, content: str, rewrite_counts: Counter, balance_counts: Counter) -> str:
+        """Rewritten, balanced content. Adds matches per rule and the balancer's counts."""
+        counts: Counter = Counter()
+        tags = TagStack(self.renames)
+        output = self._scan(content, counts, tags)
+        if output is None:
+            return self.rewrite_multipass(content, rewrite_counts, balance_counts)
+
+        rewrite_counts.update(counts)
+        balance_counts.update(tags.counts)
+        return output
+
+    def _scan(self, content: str, counts: Counter, tags: TagStack) -> Optional[str]:
+        """The single pass; None if the content holds markup it does not model."""
+        out: List[str] = []
+        text: List[str] = []       # text since the last markup written, collapsed as one
+        held = False               # a '<p>' waiting to see if its paragraph is empty
+        held_text: List[str] = []  # text after the held '<p>'
+        started = False            # leading whitespace is stripped until markup is written
+
+        def collapse(piece: str) -> str:
+            if '\n\n\n' in piece:
+                piece, runs = NEWLINE_RUN.subn('\n\n', piece)
+                counts['newline-run'] += runs
+            return piece
+
+        def write(markup: str):
+            """Write the pending text, then markup."""
+            nonlocal started
+            if text:
+                piece = collapse(''.join(text))
+                text.clear()
+                out.append(piece if started else piece.lstrip())
+            out.append(markup)
+            started = True
+
+        def start_tag(tag: str, name: str):
+            closers, opening = tags.start(name, tag_attributes(tag) if name in tags.renames else ())
+            write(closers + (tag if opening is None else opening))
+
+        def release():
+            """The held '<p>' opens a paragraph after all."""
+            nonlocal held
+            held = False
+            start_tag('<p>', 'p')
+            text.extend(held_text)
+            held_text.clear()
+
+        position = 0
+        for match in CONTENT_TOKEN.finditer(content):
+            if match.start() > position:
+                (held_text if held else text).append(content[position:match.start()])
+            position = match.end()
+            token = match.group()
+            kind = match.lastgroup
+
+            if kind == 'comment':
+                for name, pattern, replacement in self._comment_rules:
+                    token, matches = pattern.subn(replacement, token)
+                    if matches:
+                        counts[name] += matches
+                if token:
+                    if held:
+                        release()
+                    write(collapse(token))
+
+            elif kind == 'end':
+                if held and token == '</p>' and all(piece.isspace() for piece in held_text):
+                    held = False
+                    held_text.clear()
+                    counts['empty-paragraph'] += 1
+                    continue
+                if held:
+                    release()
+                token = collapse(token)
+                replacement = tags.end(match.group('end').lower())
+                write(token if replacement is None else replacement)
+
+            elif kind == 'slash':
+                name = match.group('start').lower()
+                if name in RAW_TEXT_ELEMENTS:
+                    return None
+                rewritten = token
+                for rule_name, pattern, replacement in self._tag_rules:
+                    rewritten, matches = pattern.subn(replacement, rewritten)
+                    if matches:
+                        counts[rule_name] += matches
+                if rewritten != token:
+                    # A rule may only leave another start tag
+                    match = CONTENT_TOKEN.fullmatch(rewritten)
+                    if not match or match.lastgroup != 'slash':
+                        return None
+                    token = rewritten
+                    name = match.group('start').lower()
+                if held:
+                    release()
+                if token == '<p>':
+                    held = True
+                elif match.group('slash'):
+                    write(collapse(token))  # self-closing tags are copied as they are
+                else:
+                    start_tag(collapse(token), name)
+
+            else:
+                return None  # a '<' that starts no token modeled here
+
+        if position < len(content):
+            (held_text if held else text).append(content[position:])
+        if held:
+            release()
+        piece = collapse(''.join(text))
+        out.append(piece.rstrip() if started else piece.strip())
+        out.append(tags.close())
+        return ''.join(out)
+
+    def rewrite_multipass(self, content: str, rewrite_counts: Counter, balance_counts: Counter) -> str:
+        """The same rewrites as separate re.sub passes, then HTMLBalancer."""
+        passes = [(name, pattern, replacement) for name, token, pattern, replacement in self.rules]
+        passes += [('empty-paragraph', EMPTY_PARAGRAPH, ''), ('newline-run', NEWLINE_RUN, '\n\n')]
+        for name, pattern, replacement in passes:
+            content, matches = pattern.subn(replacement, content)
+            if matches:
+                rewrite_counts[name] += matches
+
+        # Rename gallery elements and balance tags
+        return balance_html(content.strip(), self.renames, balance_counts)
+
+    def signature(self) -> str:
+        """Stable description of the rules and element renames, for cache keys."""
+        rules = [f'{name}\t{token}\t{pattern.pattern}\t{replacement}'
+                 for name, token, pattern, replacement in self.rules]
+        renames = [f'{r.name}\t{r.tag}\t{r.class_pattern}\t{r.replacement}' for r in self.renames]
+        return '\n'.join(rules + renames)
+
+
 class ContentTransformer:
     """Transforms WordPress Gutenberg content to clean HTML."""
 
-    def __init__(self):
+    def __init__(self, rewrites: Optional[List[Tuple[str, str, re.Pattern, str]]] = None,
+                 renames: Optional[List[ElementRename]] = None):
         self.wp_cdn_pattern = re.compile(r'https://carlosrodgarman\.com/wp-content/uploads/[^"\'>\s]+')
+        self.img_src_pattern = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']')
+        self.engine = RewriteEngine(CONTENT_REWRITES if rewrites is None else rewrites,
+                                    GALLERY_RENAMES if renames is None else renames)
+        self.rewrite_counts: Counter = Counter()  # matches per rewrite since the last collect
+        self.balance_counts: Counter = Counter()  # tag balancer counts since the last collect
 
     def transform(self, content: str) -> str:
         """Transform WordPress content to clean HTML."""
         if not content:
             return ''
 
-        # Strip Gutenberg block comments
-        content = self._strip_gutenberg_comments(content)
-
-        # Transform galleries
-        content = self._transform_galleries(content)
-
-        # Clean WordPress-specific HTML attributes
-        content = self._clean_wp_attributes(content)
-
-        # Remove empty paragraphs
-        content = re.sub(r'<p>\s*</p>', '', content)
-
-        # Clean up multiple newlines
-        content = re.sub(r'\n{3,}', '\n\n', content)
-
-        return content.strip()
-
-    def _strip_gutenberg_comments(self, content: str) -> str:
-        """Remove all Gutenberg block comments."""
-        # Remove block comments like <!-- wp:paragraph --> and <!-- /wp:paragraph -->
-        content = re.sub(r'<!--\s*/?wp:[^>]*-->', '', content)
-        return content
-
-    def _transform_galleries(self, content: str) -> str:
-        """Transform wp-block-gallery to simple HTML."""
-        # Simple transformation: keep the images, remove gallery wrapper classes
-        content = re.sub(
-            r'<ul\s+class="wp-block-gallery[^"]*"[^>]*>',
-            '<div class="image-gallery">',
-            content
-        )
-        content = re.sub(r'</ul>(\s*<!-- /wp:gallery -->)?', '</div>', content)
-
-        # Transform gallery items
-        content = re.sub(
-            r'<li\s+class="blocks-gallery-item"[^>]*>',
-            '<div class="gallery-item">',
-            content
-        )
-        content = re.sub(r'</li>', '</div>', content)
-
-        return content
+        return self.engine.rewrite(content, self.rewrite_counts, self.balance_counts)
 
-    def _clean_wp_attributes(self, content: str) -> str:
-        """Remove WordPress-specific HTML attributes."""
-        # Remove data-id, data-link, data-full-url, etc.
-        content = re.sub(r'\s+data-[a-z-]+="[^"]*"', '', content)
-
-        # Remove WordPress CSS classes from images
-        content = re.sub(r'\s+class="wp-image-\d+"', '', content)
-
-        return content
+    def signature(self) -> str:
+        """Stable description of the rewrites and element renames, for cache keys."""
+        return self.engine.signature()
 
     def extract_first_image(self, content: str) -> Optional[str]:
         """Extract the first image URL from content."""
@@ -186,79 +559,258 @@ class ContentTransformer:
             return None
 
         # Look for img tags
-        img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', content)
+        img_match = self.img_src_pattern.search(content)
         if img_match:
             return img_match.group(1)
 
         return None
 
-    def replace_image_urls(self, content: str, url_map: Dict[str, str]) -> str:
-        """Replace WordPress CDN URLs with local paths."""
+    def replace_image_urls(self, content: str,
+                           url_map: Union[Dict[str, str], Callable[[str], Optional[str]]]) -> str:
+        """Replace WordPress CDN URLs with local paths in a single pass.
+
+        url_map is either a dict of WordPress URL -> local path or a resolver
+        callable (e.g. ImageManager.find_local_image) returning None when
+        there is no local file.
+        """
+        resolve = url_map.get if isinstance(url_map, dict) else url_map
+
         def replace_url(match):
             wp_url = match.group(0)
-            # Try to find matching local path
-            for wp_pattern, local_path in url_map.items():
-                if wp_pattern in wp_url:
-                    return local_path
-            return wp_url  # Keep original if no match
+            return resolve(wp_url) or wp_url  # Keep original if no match
 
         return self.wp_cdn_pattern.sub(replace_url, content)
 
 
-class ImageManager:
-    """Manages image file mapping from WordPress URLs to local files."""
+class ImageIndex:
+    """Filename index over an images directory, shared by every lookup in a run.
+
+    Exact and size-suffix matches are plain dictionary hits. Fuzzy matches
+    (one base name containing the other) use a trigram index over the
+    lowercase base names plus a table of base names by length, so lookups
+    never scan the whole directory. Ties resolve to the first filename in
+    sorted order. Results are memoized, and the index is rebuilt when the
+    directory's mtime changes.
+    """
+
+    NGRAM = 3
+
+    _shared: Dict[str, 'ImageIndex'] = {}
 
     def __init__(self, images_dir: str):
         self.images_dir = Path(images_dir)
-        self.image_files = self._scan_images()
-        self.base_path = "assets/images/imagenes-blog"
+        self.files: Dict[str, str] = {}  # lowercase filename or size-less base name -> filename
+        self.names: List[str] = []  # filenames in sorted order (tie-break order)
+        self._stems: List[str] = []  # lowercase base names aligned with self.names
+        self._stem_ids: Dict[str, List[int]] = {}
+        self._stem_lengths: List[int] = []
+        self._ngrams: Dict[str, Set[int]] = {}
+        self._memo: Dict[str, Optional[str]] = {}
+        self._mtime = None
+        self._built = False
+        self.refresh()
+
+    @classmethod
+    def for_directory(cls, images_dir: str) -> 'ImageIndex':
+        """Return the shared index for a directory, building it on first use."""
+        key = os.path.abspath(images_dir)
+        index = cls._shared.get(key)
+        if index is None:
+            index = cls._shared[key] = cls(images_dir)
+        return index
+
+    def refresh(self) -> bool:
+        """Rebuild the index if the directory changed. Returns True if rebuilt."""
+        try:
+            mtime = self.images_dir.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._built and mtime == self._mtime:
+            return False
+
+        self._build()
+        self._mtime = mtime
+        self._built = True
+        return True
+
+    def _build(self):
+        """Scan the directory and rebuild all lookup tables."""
+        names = []
+        if self.images_dir.is_dir():
+            for entry in os.scandir(self.images_dir):
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    names.append(entry.name)
+        names.sort()
+
+        files = {name.lower(): name for name in names}
+        for name in names:
+            # Also store base name without size variants (e.g., image-300x200.jpg -> image.jpg);
+            # a real file with that name, or the first variant in sorted order, wins
+            base_name = SIZE_SUFFIX_PATTERN.sub(r'\1', name)
+            if base_name != name:
+                files.setdefault(base_name.lower(), name)
+
+        stems = [os.path.splitext(name)[0].lower() for name in names]
+        stem_ids: Dict[str, List[int]] = {}
+        ngrams: Dict[str, Set[int]] = {}
+        for i, stem in enumerate(stems):
+            stem_ids.setdefault(stem, []).append(i)
+            for gram in self._grams(stem):
+                ngrams.setdefault(gram, set()).add(i)
+
+        self.files = files
+        self.names = names
+        self._stems = stems
+        self._stem_ids = stem_ids
+        self._stem_lengths = sorted({len(stem) for stem in stem_ids})
+        self._ngrams = ngrams
+        self._memo = {}
+
+    def fingerprint(self) -> str:
+        """Hash of the indexed filenames; changes when images are added or removed."""
+        self.refresh()
+        return hashlib.sha256('\n'.join(self.names).encode('utf-8')).hexdigest()
+
+    def _grams(self, text: str) -> Set[str]:
+        """Return the set of n-grams of a string."""
+        n = self.NGRAM
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def find(self, filename: str) -> Optional[str]:
+        """Find the local filename matching a WordPress filename."""
+        self.refresh()
+
+        if filename in self._memo:
+            return self._memo[filename]
+
+        result = self._lookup(filename)
+        self._memo[filename] = result
+        return result
+
+    def find_exact(self, filename: str) -> Optional[str]:
+        """Local filename equal to a WordPress filename, with or without its size suffix."""
+        self.refresh()
 
-        print(f"🖼️  Found {len(self.image_files)} images in {images_dir}")
+        # Try exact match first
+        if filename.lower() in self.files:
+            return self.files[filename.lower()]
 
-    def _scan_images(self) -> Dict[str, str]:
-        """Scan images directory and build filename map."""
-        image_map = {}
+        # Try base name without size variant
+        base_filename = SIZE_SUFFIX_PATTERN.sub(r'\1', filename)
+        return self.files.get(base_filename.lower())
 
-        if not self.images_dir.exists():
-            return image_map
+    def _lookup(self, filename: str) -> Optional[str]:
+        exact = self.find_exact(filename)
+        if exact:
+            return exact
+
+        # Try fuzzy matching on base name
+        base_filename = SIZE_SUFFIX_PATTERN.sub(r'\1', filename)
+        match = self._fuzzy_match(os.path.splitext(base_filename)[0].lower())
+        return self.names[match] if match is not None else None
+
+    def _fuzzy_match(self, stem: str) -> Optional[int]:
+        """Return the first file whose base name contains, or is contained in, stem."""
+        best = None
+
+        # Stored base names containing the query: intersect trigram postings
+        if len(stem) >= self.NGRAM:
+            postings = sorted((self._ngrams.get(gram, set()) for gram in self._grams(stem)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+            for i in sorted(candidates):
+                if stem in self._stems[i]:
+                    best = i
+                    break
+        else:
+            # Too short for n-grams; rare enough to scan
+            best = next((i for i, stored in enumerate(self._stems) if stem in stored), None)
+
+        # Stored base names contained in the query: probe its substrings
+        for length in self._stem_lengths:
+            if length > len(stem):
+                break
+            for start in range(len(stem) - length + 1):
+                ids = self._stem_ids.get(stem[start:start + length])
+                if ids and (best is None or ids[0] < best):
+                    best = ids[0]
+
+        return best
 
-        for file_path in self.images_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                # Store both full filename and base name (without size variants)
-                filename = file_path.name
-                image_map[filename.lower()] = filename
 
-                # Also store base name without size variants (e.g., image-300x200.jpg -> image.jpg)
-                base_name = re.sub(r'-\d+x\d+(\.[a-z]+)$', r'\1', filename)
-                if base_name != filename:
-                    image_map[base_name.lower()] = filename
+class ImageManager:
+    """Manages image file mapping from WordPress URLs to local files."""
 
-        return image_map
+    def __init__(self, images_dir: str, uploads_dir: Optional[str] = None,
+                 hash_cache: Optional[Path] = None):
+        self.images_dir = Path(images_dir)
+        self.image_index = ImageIndex.for_directory(str(images_dir))
+        self.base_path = "assets/images/imagenes-blog"
+        self.url_cache: Dict[str, Optional[str]] = {}  # WordPress URL -> local path, shared across posts
+        self.stats: Counter = Counter()  # lookups, cache hits/misses and unresolved URLs
+
+        print(f"🖼️  Found {len(self.image_index.names)} images in {images_dir}")
+
+        # With a local copy of wp-content/uploads, images whose name has no
+        # exact local match are matched by content before falling back to
+        # fuzzy filename matching
+        self.uploads_dir = Path(uploads_dir) if uploads_dir else None
+        self.perceptual_index = None
+        if self.uploads_dir:
+            self.perceptual_index = PerceptualIndex.for_directory(self.images_dir, hash_cache)
+            unreadable = self.perceptual_index.unreadable
+            print(f"   Perceptual hashes of {len(self.perceptual_index.names)} images "
+                  f"({self.perceptual_index.hashed} hashed" + (f", {unreadable} unreadable)" if unreadable else ")"))
+
+    @property
+    def image_files(self) -> Dict[str, str]:
+        """Lowercase filename (and size-less base name) to local filename."""
+        return self.image_index.files
 
     def find_local_image(self, wp_url: str) -> Optional[str]:
         """Find local image file matching WordPress URL."""
         if not wp_url:
             return None
 
+        if wp_url in self.url_cache:
+            self.stats['cache_hits'] += 1
+            return self.url_cache[wp_url]
+        self.stats['cache_misses'] += 1
+
         # Extract filename from URL
         filename = wp_url.split('/')[-1]
 
-        # Try exact match first
-        if filename.lower() in self.image_files:
-            return f"{self.base_path}/{self.image_files[filename.lower()]}"
-
-        # Try base name without size variant
-        base_filename = re.sub(r'-\d+x\d+(\.[a-z]+)$', r'\1', filename)
-        if base_filename.lower() in self.image_files:
-            return f"{self.base_path}/{self.image_files[base_filename.lower()]}"
-
-        # Try fuzzy matching on base name
-        base_name_no_ext = os.path.splitext(base_filename)[0].lower()
-        for stored_name in self.image_files.values():
-            stored_base = os.path.splitext(stored_name)[0].lower()
-            if base_name_no_ext in stored_base or stored_base in base_name_no_ext:
-                return f"{self.base_path}/{stored_name}"
-
+        local_name = None
+        if self.perceptual_index:
+            local_name = self.image_index.find_exact(filename) or self._find_by_content(wp_url)
+        if local_name is None:
+            local_name = self.image_index.find(filename)
+        local_path = f"{self.base_path}/{local_name}" if local_name else None
+        if local_path is None:
+            self.stats['unresolved'] += 1
+
+        self.url_cache[wp_url] = local_path
+        return local_path
+
+    def _find_by_content(self, wp_url: str) -> Optional[str]:
+        """Local filename of the image that looks like the uploaded file of a WordPress URL."""
+        marker = 'wp-content/uploads/'
+        if marker not in wp_url:
+            return None
+        relative = unquote(wp_url.split(marker, 1)[1].split('?', 1)[0])
+
+        # Resized variants may not have been kept; the original looks the same
+        for candidate in dict.fromkeys([relative, SIZE_SUFFIX_PATTERN.sub(r'\1', relative)]):
+            upload = self.uploads_dir / candidate
+            if upload.is_file():
+                match = self.perceptual_index.find_file(upload)
+                if match:
+                    self.stats['content_matches'] += 1
+                    return match[0]
         return None
 
     def get_placeholder(self) -> str:
@@ -269,10 +821,40 @@ class ImageManager:
 class PostBuilder:
     """Builds blog post JSON objects from WordPress data."""
 
-    def __init__(self, image_manager: ImageManager, content_transformer: ContentTransformer):
+    # Bump when build() output changes for the same input, to invalidate BuildCache
+    BUILD_VERSION = 3
+
+    def __init__(self, image_manager: ImageManager, content_transformer: ContentTransformer,
+                 wxr_index: Optional[WXRIndex] = None, image_manifest: Optional[ImageManifest] = None):
         self.image_manager = image_manager
         self.content_transformer = content_transformer
+        self.wxr_index = wxr_index
+        self.image_manifest = image_manifest
         self.author = "Carlos Rodgarman"
+        self.timings: Counter = Counter()  # seconds per build step, since the last collect_stats()
+
+    def fingerprint(self) -> str:
+        """Hash of everything besides the post itself that affects build() output."""
+        digest = hashlib.sha256()
+        digest.update(f'{self.BUILD_VERSION}\n{self.author}\n'.encode('utf-8'))
+        digest.update(self.content_transformer.signature().encode('utf-8'))
+        digest.update(self.image_manager.image_index.fingerprint().encode('utf-8'))
+        if self.image_manager.perceptual_index:
+            digest.update(f'{self.image_manager.uploads_dir.resolve()}\n'.encode('utf-8'))
+            digest.update(self.image_manager.perceptual_index.fingerprint().encode('utf-8'))
+        if self.image_manifest:
+            digest.update(self.image_manifest.fingerprint().encode('utf-8'))
+        return digest.hexdigest()
+
+    def input_key(self, wp_post: Dict) -> str:
+        """Hash of a post's raw data, including its resolved thumbnail attachment."""
+        thumbnail = None
+        thumbnail_id = wp_post['postmeta'].get('_thumbnail_id', '')
+        if thumbnail_id and self.wxr_index:
+            thumbnail = self.wxr_index.get_attachment(thumbnail_id)
+
+        payload = json.dumps([wp_post, thumbnail], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
     def build(self, wp_post: Dict) -> Dict:
         """Build complete blog post JSON object."""
@@ -280,20 +862,29 @@ class PostBuilder:
         post_id = wp_post['wp_post_name'] or self._slugify(wp_post['title'])
 
         # Transform content
+        start = time.perf_counter()
         content = self.content_transformer.transform(wp_post['content'])
+        transformed = time.perf_counter()
 
         # Find featured image
         featured_image = self._resolve_featured_image(wp_post, content)
 
-        # Build image URL map for content replacement
-        url_map = self._build_image_url_map(content)
-        content = self.content_transformer.replace_image_urls(content, url_map)
+        # Replace WordPress image URLs with local paths
+        content = self.content_transformer.replace_image_urls(content, self.image_manager.find_local_image)
+
+        # Add srcset for images with responsive derivatives
+        if self.image_manifest:
+            content = self.image_manifest.add_srcset(content)
+        resolved = time.perf_counter()
+
+        # Plain text of the content, stripped once for every text-derived field
+        text = PostText(content)
 
         # Extract or generate excerpt
-        excerpt = self._generate_excerpt(wp_post, content)
+        excerpt = self._generate_excerpt(wp_post, text)
 
         # Calculate read time
-        read_time = self._calculate_read_time(wp_post, content)
+        read_time = self._calculate_read_time(wp_post, text)
 
         # Get category (use first one, default to "Blog")
         category = wp_post['categories'][0] if wp_post['categories'] else "Blog"
@@ -327,16 +918,38 @@ class PostBuilder:
             "featured": False  # Set featured posts manually later
         }
 
+        srcsets = self.image_manifest.srcsets(featured_image) if self.image_manifest else None
+        if srcsets:
+            post["featuredImageSrcset"] = srcsets
+
+        self.timings['transform'] += transformed - start
+        self.timings['image_resolution'] += resolved - transformed
+        self.timings['metadata'] += time.perf_counter() - resolved
         return post
 
+    def collect_stats(self) -> Tuple[Dict[str, int], Dict[str, float]]:
+        """Counters and step timings since the last call, then reset."""
+        counters = {f'rewrite.{name}': n for name, n in self.content_transformer.rewrite_counts.items()}
+        counters.update((f'balance.{name}', n) for name, n in self.content_transformer.balance_counts.items())
+        counters.update((f'image_lookup.{name}', n) for name, n in self.image_manager.stats.items())
+        timers = {f'build.{step}': seconds for step, seconds in self.timings.items()}
+
+        self.content_transformer.rewrite_counts.clear()
+        self.content_transformer.balance_counts.clear()
+        self.image_manager.stats.clear()
+        self.timings.clear()
+        return counters, timers
+
     def _resolve_featured_image(self, wp_post: Dict, content: str) -> str:
         """Resolve featured image from thumbnail ID or content."""
         # Priority 1: Use thumbnail ID from postmeta
         thumbnail_id = wp_post['postmeta'].get('_thumbnail_id', '')
-        if thumbnail_id:
-            # For now, we can't resolve attachment IDs without parsing attachments
-            # Fall through to other methods
-            pass
+        if thumbnail_id and self.wxr_index:
+            attachment = self.wxr_index.get_attachment(thumbnail_id)
+            if attachment:
+                local_image = self.image_manager.find_local_image(attachment['url'])
+                if local_image:
+                    return local_image
 
         # Priority 2: Extract first image from content
         first_image_url = self.content_transformer.extract_first_image(content)
@@ -348,36 +961,16 @@ class PostBuilder:
         # Priority 3: Use placeholder
         return self.image_manager.get_placeholder()
 
-    def _build_image_url_map(self, content: str) -> Dict[str, str]:
-        """Build map of WordPress URLs to local paths from content."""
-        url_map = {}
-
-        # Find all image URLs in content
-        img_urls = re.findall(r'https://carlosrodgarman\.com/wp-content/uploads/[^"\'>\s]+', content)
-
-        for wp_url in img_urls:
-            local_path = self.image_manager.find_local_image(wp_url)
-            if local_path:
-                url_map[wp_url] = local_path
-
-        return url_map
-
-    def _generate_excerpt(self, wp_post: Dict, content: str) -> str:
+    def _generate_excerpt(self, wp_post: Dict, text: PostText) -> str:
         """Generate excerpt from WordPress data or content."""
         # Use WordPress excerpt if available
         if wp_post['excerpt']:
-            excerpt = re.sub(r'<[^>]+>', '', wp_post['excerpt'])  # Strip HTML
-            return excerpt.strip()[:200]
+            return PostText(wp_post['excerpt']).raw_text.strip()[:200]
 
         # Generate from content
-        text_content = re.sub(r'<[^>]+>', '', content)  # Strip HTML
-        text_content = re.sub(r'\s+', ' ', text_content)  # Normalize whitespace
-
-        if len(text_content) > 150:
-            return text_content[:150] + '...'
-        return text_content
+        return text.excerpt(150)
 
-    def _calculate_read_time(self, wp_post: Dict, content: str) -> str:
+    def _calculate_read_time(self, wp_post: Dict, text: PostText) -> str:
         """Calculate or extract read time."""
         # Try Yoast estimated reading time
         yoast_time = wp_post['postmeta'].get('_yoast_wpseo_estimated-reading-time-minutes', '')
@@ -385,11 +978,7 @@ class PostBuilder:
             return f"{yoast_time} min read"
 
         # Calculate from word count (200 words per minute)
-        text_content = re.sub(r'<[^>]+>', '', content)
-        word_count = len(text_content.split())
-        minutes = max(1, round(word_count / 200))
-
-        return f"{minutes} min read"
+        return f"{text.read_minutes()} min read"
 
     def _format_date(self, wp_date: str) -> str:
         """Format WordPress date to YYYY-MM-DD."""
@@ -435,43 +1024,211 @@ class PostBuilder:
         return text.strip('-')
 
 
-class Validator:
-    """Validates blog post data."""
+class BuildCache:
+    """Persistent cache of built posts for incremental migrations.
 
-    def validate_posts(self, posts: List[Dict]) -> tuple[bool, List[str]]:
-        """Validate list of posts. Returns (is_valid, errors)."""
-        errors = []
-        ids_seen = set()
+    Entries are keyed by post ID and a hash of the post's raw content,
+    postmeta and other fields (PostBuilder.input_key). The whole cache is
+    tied to the builder fingerprint: BUILD_VERSION, the content rewrites, the
+    element renames and the local image listing. A re-run only rebuilds posts whose input
+    changed; everything else is reused from the previous output.
+    """
 
-        for i, post in enumerate(posts):
-            # Check required fields
-            required_fields = ['id', 'title', 'slug', 'content', 'featuredImage',
-                             'category', 'tags', 'author', 'publishDate', 'readTime']
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict] = {}  # post id -> {key, post}
+        self.used: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Ignoring unreadable build cache {self.path}: {e}")
+            return
+
+        if data.get('fingerprint') == self.fingerprint:
+            self.entries = data.get('posts', {})
+
+    @staticmethod
+    def cache_id(wp_post: Dict) -> str:
+        return wp_post.get('wp_post_id') or wp_post['wp_post_name'] or wp_post['title']
+
+    def get(self, wp_post: Dict, key: str) -> Optional[Dict]:
+        """Return the cached post if its input key is unchanged."""
+        entry = self.entries.get(self.cache_id(wp_post))
+        if entry and entry['key'] == key:
+            self.used.add(self.cache_id(wp_post))
+            self.hits += 1
+            return entry['post']
+
+        self.misses += 1
+        return None
 
-            for field in required_fields:
-                if field not in post:
-                    errors.append(f"Post {i}: Missing required field '{field}'")
+    def put(self, wp_post: Dict, key: str, blog_post: Dict):
+        cache_id = self.cache_id(wp_post)
+        self.entries[cache_id] = {'key': key, 'post': blog_post}
+        self.used.add(cache_id)
 
-            # Check for duplicate IDs
-            if 'id' in post:
-                if post['id'] in ids_seen:
-                    errors.append(f"Post {i}: Duplicate ID '{post['id']}'")
-                ids_seen.add(post['id'])
+    def save(self):
+        """Write the cache, dropping entries for posts not seen in this run."""
+        data = {
+            'fingerprint': self.fingerprint,
+            'posts': {cache_id: self.entries[cache_id] for cache_id in sorted(self.used)}
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
 
-            # Validate date format
-            if 'publishDate' in post:
-                if not re.match(r'\d{4}-\d{2}-\d{2}', post['publishDate']):
-                    errors.append(f"Post {i} ({post.get('id')}): Invalid date format '{post['publishDate']}'")
 
-            # Check tags is array
-            if 'tags' in post and not isinstance(post['tags'], list):
-                errors.append(f"Post {i} ({post.get('id')}): Tags must be an array")
+class Validator:
+    """Validates migrated posts: structural errors fail, site-schema findings warn."""
 
-        return len(errors) == 0, errors
+    def __init__(self):
+        self.validate = compile_schema(MIGRATED_POSTS)
+        self.check_site = VALIDATORS['data/blog-posts.json']
 
+    def validate_posts(self, posts: List[Dict]) -> tuple[bool, List[str]]:
+        """Validate list of posts. Returns (is_valid, errors)."""
+        errors = [f"Post {path}: {message}" for path, message in self.validate(posts)]
+        return len(errors) == 0, errors
 
-def main():
+    def warnings(self, posts: List[Dict]) -> List[str]:
+        """Findings of the site's data schema (e.g. an untitled post) that do not stop a migration."""
+        return [f"Post {path}: {message}" for path, message in self.check_site(posts)]
+
+
+# PostBuilder of a --jobs worker process, set by _init_worker
+_worker_builder: Optional[PostBuilder] = None
+
+
+def _init_worker(post_builder: PostBuilder):
+    """Install the shared PostBuilder (and its image index) in a worker process."""
+    global _worker_builder
+    _worker_builder = post_builder
+
+
+def _build_in_worker(wp_post: Dict) -> Tuple:
+    """Build one post in a worker, returning (post, error message, seconds, stats)."""
+    return _build_one(_worker_builder, wp_post) + (_worker_builder.collect_stats(),)
+
+
+def build_posts(post_builder: PostBuilder, wp_posts: List[Dict], jobs: int = 1,
+                cache: Optional[BuildCache] = None, metrics: Optional[Instrumentation] = None
+                ) -> Iterator[Tuple[Dict, Optional[Dict], Optional[str]]]:
+    """Build blog posts, yielding (wp_post, blog_post, error) in input order.
+
+    With a BuildCache, posts whose input is unchanged are reused and only
+    the rest are built. With jobs > 1 those are sharded across a process
+    pool. The PostBuilder, including its already-built image index, is
+    handed to each worker once at start-up, and results come back in the
+    original order. With metrics, per-post build times and the builder's
+    counters (from every worker) are recorded.
+    """
+    keys = [post_builder.input_key(wp_post) for wp_post in wp_posts] if cache else [None] * len(wp_posts)
+    cached = [cache.get(wp_post, key) for wp_post, key in zip(wp_posts, keys)] if cache else [None] * len(wp_posts)
+    pending = [wp_post for wp_post, hit in zip(wp_posts, cached) if hit is None]
+
+    if jobs <= 1 or len(pending) <= 1:
+        results = map(lambda wp_post: _build_one(post_builder, wp_post), pending)
+        yield from _merge_results(wp_posts, keys, cached, results, cache, metrics)
+        if metrics is not None:
+            metrics.merge(*post_builder.collect_stats())
+        return
+
+    chunksize = max(1, len(pending) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(post_builder,)) as executor:
+        results = executor.map(_build_in_worker, pending, chunksize=chunksize)
+        yield from _merge_results(wp_posts, keys, cached, results, cache, metrics)
+
+
+def _build_one(post_builder: PostBuilder, wp_post: Dict) -> Tuple[Optional[Dict], Optional[str], float]:
+    """Build one post, returning (post, error message, seconds)."""
+    start = time.perf_counter()
+    try:
+        post, error = post_builder.build(wp_post), None
+    except Exception as e:
+        post, error = None, str(e)
+    return post, error, time.perf_counter() - start
+
+
+def _merge_results(wp_posts, keys, cached, results, cache, metrics=None):
+    """Interleave cached posts with freshly built ones, in input order."""
+    results = iter(results)
+    for wp_post, key, hit in zip(wp_posts, keys, cached):
+        if hit is not None:
+            yield wp_post, hit, None
+            continue
+
+        blog_post, error, seconds, *worker_stats = next(results)
+        if metrics is not None:
+            metrics.record_item('build', wp_post.get('wp_post_name') or wp_post.get('title', ''), seconds)
+            if worker_stats:
+                metrics.merge(*worker_stats[0])
+        if cache is not None and error is None:
+            cache.put(wp_post, key, blog_post)
+        yield wp_post, blog_post, error
+
+
+def _write_instrumentation(metrics: Instrumentation, args):
+    """Print the stage timings and write the report and profile requested on the command line."""
+    print()
+    print("⏱️  Stages:")
+    metrics.print_summary()
+
+    counters = metrics.counters
+    lookups = counters['image_lookup.cache_hits'] + counters['image_lookup.cache_misses']
+    if lookups:
+        print(f"   Image lookups: {lookups} ({counters['image_lookup.cache_hits'] / lookups:.0%} cached, "
+              f"{counters['image_lookup.unresolved']} unresolved)")
+    rewrites = sum(n for name, n in counters.items() if name.startswith('rewrite.'))
+    if rewrites:
+        print(f"   Content rewrites: {rewrites}")
+
+    if args.report:
+        metrics.write_report(args.report)
+        print(f"   Report: {args.report}")
+    if args.profile:
+        stage = metrics.dump_profile(args.profile_out)
+        if stage:
+            print(f"   cProfile of '{stage}': {args.profile_out}")
+
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description='Migrate WordPress posts to the static blog JSON format.')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=1,
+                            help='worker processes for building posts (0 = one per CPU)')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='rebuild every post instead of reusing unchanged ones from the build cache')
+    arg_parser.add_argument('--reimport', action='store_true',
+                            help='parse the export again even if its SQLite import is current')
+    arg_parser.add_argument('--uploads', type=Path,
+                            help='local copy of wp-content/uploads; images without an exact local '
+                                 'name match are matched by content (needs Pillow)')
+    arg_parser.add_argument('--report', type=Path,
+                            help='write stage timings, counters and the slowest posts as JSON')
+    arg_parser.add_argument('--trace-memory', action='store_true',
+                            help='record the tracemalloc peak of each stage (slows the run down)')
+    arg_parser.add_argument('--profile', nargs='?', const='auto', metavar='STAGE',
+                            help='cProfile a stage (default: the slowest) and dump it to --profile-out; '
+                                 'with --jobs, work done in worker processes is not profiled')
+    arg_parser.add_argument('--profile-out', type=Path, default=Path('migration.prof'),
+                            help='cProfile stats file (default: migration.prof)')
+    args = arg_parser.parse_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+    metrics = Instrumentation(trace_memory=args.trace_memory, profile=args.profile)
+
     print("=" * 60)
     print("WordPress to Static Blog Migration")
     print("=" * 60)
@@ -483,89 +1240,120 @@ def main():
     images_dir = base_dir / 'assets' / 'images' / 'imagenes-blog'
     existing_posts_path = base_dir / 'data' / 'blog-posts.json'
     output_path = base_dir / 'data' / 'blog-posts-migrated.json'
+    cache_path = base_dir / 'data' / '.migration-cache.json'
+    manifest_path = base_dir / 'data' / 'image-manifest.json'
+    hash_cache_path = base_dir / 'data' / '.image-hashes.json'
+    wxr_store_path = base_dir / 'data' / '.wxr-cache.sqlite'
+
+    # Parse WordPress export (posts, attachments and postmeta in one pass), or
+    # read it from its SQLite import when the export is unchanged
+    with metrics.stage('parse'):
+        wxr_index = WXRIndex.build(xml_path, wxr_store_path, reimport=args.reimport)
+        wp_posts = wxr_index.posts
+    metrics.count('posts.parsed', len(wp_posts))
+    metrics.count('attachments', len(wxr_index.attachments))
 
     # Initialize components
-    parser = WordPressParser(xml_path)
-    image_manager = ImageManager(str(images_dir))
-    content_transformer = ContentTransformer()
-    post_builder = PostBuilder(image_manager, content_transformer)
-    validator = Validator()
-
-    # Parse WordPress export
-    wp_posts = parser.parse()
+    with metrics.stage('setup'):
+        image_manager = ImageManager(str(images_dir), args.uploads, hash_cache_path)
+        content_transformer = ContentTransformer()
+        image_manifest = ImageManifest(manifest_path) if manifest_path.exists() else None
+        post_builder = PostBuilder(image_manager, content_transformer, wxr_index, image_manifest)
+        build_cache = None if args.no_cache else BuildCache(cache_path, post_builder.fingerprint())
+        validator = Validator()
 
     if not wp_posts:
         print("❌ No posts found in WordPress export")
         return 1
 
     print()
-    print(f"🔄 Transforming {len(wp_posts)} posts...")
+    print(f"🔄 Transforming {len(wp_posts)} posts" + (f" with {jobs} workers..." if jobs > 1 else "..."))
 
     # Build blog posts
     new_posts = []
     warnings = []
 
-    for i, wp_post in enumerate(wp_posts, 1):
-        try:
-            blog_post = post_builder.build(wp_post)
-            new_posts.append(blog_post)
-
-            # Warn if using placeholder
-            if blog_post['featuredImage'] == image_manager.get_placeholder():
-                warnings.append(f"   ⚠️  '{blog_post['title']}' - using placeholder image")
-
-            print(f"   [{i}/{len(wp_posts)}] ✓ {blog_post['title']}")
-        except Exception as e:
-            print(f"   [{i}/{len(wp_posts)}] ❌ Error: {e}")
-            warnings.append(f"   ❌ Failed to process: {wp_post.get('title', 'Unknown')}")
+    with metrics.stage('build'):
+        for i, (wp_post, blog_post, error) in enumerate(
+                build_posts(post_builder, wp_posts, jobs, build_cache, metrics), 1):
+            if error is None:
+                new_posts.append(blog_post)
+
+                # Warn if using placeholder
+                if blog_post['featuredImage'] == image_manager.get_placeholder():
+                    warnings.append(f"   ⚠️  '{blog_post['title']}' - using placeholder image")
+                    metrics.count('posts.placeholder_image')
+
+                print(f"   [{i}/{len(wp_posts)}] ✓ {blog_post['title']}")
+            else:
+                print(f"   [{i}/{len(wp_posts)}] ❌ Error: {error}")
+                warnings.append(f"   ❌ Failed to process: {wp_post.get('title', 'Unknown')}")
+                metrics.count('posts.failed')
+
+        if build_cache:
+            build_cache.save()
+            metrics.count('build_cache.hits', build_cache.hits)
+            metrics.count('build_cache.misses', build_cache.misses)
+            print(f"   ♻️  Reused {build_cache.hits} unchanged posts, rebuilt {build_cache.misses}")
+    metrics.count('posts.built', len(new_posts))
 
     # Load existing posts
     print()
     print("📚 Merging with existing posts...")
-    existing_posts = []
-
-    if existing_posts_path.exists():
-        with open(existing_posts_path, 'r', encoding='utf-8') as f:
-            existing_posts = json.load(f)
-        print(f"   Found {len(existing_posts)} existing posts")
-
-    # Merge (avoid duplicates by ID)
-    existing_ids = {post['id'] for post in existing_posts}
-    merged_posts = existing_posts.copy()
-
-    duplicates = 0
-    for post in new_posts:
-        if post['id'] not in existing_ids:
-            merged_posts.append(post)
-        else:
-            duplicates += 1
-            print(f"   ⚠️  Skipping duplicate ID: {post['id']}")
-
-    print(f"   Total posts after merge: {len(merged_posts)}")
-    if duplicates > 0:
-        print(f"   Skipped {duplicates} duplicates")
-
-    # Sort by date (newest first)
-    merged_posts.sort(key=lambda x: x['publishDate'], reverse=True)
+    with metrics.stage('merge'):
+        existing_posts = []
+
+        if existing_posts_path.exists():
+            with open(existing_posts_path, 'r', encoding='utf-8') as f:
+                existing_posts = json.load(f)
+            print(f"   Found {len(existing_posts)} existing posts")
+
+        # Merge (avoid duplicates by ID)
+        existing_ids = {post['id'] for post in existing_posts}
+        merged_posts = existing_posts.copy()
+
+        duplicates = 0
+        for post in new_posts:
+            if post['id'] not in existing_ids:
+                merged_posts.append(post)
+            else:
+                duplicates += 1
+                print(f"   ⚠️  Skipping duplicate ID: {post['id']}")
+
+        print(f"   Total posts after merge: {len(merged_posts)}")
+        if duplicates > 0:
+            print(f"   Skipped {duplicates} duplicates")
+
+        # Sort by date (newest first)
+        merged_posts.sort(key=lambda x: x['publishDate'], reverse=True)
+    metrics.count('posts.duplicates', duplicates)
 
     # Validate
     print()
     print("✅ Validating posts...")
-    is_valid, errors = validator.validate_posts(merged_posts)
+    with metrics.stage('validate'):
+        is_valid, errors = validator.validate_posts(merged_posts)
 
     if not is_valid:
         print(f"   ❌ Validation failed with {len(errors)} errors:")
         for error in errors[:10]:  # Show first 10 errors
             print(f"      {error}")
+        _write_instrumentation(metrics, args)
         return 1
 
     print(f"   ✓ All {len(merged_posts)} posts validated successfully")
+    schema_warnings = validator.warnings(merged_posts)
+    if schema_warnings:
+        print(f"   ⚠️  {len(schema_warnings)} warnings from the site data schema (scripts/validate_data.py):")
+        for warning in schema_warnings[:10]:
+            print(f"      {warning}")
 
     # Write output
     print()
     print(f"💾 Writing to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(merged_posts, f, indent=2, ensure_ascii=False)
+    with metrics.stage('serialize'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(merged_posts, f, indent=2, ensure_ascii=False)
 
     print(f"   ✓ Wrote {len(merged_posts)} posts")
 
@@ -586,6 +1374,8 @@ def main():
         for warning in warnings[:20]:  # Show first 20 warnings
             print(warning)
 
+    _write_instrumentation(metrics, args)
+
     print()
     print("✅ Migration complete!")
     print(f"   Output file: {output_path}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Plain-text analysis of a post's HTML, computed once and shared.
+
+    text = PostText(post['content'])
+    text.excerpt(150)     # first 150 characters of the plain text, with '...'
+    text.read_minutes()   # at 200 words per minute, at least 1
+    text.search_text      # tags as spaces, entities decoded: for tokenizing
+
+Every property is computed on first use and kept, so the excerpt, read
+time and any later pass all read the same stripped text instead of each
+stripping the HTML again. post_text() memoizes the analysis by content,
+so the search index and the duplicate finder share it too.
+"""
+
+import html
+import re
+from functools import cached_property, lru_cache
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+WORDS_PER_MINUTE = 200
+
+
+class PostText:
+    """Plain text and word count of an HTML fragment."""
+
+    def __init__(self, html: str):
+        self.html = html or ''
+
+    @cached_property
+    def raw_text(self) -> str:
+        """The HTML with its tags removed, whitespace as it was."""
+        return TAG_PATTERN.sub('', self.html)
+
+    @cached_property
+    def text(self) -> str:
+        """Plain text with each run of whitespace collapsed to one space."""
+        return WHITESPACE_PATTERN.sub(' ', self.raw_text)
+
+    @cached_property
+    def word_count(self) -> int:
+        # Whitespace is already collapsed, so words are the spaces between them plus one
+        stripped = self.text.strip(' ')
+        return stripped.count(' ') + 1 if stripped else 0
+
+    @cached_property
+    def search_text(self) -> str:
+        """Text with each tag replaced by a space and entities decoded, so words never run together."""
+        return html.unescape(TAG_PATTERN.sub(' ', self.html))
+
+    def excerpt(self, length: int = 150) -> str:
+        """The first length characters of the plain text, with '...' if cut."""
+        text = self.text
+        return text[:length] + '...' if len(text) > length else text
+
+    def read_minutes(self, words_per_minute: int = WORDS_PER_MINUTE) -> int:
+        return max(1, round(self.word_count / words_per_minute))
+
+
+@lru_cache(maxsize=4096)
+def post_text(html: str) -> PostText:
+    """Shared PostText for a piece of content."""
+    return PostText(html)
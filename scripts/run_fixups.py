@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Run the blog-posts.json fix-up passes in memory.
+
+Loads the posts once, runs any ordered selection of the fix-up passes on
+the in-memory list, and writes the file once at the end, reporting the
+time and number of changes of each pass.
+
+Usage:
+    python3 scripts/run_fixups.py                      # full clean-up chain
+    python3 scripts/run_fixups.py fix-html-tags clean-wordpress-urls
+    python3 scripts/run_fixups.py --posts other.json --original other.json.backup
+    python3 scripts/run_fixups.py --list
+
+The deduplicate pass keeps the manual posts, whose IDs it reads from
+--original (default: the backup next to --posts, e.g.
+data/blog-posts.json.backup).
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from blog_data import BACKUP_PATH, POSTS_PATH, describe_save, load_posts, save_posts
+import clean_wordpress_urls
+import deduplicate_posts
+import fix_featured_images_properly
+import fix_html_tags
+import fix_manual_post_images
+import update_featured_images
+
+
+class FixupPass:
+    """A named transformation of the posts list.
+
+    run(posts) returns (posts, number of changes); passes that edit posts in
+    place return the same list.
+    """
+
+    def __init__(self, name: str, description: str, run: Callable[[List[Dict]], Tuple[List[Dict], int]]):
+        self.name = name
+        self.description = description
+        self.run = run
+
+
+def in_place(fix: Callable[[List[Dict]], int]) -> Callable[[List[Dict]], Tuple[List[Dict], int]]:
+    """Adapt an in-place fix returning a change count to the pass interface."""
+    return lambda posts: (posts, fix(posts))
+
+
+def deduplicate_pass(original_path: Path = BACKUP_PATH) -> FixupPass:
+    """The deduplicate pass, keeping the manual posts whose IDs are in original_path."""
+    def run(posts: List[Dict]) -> Tuple[List[Dict], int]:
+        original_ids = deduplicate_posts.load_original_ids(original_path)
+        if not original_ids:
+            print(f"  ⚠️  No manual posts found in {original_path}; keeping the first of each duplicate group")
+        deduplicated, duplicates_removed = deduplicate_posts.deduplicate(posts, original_ids)
+        for dup in duplicates_removed:
+            print(f"  - {dup}")
+        return deduplicated, len(duplicates_removed)
+
+    return FixupPass('deduplicate', 'Remove duplicate posts, keeping manual ones', run)
+
+
+# Available passes, in the order of the full clean-up chain
+PASSES = [
+    deduplicate_pass(),
+    FixupPass('fix-html-tags', 'Balance mismatched and unclosed HTML tags', in_place(fix_html_tags.fix_posts)),
+    FixupPass('clean-wordpress-urls', 'Strip leftover wp-content URLs', in_place(clean_wordpress_urls.clean_posts)),
+    FixupPass('update-featured-images', 'Replace placeholders by title keyword',
+              in_place(update_featured_images.update_posts)),
+    FixupPass('fix-manual-post-images', 'Fix images of manually created posts',
+              in_place(fix_manual_post_images.fix_posts)),
+    FixupPass('fix-featured-images-properly', 'Set specific featured images by title',
+              in_place(fix_featured_images_properly.fix_posts)),
+]
+
+PASSES_BY_NAME = {fixup.name: fixup for fixup in PASSES}
+
+
+def run_passes(posts: List[Dict], passes: List[FixupPass]) -> Tuple[List[Dict], List[Dict]]:
+    """Run passes in order on the in-memory posts. Returns (posts, per-pass report)."""
+    report = []
+
+    for fixup in passes:
+        print(f"\n▶ {fixup.name}: {fixup.description}")
+        start = time.perf_counter()
+        posts, changes = fixup.run(posts)
+        elapsed = time.perf_counter() - start
+        report.append({'pass': fixup.name, 'seconds': elapsed, 'changes': changes})
+
+    return posts, report
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description='Run blog-posts.json fix-up passes in memory.')
+    arg_parser.add_argument('passes', nargs='*', metavar='PASS',
+                            help='passes to run, in order (default: the full chain)')
+    arg_parser.add_argument('--posts', type=Path, default=POSTS_PATH, help='posts JSON file')
+    arg_parser.add_argument('--original', type=Path,
+                            help='posts file whose IDs are the manually created posts (default: the backup for POSTS)')
+    arg_parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    arg_parser.add_argument('--list', action='store_true', help='list available passes')
+    args = arg_parser.parse_args(argv)
+
+    if args.list:
+        for fixup in PASSES:
+            print(f"{fixup.name:30} {fixup.description}")
+        return 0
+
+    unknown = [name for name in args.passes if name not in PASSES_BY_NAME]
+    if unknown:
+        print(f"❌ Unknown pass: {', '.join(unknown)} (see --list)")
+        return 1
+
+    passes = [PASSES_BY_NAME[name] for name in args.passes] if args.passes else PASSES
+    original = args.original or deduplicate_posts.backup_path(args.posts)
+    passes = [deduplicate_pass(original) if fixup.name == 'deduplicate' else fixup for fixup in passes]
+
+    start = time.perf_counter()
+    posts = load_posts(args.posts)
+    load_time = time.perf_counter() - start
+    print(f"📖 Loaded {len(posts)} posts from {args.posts} ({load_time * 1000:.1f} ms)")
+
+    posts, report = run_passes(posts, passes)
+
+    save_time = 0.0
+    saved = None
+    if not args.dry_run:
+        start = time.perf_counter()
+        saved = save_posts(posts, args.posts)
+        save_time = time.perf_counter() - start
+
+    print()
+    print("=" * 60)
+    print(f"{'Pass':30} {'Changes':>8} {'Time (ms)':>12}")
+    print("-" * 60)
+    for entry in report:
+        print(f"{entry['pass']:30} {entry['changes']:>8} {entry['seconds'] * 1000:>12.1f}")
+    print("-" * 60)
+    print(f"{'load':30} {'':>8} {load_time * 1000:>12.1f}")
+    if args.dry_run:
+        print("Dry run: nothing written")
+    else:
+        print(f"{'save':30} {'':>8} {save_time * 1000:>12.1f}")
+        print(f"💾 {describe_save(saved, args.posts)}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
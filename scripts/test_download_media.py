@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Tests of download_media.py against a local stand-in HTTP server.
+
+The server (http.server.ThreadingHTTPServer on 127.0.0.1) serves files
+from a dict with ETag, Last-Modified and Repr-Digest headers, honours
+Range/If-Range and conditional requests, and can be told to truncate,
+fail or redirect; every request it receives is logged for the checks.
+
+Usage:
+    python3 scripts/test_download_media.py   (or: python3 -m pytest scripts/test_download_media.py)
+"""
+
+import base64
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+import download_media
+from download_media import MediaDownloader
+
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+class StandInServer:
+    """A media host whose behaviour each test sets up."""
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+        self.truncate: Dict[str, int] = {}   # path -> responses to cut short
+        self.failures: Dict[str, List[int]] = {}  # path -> statuses to answer first
+        self.redirects: Dict[str, str] = {}  # path -> Location
+        self.etags = True
+        self.bad_digest = False
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append({'path': self.path, **dict(self.headers)})
+                server.respond(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def etag(self, body: bytes) -> str:
+        return '"' + hashlib.md5(body).hexdigest() + '"'
+
+    def respond(self, handler: BaseHTTPRequestHandler):
+        path = handler.path
+        failures = self.failures.get(path)
+        if failures:
+            self._empty(handler, failures.pop(0))
+            return
+        if path in self.redirects:
+            self._empty(handler, 302, {'Location': self.redirects[path]})
+            return
+        body = self.files.get(path)
+        if body is None:
+            self._empty(handler, 404)
+            return
+
+        validators = {'Last-Modified': LAST_MODIFIED}
+        if self.etags:
+            validators['ETag'] = self.etag(body)
+        request = handler.headers
+        if ((self.etags and request.get('If-None-Match') == validators.get('ETag'))
+                or (not self.etags and request.get('If-Modified-Since') == LAST_MODIFIED)):
+            self._empty(handler, 304, validators)
+            return
+
+        digest = hashlib.sha256(b'not the file' if self.bad_digest else body).digest()
+        headers = dict(validators, **{'Repr-Digest': f'sha-256=:{base64.b64encode(digest).decode()}:'})
+        start = 0
+        if request.get('Range') and request.get('If-Range') in validators.values():
+            start = int(request['Range'].split('=')[1].rstrip('-'))
+            headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+        chunk = body[start:]
+        headers['Content-Length'] = str(len(chunk))
+
+        handler.send_response(206 if start else 200)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if self.truncate.get(path):
+            self.truncate[path] -= 1
+            handler.wfile.write(chunk[:len(chunk) // 3])
+            handler.wfile.flush()
+            handler.close_connection = True
+            return
+        handler.wfile.write(chunk)
+
+    @staticmethod
+    def _empty(handler: BaseHTTPRequestHandler, status: int, headers: Dict[str, str] = None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+
+
+class DownloadMediaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer()
+        self.addCleanup(self.server.close)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name) / 'imagenes-blog'
+        self.state_path = Path(self.tmp.name) / 'media-downloads.json'
+        self.server.files['/foto.jpg'] = bytes(range(256)) * 1000
+
+        retry_delay = download_media.RETRY_DELAY
+        download_media.RETRY_DELAY = 0
+        self.addCleanup(setattr, download_media, 'RETRY_DELAY', retry_delay)
+
+    def download(self, path: str = '/foto.jpg', retries: int = 2, **item) -> Dict:
+        downloader = MediaDownloader(self.dir, self.state_path, retries=retries)
+        return downloader.download([dict({'url': self.server.url + path, 'filename': 'foto.jpg'}, **item)])[0]
+
+    def requests_for(self, path: str = '/foto.jpg') -> List[Dict]:
+        return [request for request in self.server.requests if request['path'] == path]
+
+    def test_resumes_truncated_body_with_range(self):
+        self.server.truncate['/foto.jpg'] = 1
+        result = self.download()
+
+        self.assertEqual(result['status'], 'resumed')
+        self.assertEqual((self.dir / 'foto.jpg').read_bytes(), self.server.files['/foto.jpg'])
+        first, second = self.requests_for()
+        self.assertNotIn('Range', first)
+        self.assertEqual(second['Range'], f'bytes={len(self.server.files["/foto.jpg"]) // 3}-')
+        self.assertEqual(second['If-Range'], self.server.etag(self.server.files['/foto.jpg']))
+        self.assertFalse((self.dir / 'foto.jpg.part').exists())
+
+    def test_keeps_part_when_retries_run_out(self):
+        self.server.truncate['/foto.jpg'] = 1
+        result = self.download(retries=0)
+
+        self.assertEqual(result['status'], 'failed')
+        self.assertFalse((self.dir / 'foto.jpg').exists())
+        self.assertTrue((self.dir / 'foto.jpg.part').exists())
+
+        self.assertEqual(self.download()['status'], 'resumed')
+        self.assertEqual((self.dir / 'foto.jpg').read_bytes(), self.server.files['/foto.jpg'])
+
+    def test_if_range_mismatch_restarts_with_full_body(self):
+        self.server.truncate['/foto.jpg'] = 1
+        self.download(retries=0)
+        # The file changes on the server: If-Range no longer matches, so it answers 200
+        self.server.files['/foto.jpg'] = b'new picture' * 5000
+        result = self.download()
+
+        self.assertEqual(result['status'], 'downloaded')
+        self.assertIn('If-Range', self.requests_for()[-1])
+        self.assertEqual((self.dir / 'foto.jpg').read_bytes(), self.server.files['/foto.jpg'])
+
+    def test_revalidates_with_etag(self):
+        self.assertEqual(self.download()['status'], 'downloaded')
+        result = self.download()
+
+        self.assertEqual(result['status'], 'current')
+        self.assertEqual(self.requests_for()[-1]['If-None-Match'], self.server.etag(self.server.files['/foto.jpg']))
+
+    def test_revalidates_with_last_modified(self):
+        self.server.etags = False
+        self.assertEqual(self.download()['status'], 'downloaded')
+        result = self.download()
+
+        self.assertEqual(result['status'], 'current')
+        self.assertEqual(self.requests_for()[-1]['If-Modified-Since'], LAST_MODIFIED)
+        self.assertNotIn('If-None-Match', self.requests_for()[-1])
+
+    def test_existing_file_without_validators_is_left_alone(self):
+        self.dir.mkdir(parents=True)
+        (self.dir / 'foto.jpg').write_bytes(b'local copy')
+
+        self.assertEqual(self.download()['status'], 'exists')
+        self.assertEqual(self.server.requests, [])
+
+    def test_repr_digest_mismatch_deletes_part(self):
+        self.server.bad_digest = True
+        result = self.download()
+
+        self.assertEqual(result['status'], 'failed')
+        self.assertIn('SHA-256 mismatch', result['error'])
+        self.assertFalse((self.dir / 'foto.jpg').exists())
+        self.assertFalse((self.dir / 'foto.jpg.part').exists())
+
+    def test_expected_checksum_is_checked(self):
+        body = self.server.files['/foto.jpg']
+        self.assertEqual(self.download(sha256=hashlib.sha256(body).hexdigest())['status'], 'downloaded')
+        (self.dir / 'foto.jpg').unlink()
+        self.state_path.unlink()
+
+        result = self.download(sha256='0' * 64)
+        self.assertEqual(result['status'], 'failed')
+        self.assertIn('expected checksum', result['error'])
+
+    def test_follows_redirects(self):
+        self.server.redirects['/wp-content/uploads/foto.jpg'] = '/foto.jpg'
+        result = self.download('/wp-content/uploads/foto.jpg')
+
+        self.assertEqual(result['status'], 'downloaded')
+        self.assertEqual((self.dir / 'foto.jpg').read_bytes(), self.server.files['/foto.jpg'])
+
+    def test_redirect_limit(self):
+        self.server.redirects['/loop.jpg'] = '/loop.jpg'
+        result = self.download('/loop.jpg')
+
+        self.assertEqual(result['status'], 'failed')
+        self.assertIn(f'more than {download_media.MAX_REDIRECTS} redirects', result['error'])
+        self.assertEqual(len(self.requests_for('/loop.jpg')), download_media.MAX_REDIRECTS + 1)
+
+    def test_retries_429_and_5xx(self):
+        self.server.failures['/foto.jpg'] = [429, 503]
+        result = self.download(retries=2)
+
+        self.assertEqual(result['status'], 'downloaded')
+        self.assertEqual(len(self.requests_for()), 3)
+
+    def test_gives_up_after_retries(self):
+        self.server.failures['/foto.jpg'] = [500, 502, 503]
+        result = self.download(retries=2)
+
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(result['error'], 'HTTP 503')
+        self.assertEqual(len(self.requests_for()), 3)
+
+    def test_client_errors_are_not_retried(self):
+        result = self.download('/missing.jpg')
+
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(len(self.requests_for('/missing.jpg')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,53 +4,72 @@ Update featured images for posts currently using placeholder.
 Maps specific posts to available images.
 """
 
-import json
-from pathlib import Path
+from typing import Dict, Iterable, List
 
-def update_featured_images():
-    """Update featured images for specific posts."""
+from blog_data import describe_save
+from content_store import ContentStore
+
+PLACEHOLDER = 'assets/images/blog/placeholder.jpg'
+
+# Image mappings (title keyword -> image path)
+IMAGE_MAP = {
+    'Neve': 'assets/images/imagenes-blog/Carlos_neve.jpg',
+    'Genesys Black': 'assets/images/imagenes-blog/Carlos_neve.jpg',
+    'Carlos Rodgarman: Excellence': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Practicing with the Harpejji': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Celebration night': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Interview for holahollywood': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Press release in Faro de Vigo': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Special thanks to my brother Grecco': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Thanks Marcodi Musical': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+    'Thank you Anna Sarkisova': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
+}
 
-    # Load posts
-    posts_path = Path('data/blog-posts.json')
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
-
-    # Image mappings (title keyword -> image path)
-    image_map = {
-        'Neve': 'assets/images/imagenes-blog/Carlos_neve.jpg',
-        'Genesys Black': 'assets/images/imagenes-blog/Carlos_neve.jpg',
-        'Carlos Rodgarman: Excellence': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Practicing with the Harpejji': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Celebration night': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Interview for holahollywood': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Press release in Faro de Vigo': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Special thanks to my brother Grecco': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Thanks Marcodi Musical': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-        'Thank you Anna Sarkisova': 'assets/images/imagenes-blog/Carlos-Rodgarman-–-Music-Producer-at-RG-Studios.jpg',
-    }
-
-    updates = []
+def _replace_placeholders(posts: Iterable[Dict]) -> List[Dict]:
+    """Give placeholder posts the image of the first keyword in their title. Returns the posts changed."""
+    changed = []
     for post in posts:
-        if post['featuredImage'] == 'assets/images/blog/placeholder.jpg':
+        if post['featuredImage'] == PLACEHOLDER:
             title = post['title']
 
             # Try to find a match
-            for keyword, image_path in image_map.items():
+            for keyword, image_path in IMAGE_MAP.items():
                 if keyword in title:
                     post['featuredImage'] = image_path
-                    updates.append(f"{title} -> {image_path}")
+                    changed.append(post)
+                    print(f"  ✓ {title} -> {image_path}")
                     break
 
+    return changed
+
+def update_posts(posts: List[Dict]) -> int:
+    """Replace placeholder featured images by title keyword, in memory. Returns posts changed."""
+    return len(_replace_placeholders(posts))
+
+def update_store(store: ContentStore) -> int:
+    """update_posts() on the store's placeholder posts only, in one transaction. Returns posts changed."""
+    with store.batch():
+        changed = _replace_placeholders(store.with_featured_image(PLACEHOLDER))
+        for post in changed:
+            store.put(post)
+
+    return len(changed)
+
+def update_featured_images():
+    """Update featured images for specific posts."""
+
+    store = ContentStore.open()
+
+    updates = update_store(store)
+
     # Write updated posts
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2, ensure_ascii=False)
+    saved = store.export()
 
-    print(f"Updated {len(updates)} featured images:")
-    for update in updates:
-        print(f"  ✓ {update}")
+    print(f"Updated {updates} featured images")
+    print(describe_save(saved))
 
     # Count remaining placeholders
-    placeholder_count = sum(1 for p in posts if p['featuredImage'] == 'assets/images/blog/placeholder.jpg')
+    placeholder_count = len(store.with_featured_image(PLACEHOLDER))
     print(f"\nRemaining placeholders: {placeholder_count}")
 
 if __name__ == '__main__':
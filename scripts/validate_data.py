@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Validate the site's data files against their schemas.
+
+Schemas (SCHEMAS) are small JSON-Schema-like dicts, compiled once into
+nested validator closures: required keys, types, patterns and enums are
+resolved at compile time, so validating an item is a handful of dict
+lookups and isinstance checks. Files are loaded and validated in a thread
+pool and their errors are printed as each file finishes.
+
+Supported schema keys:
+- type:       'object', 'array', 'string', 'integer', 'boolean'
+- required:   keys an object must have
+- properties: key -> schema, checked when the key is present
+- items:      schema of every array element
+- unique:     key whose value must be unique across an array of objects
+- pattern:    regex a string must match from its start
+- enum:       allowed values
+- nonempty:   a string or array must not be empty
+- nullable:   null is allowed too
+
+Usage:
+    python3 scripts/validate_data.py [FILE ...] [--max-errors 20] [--jobs N]
+"""
+
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# A compiled validator: (value, path) -> (path, message) errors
+CompiledValidator = Callable[[Any, str], Iterator[Tuple[str, str]]]
+
+TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'boolean': bool,
+}
+
+STRING = {'type': 'string'}
+TEXT = {'type': 'string', 'nonempty': True}
+DATE = {'type': 'string', 'pattern': r'\d{4}-\d{2}-\d{2}$'}
+YEAR = {'type': 'string', 'pattern': r'(\d{4})?$'}
+URL = {'type': 'string', 'pattern': r'https?://'}
+OPTIONAL_URL = {'type': 'string', 'pattern': r'(https?://|$)'}
+LINK = {'type': 'string', 'pattern': r'(https?://|#$)'}  # '#' = no link yet
+SLUG = {'type': 'string', 'pattern': r'[a-z0-9][a-z0-9-]*$'}
+URL_SEGMENT = {'type': 'string', 'pattern': r'[^\s/?#]+$'}  # WordPress slugs may be percent-encoded
+IMAGE = {'type': 'string', 'pattern': r'(https?://|(?!/)[^\s]+$)'}
+COLOR = {'type': 'string', 'pattern': r'#[0-9A-Fa-f]{6}$'}
+SRCSET = {'type': 'object', 'required': ['jpeg'], 'properties': {'jpeg': TEXT, 'webp': TEXT}}
+
+BLOG_POST = {
+    'type': 'object',
+    'required': ['id', 'title', 'slug', 'content', 'featuredImage',
+                 'category', 'tags', 'author', 'publishDate', 'readTime'],
+    'properties': {
+        'id': URL_SEGMENT,
+        'title': TEXT,
+        'slug': URL_SEGMENT,
+        'excerpt': STRING,
+        'content': STRING,
+        'featuredImage': IMAGE,
+        'featuredImageSrcset': SRCSET,
+        'category': TEXT,
+        'tags': {'type': 'array', 'items': TEXT},
+        'author': TEXT,
+        'publishDate': DATE,
+        'updatedDate': DATE,
+        'readTime': {'type': 'string', 'pattern': r'\d+ min read$'},
+        'metaDescription': STRING,
+        'metaKeywords': STRING,
+        'featured': {'type': 'boolean'},
+    },
+}
+
+# What a WordPress migration must produce before it is written: the fields,
+# unique IDs, dates and tag lists the site relies on. WordPress allows
+# untitled posts and unusual slugs, so BLOG_POST's stricter content checks
+# are only warnings for a migration (see migrate_wordpress_posts.Validator).
+MIGRATED_POSTS = {
+    'type': 'array',
+    'unique': 'id',
+    'items': {
+        'type': 'object',
+        'required': BLOG_POST['required'],
+        'properties': {
+            'title': STRING,
+            'publishDate': {'type': 'string', 'pattern': r'\d{4}-\d{2}-\d{2}'},
+            'tags': {'type': 'array'},
+        },
+    },
+}
+
+SCHEMAS: Dict[str, Dict] = {
+    'data/blog-posts.json': {'type': 'array', 'unique': 'id', 'items': BLOG_POST},
+    'components/cd-player/music-data.json': {
+        'type': 'array',
+        'unique': 'id',
+        'items': {
+            'type': 'object',
+            'required': ['id', 'coverImage', 'artist', 'title', 'year', 'completedWork', 'panelColor', 'links'],
+            'properties': {
+                'id': SLUG,
+                'coverImage': IMAGE,
+                'artist': TEXT,
+                'title': TEXT,
+                'year': YEAR,
+                'completedWork': STRING,
+                'panelColor': COLOR,
+                'links': {
+                    'type': 'object',
+                    'properties': {'appleMusic': LINK, 'spotify': LINK, 'amazon': LINK},
+                },
+                'audioFile': OPTIONAL_URL,
+            },
+        },
+    },
+    'components/films/films-data.json': {
+        'type': 'array',
+        'unique': 'id',
+        'items': {
+            'type': 'object',
+            'required': ['id', 'title', 'role', 'year', 'coverImage'],
+            'properties': {
+                'id': SLUG,
+                'title': TEXT,
+                'role': STRING,
+                'year': YEAR,
+                'coverImage': IMAGE,
+                'coverImageSrcset': SRCSET,
+                'trailerUrl': {'type': 'string', 'pattern': r'(https?://|(?!/)[^\s]+$|$)'},
+                'imdbUrl': OPTIONAL_URL,
+                'description': STRING,
+            },
+        },
+    },
+    'components/advertising/advertising-data.json': {
+        'type': 'array',
+        'unique': 'id',
+        'items': {
+            'type': 'object',
+            'required': ['id', 'title', 'category', 'coverImage'],
+            'properties': {
+                'id': SLUG,
+                'title': TEXT,
+                'client': STRING,
+                'category': TEXT,
+                'year': YEAR,
+                'coverImage': IMAGE,
+                'coverImageSrcset': SRCSET,
+                'videoUrl': OPTIONAL_URL,
+                'description': STRING,
+            },
+        },
+    },
+    'assets/technical-videos/technical-videos-data.json': {
+        'type': 'array',
+        'unique': 'id',
+        'items': {
+            'type': 'object',
+            'required': ['id', 'title', 'category', 'coverImage', 'videoUrl'],
+            'properties': {
+                'id': SLUG,
+                'title': TEXT,
+                'category': TEXT,
+                'series': STRING,
+                'description': STRING,
+                'coverImage': IMAGE,
+                'coverImageSrcset': SRCSET,
+                'videoUrl': URL,
+                'year': YEAR,
+                'tags': {'type': 'array', 'items': TEXT},
+            },
+        },
+    },
+    'data/gallery-photos.json': {
+        'type': 'array',
+        'unique': 'id',
+        'items': {
+            'type': 'object',
+            'required': ['id', 'filename', 'alt'],
+            'properties': {
+                'id': {'type': 'integer'},
+                'filename': {'type': 'string', 'pattern': r'[^/\s]+\.(jpe?g|png|webp|gif)$'},
+                'caption': STRING,
+                'alt': TEXT,
+            },
+        },
+    },
+    'data/equipment-links.json': {
+        'type': 'array',
+        'items': {
+            'type': 'object',
+            'required': ['section', 'items'],
+            'properties': {
+                'section': TEXT,
+                'items': {
+                    'type': 'array',
+                    'nonempty': True,
+                    'items': {
+                        'type': 'object',
+                        'required': ['name', 'url'],
+                        'properties': {
+                            'name': TEXT,
+                            'url': {'type': 'string', 'pattern': r'https?://', 'nullable': True},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def compile_schema(schema: Dict) -> CompiledValidator:
+    """Turn a schema dict into a validator function."""
+    checks: List[CompiledValidator] = []
+
+    expected = schema.get('type')
+    nullable = schema.get('nullable', False)
+    if expected:
+        python_type = TYPES[expected]
+        exclude_bool = python_type is int  # bool is an int subclass
+
+        def check_type(value, path):
+            if not isinstance(value, python_type) or (exclude_bool and isinstance(value, bool)):
+                yield path, f"expected {expected}, got {type(value).__name__}"
+    else:
+        check_type = None
+
+    if schema.get('nonempty'):
+        def check_nonempty(value, path):
+            if not value:
+                yield path, "must not be empty"
+        checks.append(check_nonempty)
+
+    if 'pattern' in schema:
+        matcher = re.compile(schema['pattern']).match
+        pattern = schema['pattern']
+
+        def check_pattern(value, path):
+            if not matcher(value):
+                yield path, f"{value!r} does not match {pattern}"
+        checks.append(check_pattern)
+
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+
+        def check_enum(value, path):
+            if value not in allowed:
+                yield path, f"{value!r} is not one of {sorted(allowed)}"
+        checks.append(check_enum)
+
+    if 'required' in schema:
+        required = tuple(schema['required'])
+
+        def check_required(value, path):
+            for key in required:
+                if key not in value:
+                    yield path, f"missing required field '{key}'"
+        checks.append(check_required)
+
+    if 'properties' in schema:
+        properties = tuple((key, compile_schema(subschema)) for key, subschema in schema['properties'].items())
+
+        def check_properties(value, path):
+            for key, validate in properties:
+                if key in value:
+                    yield from validate(value[key], f"{path}.{key}")
+        checks.append(check_properties)
+
+    if 'items' in schema:
+        validate_item = compile_schema(schema['items'])
+
+        def check_items(value, path):
+            for i, item in enumerate(value):
+                yield from validate_item(item, f"{path}[{i}]")
+        checks.append(check_items)
+
+    if 'unique' in schema:
+        unique_key = schema['unique']
+
+        def check_unique(value, path):
+            seen = set()
+            for i, item in enumerate(value):
+                if not isinstance(item, dict) or unique_key not in item:
+                    continue
+                key_value = item[unique_key]
+                if key_value in seen:
+                    yield f"{path}[{i}]", f"duplicate {unique_key} {key_value!r}"
+                seen.add(key_value)
+        checks.append(check_unique)
+
+    checks = tuple(checks)
+
+    def validate(value, path=''):
+        if value is None and nullable:
+            return
+        if check_type:
+            type_errors = list(check_type(value, path))
+            if type_errors:
+                yield from type_errors
+                return
+        for check in checks:
+            yield from check(value, path)
+
+    return validate
+
+
+VALIDATORS: Dict[str, CompiledValidator] = {path: compile_schema(schema) for path, schema in SCHEMAS.items()}
+
+
+def validate_file(path: Path, validate: CompiledValidator, max_errors: int) -> Dict:
+    """Load and validate one file. Returns its result (errors capped at max_errors)."""
+    start = time.perf_counter()
+    errors = []
+    total = 0
+    try:
+        data = json.loads(Path(path).read_bytes())
+    except (OSError, ValueError) as e:
+        errors.append(('', str(e)))
+        total = 1
+    else:
+        for error in validate(data):
+            total += 1
+            if len(errors) < max_errors:
+                errors.append(error)
+
+    return {
+        'path': str(path),
+        'errors': errors,
+        'total': total,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def validate_files(paths: List[str], root: Path = Path('.'), max_errors: int = 20,
+                   jobs: Optional[int] = None) -> Iterator[Dict]:
+    """Validate files in parallel, yielding each file's result as it finishes."""
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(validate_file, root / path, VALIDATORS[path], max_errors) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv: Optional[List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description="Validate the site's data files against their schemas.")
+    arg_parser.add_argument('files', nargs='*', metavar='FILE', help='files to check (default: all known files)')
+    arg_parser.add_argument('--max-errors', type=int, default=20, help='errors shown per file')
+    arg_parser.add_argument('--jobs', '-j', type=int, help='worker threads (default: Python default)')
+    args = arg_parser.parse_args(argv)
+
+    unknown = [path for path in args.files if path not in VALIDATORS]
+    if unknown:
+        print(f"❌ No schema for: {', '.join(unknown)}")
+        return 1
+
+    start = time.perf_counter()
+    failed = 0
+    for result in validate_files(args.files or list(SCHEMAS), max_errors=args.max_errors, jobs=args.jobs):
+        elapsed = f"{result['seconds'] * 1000:.1f} ms"
+        if not result['total']:
+            print(f"   ✓ {result['path']} ({elapsed})")
+            continue
+
+        failed += 1
+        print(f"   ❌ {result['path']}: {result['total']} errors ({elapsed})")
+        for path, message in result['errors']:
+            print(f"      {path or '(file)'}: {message}")
+        if result['total'] > len(result['errors']):
+            print(f"      ... and {result['total'] - len(result['errors'])} more")
+
+    print(f"\n{'❌' if failed else '✅'} {len(args.files or SCHEMAS)} files checked, {failed} with errors "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+SQLite import of a WordPress export, shared by the tools that read it.
+
+The export is parsed once (WordPressParser.iter_items/read_item) into
+data/.wxr-cache.sqlite:
+
+- items:              every <item> in export order (posts, pages, attachments, ...)
+- postmeta:           (item, meta_key, meta_value), in export order
+- terms:              (domain, name), e.g. ('category', 'Studio')
+- term_relationships: (item, term, position)
+
+with indexes on items.post_id, items.post_name, items.post_type/status and
+postmeta.meta_key. WXRStore.sync() re-imports only when the export's
+SHA-256 differs from the one recorded at import (the hash is only
+computed when the file's size or mtime changed), so later runs read the
+tables in milliseconds instead of parsing the XML again. An import is
+written to a temporary file and moved into place, so an interrupted one
+never leaves a half-filled database.
+
+Usage:
+    python3 scripts/wxr_store.py EXPORT [--db data/.wxr-cache.sqlite] [--force]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+STORE_PATH = Path('data/.wxr-cache.sqlite')
+SCHEMA_VERSION = 1
+
+ITEM_FIELDS = ('post_id', 'post_name', 'post_type', 'status', 'post_parent', 'title', 'link',
+               'pubDate', 'post_date', 'attachment_url', 'content', 'excerpt')
+
+SCHEMA = f'''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE items (seq INTEGER PRIMARY KEY, {', '.join(f'{field} TEXT' for field in ITEM_FIELDS)});
+CREATE TABLE postmeta (item INTEGER NOT NULL, meta_key TEXT NOT NULL, meta_value TEXT);
+CREATE TABLE terms (term_id INTEGER PRIMARY KEY, domain TEXT NOT NULL, name TEXT NOT NULL, UNIQUE (domain, name));
+CREATE TABLE term_relationships (item INTEGER NOT NULL, term_id INTEGER NOT NULL, position INTEGER NOT NULL);
+CREATE INDEX items_post_id ON items (post_id);
+CREATE INDEX items_post_name ON items (post_name);
+CREATE INDEX items_type_status ON items (post_type, status);
+CREATE INDEX postmeta_item ON postmeta (item);
+CREATE INDEX postmeta_key ON postmeta (meta_key);
+CREATE INDEX term_relationships_item ON term_relationships (item);
+'''
+
+# read_item() category lists by term domain
+TERM_DOMAINS = {'category': 'categories', 'post_tag': 'tags'}
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WXRStore:
+    """Read access to an imported export; sync() opens it, importing first if needed."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        self.imported = False  # True if sync() parsed the export in this run
+
+    @classmethod
+    def sync(cls, parser, db_path: Path = STORE_PATH, force: bool = False) -> 'WXRStore':
+        """Open the store for parser's export, importing it unless the stored import is current."""
+        xml_path = Path(parser.xml_path)
+        stat = xml_path.stat()
+        recorded = cls._read_meta(db_path)
+        export_hash = None
+
+        if (not force and recorded.get('schema_version') == str(SCHEMA_VERSION)
+                and recorded.get('export_path') == str(xml_path.resolve())):
+            if (recorded.get('export_size'), recorded.get('export_mtime')) == (
+                    str(stat.st_size), str(stat.st_mtime_ns)):
+                return cls(db_path)
+
+            # Touched or copied: only a changed hash means a changed export
+            export_hash = file_sha256(xml_path)
+            if recorded.get('export_sha256') == export_hash:
+                store = cls(db_path)
+                store._set_meta({'export_size': stat.st_size, 'export_mtime': stat.st_mtime_ns})
+                return store
+
+        cls._import(parser, db_path, stat, export_hash or file_sha256(xml_path))
+        store = cls(db_path)
+        store.imported = True
+        return store
+
+    @staticmethod
+    def _read_meta(db_path: Path) -> Dict[str, str]:
+        if not Path(db_path).exists():
+            return {}
+        try:
+            connection = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+            try:
+                return dict(connection.execute('SELECT key, value FROM meta'))
+            finally:
+                connection.close()
+        except sqlite3.DatabaseError:
+            return {}
+
+    def _set_meta(self, values: Dict):
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                        [(key, str(value)) for key, value in values.items()])
+
+    @staticmethod
+    def _import(parser, db_path: Path, stat: os.stat_result, export_hash: str):
+        """Parse the export into a fresh database and move it into place."""
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = db_path.with_name(db_path.name + '.tmp')
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        print(f"📥 Importing WordPress export into {db_path}")
+        start = time.perf_counter()
+
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.executescript('PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;' + SCHEMA)
+            term_ids: Dict[tuple, int] = {}
+            insert_item = f'INSERT INTO items VALUES (?, {", ".join("?" * len(ITEM_FIELDS))})'
+            seq = 0
+            with connection:
+                for item in parser.iter_items():
+                    seq += 1
+                    record = parser.read_item(item)
+                    connection.execute(insert_item, [seq] + [record[field] for field in ITEM_FIELDS])
+                    connection.executemany('INSERT INTO postmeta VALUES (?, ?, ?)',
+                                           [(seq, key, value) for key, value in record['postmeta'].items()])
+
+                    relationships = []
+                    for domain, field in TERM_DOMAINS.items():
+                        for name in record[field]:
+                            term_id = term_ids.get((domain, name))
+                            if term_id is None:
+                                term_id = term_ids[(domain, name)] = len(term_ids) + 1
+                                connection.execute('INSERT INTO terms VALUES (?, ?, ?)', (term_id, domain, name))
+                            relationships.append((seq, term_id, len(relationships)))
+                    connection.executemany('INSERT INTO term_relationships VALUES (?, ?, ?)', relationships)
+
+                connection.executemany('INSERT INTO meta VALUES (?, ?)', [
+                    ('schema_version', str(SCHEMA_VERSION)),
+                    ('export_path', str(Path(parser.xml_path).resolve())),
+                    ('export_sha256', export_hash),
+                    ('export_size', str(stat.st_size)),
+                    ('export_mtime', str(stat.st_mtime_ns)),
+                    ('item_count', str(seq)),
+                ])
+            connection.execute('ANALYZE')
+        except BaseException:
+            connection.close()
+            tmp_path.unlink()
+            raise
+        connection.close()
+
+        os.replace(tmp_path, db_path)
+        print(f"   Imported {seq} items in {time.perf_counter() - start:.2f}s")
+
+    @property
+    def item_count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def records(self, where: str = '', params: tuple = ()) -> Iterator[Dict]:
+        """Items as read_item() records (with categories, tags and postmeta), in export order.
+
+        where is an SQL condition on the items table, e.g. "post_type = ?".
+        """
+        condition = f'WHERE {where}' if where else ''
+        rows = self.connection.execute(f'SELECT seq, {", ".join(ITEM_FIELDS)} FROM items {condition} ORDER BY seq',
+                                       params).fetchall()
+        if not rows:
+            return
+
+        # Metadata and terms of the selected items, grouped by item in one query each
+        selected = f'item IN (SELECT seq FROM items {condition})'
+        postmeta: Dict[int, Dict[str, str]] = {}
+        for item, key, value in self.connection.execute(
+                f'SELECT item, meta_key, meta_value FROM postmeta WHERE {selected} ORDER BY rowid', params):
+            postmeta.setdefault(item, {})[key] = value
+
+        terms: Dict[int, List[tuple]] = {}
+        for item, domain, name in self.connection.execute(
+                f'SELECT r.item, t.domain, t.name FROM term_relationships r JOIN terms t USING (term_id) '
+                f'WHERE r.{selected} ORDER BY r.item, r.position', params):
+            terms.setdefault(item, []).append((domain, name))
+
+        for row in rows:
+            record = dict(zip(ITEM_FIELDS, row[1:]))
+            record['categories'] = []
+            record['tags'] = []
+            for domain, name in terms.get(row[0], ()):
+                record[TERM_DOMAINS[domain]].append(name)
+            record['postmeta'] = postmeta.get(row[0], {})
+            yield record
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    from migrate_wordpress_posts import WordPressParser
+
+    arg_parser = argparse.ArgumentParser(description='Import a WordPress export into SQLite (if it changed).')
+    arg_parser.add_argument('export', type=Path, help='WordPress export (.xml or .xml.gz)')
+    arg_parser.add_argument('--db', type=Path, default=STORE_PATH, help='SQLite database')
+    arg_parser.add_argument('--force', action='store_true', help='re-import even if the export is unchanged')
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        store = WXRStore.sync(WordPressParser(str(args.export)), args.db, force=args.force)
+    except (ET.ParseError, OSError) as e:
+        print(f"❌ XML parsing error: {e}")
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+    if not store.imported:
+        print(f"✓ {args.db} is current ({elapsed:.0f} ms)")
+
+    counts = dict(store.connection.execute('SELECT post_type, COUNT(*) FROM items GROUP BY post_type'))
+    print(f"   {store.item_count} items: " + ', '.join(f'{n} {kind or "untyped"}' for kind, n in sorted(counts.items())))
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())